@@ -0,0 +1,7 @@
+"""
+Benchmarks of the hot paths of the server.
+"""
+import os
+
+# The benchmarked modules read the settings of the server
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mudserver.settings")
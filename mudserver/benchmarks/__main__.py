@@ -0,0 +1,94 @@
+"""
+Runs the benchmark suite.
+
+The results can be written as JSON and compared with the results of a previous run.
+The run fails when a benchmark is slower than the baseline by more than the threshold, or
+when a benchmark with a budget exceeds it.
+
+Run from the mudserver folder:
+    python -m benchmarks --json results.json
+    python -m benchmarks --compare results.json --threshold 1.25
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+from . import bench_cmdparser, bench_game_engine, bench_map_navigator
+from .timing import is_over_budget, print_results, result_key
+
+SUITES = {
+    "cmdparser": bench_cmdparser.run,
+    "map_navigator": bench_map_navigator.run,
+    "game_engine": bench_game_engine.run,
+}
+
+
+def find_regressions(results: list, baseline: list, threshold: float) -> list:
+    """
+    Compares the results with the baseline.
+
+    Args:
+        results (list): The results of the run.
+        baseline (list): The results of a previous run.
+        threshold (float): The slowdown ratio that is a regression. e.g 1.25
+
+    Returns:
+        list: A tuple of the key, the baseline value and the value of each regression.
+    """
+    baseline_values = {result_key(result): result["value"] for result in baseline}
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        baseline_value = baseline_values.get(key)
+        if baseline_value and result["value"] > baseline_value * threshold:
+            regressions.append((key, baseline_value, result["value"]))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument(
+        "--only", nargs="+", choices=list(SUITES), default=list(SUITES), help="Suites to run"
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare the results with this file")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression"
+    )
+    args = parser.parse_args()
+
+    results = []
+    for name in args.only:
+        results += SUITES[name]()
+    print_results(results)
+    over_budget = [result for result in results if is_over_budget(result)]
+    for result in over_budget:
+        print(f"Over budget: {result_key(result)} {result['value']:.2f} > {result['budget']:.2f}")
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            },
+            "results": results,
+        }
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for key, baseline_value, value in regressions:
+            print(f"Regression: {key} {baseline_value:.2f} -> {value:.2f}")
+        if regressions:
+            return 1
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmarks of the command parser.
+
+Compares the dispatch table of the command parser with the previous implementation,
+which checked every command of the command set in order.
+
+Run from the mudserver folder:
+    python -m benchmarks.bench_cmdparser
+"""
+import commands.cmdhandler as cmd
+from commands.cmdparser import CommandParser
+
+from .timing import print_results, result, time_per_call
+
+# Commands of an authenticated user and of an anonymous user
+COMMANDS = [
+    ("north", True),
+    ("w", True),
+    ("look", True),
+    ("say hello there", True),
+    ("quit", True),
+    ("help", True),
+    ("unknown", True),
+    ("connect user password", False),
+]
+
+
+def linear_parse_command(command, is_user_authenticated: bool) -> tuple:
+    """
+    The previous implementation of CommandParser.parse_command, kept as a baseline.
+    """
+    command = command.split(" ")
+    command_key = command[0].lower()
+    command_set = (
+        CommandParser.anonymous_user_commands
+        if not is_user_authenticated
+        else CommandParser.authenticated_user_commands
+    )
+    for command_class in command_set:
+        if command_class.is_command(command_key):
+            return command_class.parse(command)
+    return cmd.GameEvents.INVALID_COMMAND, {}
+
+
+def run(commands: list = COMMANDS) -> list:
+    """
+    Runs the benchmarks for every command.
+
+    Args:
+        commands (list): The benchmarked commands and whether the user is authenticated.
+
+    Returns:
+        list: The results of the benchmarks.
+    """
+    results = []
+    for command, is_user_authenticated in commands:
+        results += [
+            result(
+                "cmdparser.linear_parse_command",
+                time_per_call(lambda: linear_parse_command(command, is_user_authenticated), 50_000),
+                "ns",
+                command=command,
+            ),
+            result(
+                "cmdparser.parse_command",
+                time_per_call(
+                    lambda: CommandParser.parse_command(command, is_user_authenticated), 50_000
+                ),
+                "ns",
+                command=command,
+            ),
+        ]
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,114 @@
+"""
+Benchmarks of the game engine.
+
+Runs GameEngine.handle_command for a connected player against a fake consumer and the
+in-memory channel layer. The write-behind buffer is not flushed during the benchmarks,
+so no database is needed.
+
+Run from the mudserver folder:
+    python -m benchmarks.bench_game_engine
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+
+from .timing import print_results, result, time_per_await
+
+# Commands sent by the player. The moves go back and forth between the first two rooms.
+COMMANDS = {
+    "look": ["look"],
+    "say": ["say hello there"],
+    "move": ["west", "east"],
+    "help": ["help"],
+    "invalid": ["dance"],
+}
+
+
+class FakeConsumer:
+    """
+    Stands in for the websocket consumer. The sent messages are counted and dropped.
+
+    Attributes:
+        scope: The connection scope.
+        channel_name: The name of the channel of the consumer.
+        sent: The number of sent messages.
+    """
+
+    def __init__(self, channel_name: str) -> None:
+        self.scope = {}
+        self.channel_name = channel_name
+        self.sent = 0
+
+    async def send_frame(self, frame: str) -> None:
+        self.sent += 1
+
+
+async def run_async(commands: dict) -> list:
+    from channels.layers import InMemoryChannelLayer
+
+    from game.engine.game_engine import GameEngine
+    from game.engine.persistence import player_state_writer
+    from game.engine.presence import presence
+    from game.models import PlayerProfile
+    from game.rooms.map_navigator import MapNavigator
+
+    channel_layer = InMemoryChannelLayer()
+    consumer = FakeConsumer(await channel_layer.new_channel())
+    engine = GameEngine(consumer, channel_layer)
+
+    # Connect the player without the database
+    location = MapNavigator.get_default_room_id()
+    engine.is_user_authenticated = True
+    engine.username = "bench"
+    engine.player = PlayerProfile(pk=1, location=location)
+    engine.room = MapNavigator.get_room(location)
+    presence.add(engine.username, location)
+    await channel_layer.group_add(GameEngine.get_room_group(location), consumer.channel_name)
+
+    flush_size = player_state_writer.flush_size
+    player_state_writer.flush_size = float("inf")
+    results = []
+    try:
+        for name, texts in commands.items():
+            frames = itertools.cycle([json.dumps({"message": text}) for text in texts])
+            results.append(
+                result(
+                    "game_engine.handle_command",
+                    await time_per_await(lambda: engine.handle_command(next(frames)), 2_000),
+                    "ns",
+                    command=name,
+                )
+            )
+    finally:
+        player_state_writer.pending = {}
+        player_state_writer.flush_size = flush_size
+        presence.remove(engine.username)
+    return results
+
+
+def run(commands: dict = COMMANDS) -> list:
+    """
+    Runs the benchmarks for every command.
+
+    Args:
+        commands (dict): Maps the name of the benchmark to the texts sent in turn.
+
+    Returns:
+        list: The results of the benchmarks.
+    """
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mudserver.settings")
+    django.setup()
+    # The engine logs every command at the info level
+    logging.disable(logging.INFO)
+    try:
+        return asyncio.run(run_async(commands))
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    print_results(run())
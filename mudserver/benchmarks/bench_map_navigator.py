@@ -0,0 +1,119 @@
+"""
+Benchmarks of the world graph and the map navigator.
+
+Shows that looking up a room and moving between rooms cost the same whatever the
+size of the world, and that building the world is linear in the number of rooms.
+Loading a world file of 100k rooms takes well under a second, and opening a snapshot
+of the world takes the same time whatever its size.
+
+Run from the mudserver folder:
+    python -m benchmarks.bench_map_navigator
+"""
+import itertools
+import os
+import random
+import tempfile
+from unittest import mock
+
+import game.rooms.map_navigator as map_navigator
+from game.rooms.loader import load_world, write_world
+from game.rooms.map_navigator import MapNavigator, construct_world
+from game.rooms.snapshot import compile_world, open_snapshot
+
+from .timing import print_results, result, time_once, time_per_call
+from .worlds import make_room_data
+
+WORLD_SIZES = [10, 10_000, 100_000]
+# Time allowed to load a world file, in milliseconds, by number of rooms
+LOAD_WORLD_BUDGETS = {100_000: 1000.0}
+
+
+def run(sizes: list = WORLD_SIZES) -> list:
+    """
+    Runs the benchmarks for every world size.
+
+    Args:
+        sizes (list): The number of rooms of the benchmarked worlds.
+
+    Returns:
+        list: The results of the benchmarks.
+    """
+    results = []
+    for size in sizes:
+        room_data = make_room_data(size)
+        results.append(
+            result(
+                "map_navigator.construct_world",
+                time_once(lambda: construct_world(room_data)),
+                "ms",
+                rooms=size,
+            )
+        )
+        world = construct_world(room_data)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "world.jsonl")
+            write_world(room_data, path)
+            results.append(
+                result(
+                    "loader.load_world",
+                    time_once(lambda: load_world(path)),
+                    "ms",
+                    budget=LOAD_WORLD_BUDGETS.get(size),
+                    rooms=size,
+                )
+            )
+            snapshot_path = os.path.join(directory, "world.snapshot")
+            compile_world(world, snapshot_path)
+            results.append(
+                result(
+                    "snapshot.open_snapshot",
+                    time_once(lambda: open_snapshot(snapshot_path)),
+                    "ms",
+                    rooms=size,
+                )
+            )
+            snapshot = open_snapshot(snapshot_path)
+            snapshot_ids = itertools.cycle(random.Random(size).choices(list(world.rooms), k=10_000))
+            results.append(
+                result(
+                    "snapshot.get_room",
+                    time_per_call(lambda: snapshot.rooms[next(snapshot_ids)], 10_000),
+                    "ns",
+                    rooms=size,
+                )
+            )
+            snapshot.rooms.close()
+        rng = random.Random(size)
+        sample = rng.choices(list(world.rooms), k=1_000)
+        room_ids = itertools.cycle(sample)
+        rooms = itertools.cycle([world.rooms[room_id] for room_id in sample])
+        moves = itertools.cycle(
+            [(exit["location"], exit["name"]) for exit in rng.choices(room_data["exits"], k=1_000)]
+        )
+
+        with mock.patch.object(map_navigator, "world", world):
+            results += [
+                result(
+                    "map_navigator.get_room",
+                    time_per_call(lambda: MapNavigator.get_room(next(room_ids)), 10_000),
+                    "ns",
+                    rooms=size,
+                ),
+                result(
+                    "map_navigator.move_to",
+                    time_per_call(lambda: MapNavigator.move_to(*next(moves)), 10_000),
+                    "ns",
+                    rooms=size,
+                ),
+                result(
+                    "map_navigator.get_printable_exits",
+                    time_per_call(lambda: MapNavigator.get_printable_exits(next(rooms)), 10_000),
+                    "ns",
+                    rooms=size,
+                ),
+            ]
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
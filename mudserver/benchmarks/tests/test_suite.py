@@ -0,0 +1,39 @@
+from benchmarks.__main__ import find_regressions
+from benchmarks.timing import is_over_budget, result, result_key
+from benchmarks.worlds import make_room_data
+from game.rooms.map_navigator import construct_world
+
+
+def test_result_key():
+    assert result_key(result("map_navigator.get_room", 1.0, "ns", rooms=10)) == (
+        "map_navigator.get_room[rooms=10]"
+    )
+
+
+def test_find_regressions():
+    baseline = [
+        result("parse", 100, "ns", command="look"),
+        result("parse", 100, "ns", command="say"),
+    ]
+    results = [
+        result("parse", 110, "ns", command="look"),
+        result("parse", 150, "ns", command="say"),
+        result("parse", 500, "ns", command="new"),
+    ]
+    assert find_regressions(results, baseline, threshold=1.25) == [("parse[command=say]", 100, 150)]
+
+
+def test_make_room_data():
+    world = construct_world(make_room_data(9))
+    # 3x3 grid: the center room has an exit in every direction
+    assert world.rooms[5].directions == {"north": 2, "south": 8, "west": 4, "east": 6}
+    assert world.rooms[1].directions == {"south": 4, "east": 2}
+
+
+def test_is_over_budget():
+    assert is_over_budget(result("loader.load_world", 1200, "ms", budget=1000, rooms=100_000))
+    assert not is_over_budget(result("loader.load_world", 800, "ms", budget=1000, rooms=100_000))
+    assert not is_over_budget(result("loader.load_world", 1200, "ms", rooms=100_000))
+    assert result_key(result("loader.load_world", 800, "ms", budget=1000, rooms=100_000)) == (
+        "loader.load_world[rooms=100000]"
+    )
@@ -0,0 +1,123 @@
+"""
+Helpers to time the benchmarks and to report their results.
+
+Each benchmark produces a list of results. A result is a dict with the name of the
+benchmark, its parameters, the measured value and its unit, so the results can be
+written as JSON and compared between runs.
+"""
+import time
+import timeit
+
+
+def time_per_call(func, number: int, repeat: int = 5) -> float:
+    """
+    Measures the best time of a call of the function.
+
+    Args:
+        func (callable): The function to call without arguments.
+        number (int): The number of calls in a measurement.
+        repeat (int): The number of measurements.
+
+    Returns:
+        float: The best time of a call in nanoseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+async def time_per_await(func, number: int, repeat: int = 5) -> float:
+    """
+    Measures the best time of a call of the coroutine function.
+
+    Args:
+        func (callable): The coroutine function to call without arguments.
+        number (int): The number of calls in a measurement.
+        repeat (int): The number of measurements.
+
+    Returns:
+        float: The best time of a call in nanoseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1e9
+
+
+def time_once(func) -> float:
+    """
+    Measures the time of a single call of the function.
+
+    Args:
+        func (callable): The function to call without arguments.
+
+    Returns:
+        float: The time of the call in milliseconds.
+    """
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1e3
+
+
+def result(name: str, value: float, unit: str, budget: float = None, **params) -> dict:
+    """
+    Creates the result of a benchmark.
+
+    Args:
+        name (str): The name of the benchmark. e.g map_navigator.get_room
+        value (float): The measured value.
+        unit (str): The unit of the value. e.g ns
+        budget (float): The highest acceptable value, in the same unit. None if there is none.
+        params: The parameters of the benchmark. e.g rooms=10000
+
+    Returns:
+        dict: The result.
+    """
+    benchmark_result = {"name": name, "params": params, "value": value, "unit": unit}
+    if budget is not None:
+        benchmark_result["budget"] = budget
+    return benchmark_result
+
+
+def is_over_budget(result: dict) -> bool:
+    """
+    Checks whether the result exceeds its budget.
+
+    Args:
+        result (dict): The result.
+
+    Returns:
+        bool: True if the result has a budget and its value is higher.
+    """
+    return "budget" in result and result["value"] > result["budget"]
+
+
+def result_key(result: dict) -> str:
+    """
+    Gets the key identifying the benchmark and the parameters of the result.
+
+    Args:
+        result (dict): The result.
+
+    Returns:
+        str: The key. e.g map_navigator.get_room[rooms=10000]
+    """
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def print_results(results: list) -> None:
+    """
+    Prints the results as a table.
+
+    Args:
+        results (list): The results.
+    """
+    width = max((len(result_key(result)) for result in results), default=0)
+    for result in results:
+        line = f"{result_key(result):<{width}} {result['value']:>14.2f} {result['unit']}"
+        if "budget" in result:
+            status = "OVER BUDGET" if is_over_budget(result) else "ok"
+            line += f" (budget {result['budget']:.2f} {result['unit']}, {status})"
+        print(line)
@@ -0,0 +1,43 @@
+"""
+Synthetic worlds for the benchmarks.
+
+The rooms are laid out on a square grid. Every room has an exit to each of its
+neighbours, so the number of exits is about four times the number of rooms.
+"""
+import math
+
+
+def make_room_data(room_count: int) -> dict:
+    """
+    Creates the room data of a grid shaped world.
+
+    Args:
+        room_count (int): The number of rooms.
+
+    Returns:
+        dict: The room data in the format of game.rooms.data.room_data.
+    """
+    width = max(1, math.isqrt(room_count))
+    rooms = []
+    exits = []
+    for index in range(room_count):
+        room_id = index + 1
+        rooms.append({"id": room_id, "name": f"Room {room_id}", "desc": f"Room number {room_id}."})
+        row, column = divmod(index, width)
+        neighbours = {
+            "north": index - width if row > 0 else None,
+            "south": index + width if index + width < room_count else None,
+            "west": index - 1 if column > 0 else None,
+            "east": index + 1 if column < width - 1 and index + 1 < room_count else None,
+        }
+        for direction, neighbour in neighbours.items():
+            if neighbour is not None:
+                exits.append(
+                    {
+                        "id": len(exits) + 1,
+                        "name": direction,
+                        "location": room_id,
+                        "destination": neighbour + 1,
+                    }
+                )
+    return {"rooms": rooms, "exits": exits}
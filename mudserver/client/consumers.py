@@ -4,15 +4,26 @@ Consumers for the client.
 Each client has a consumer that listens for messages from the server. 
 The consumer is responsible for handling the messages and updating the 
 client's state.
+
+The messages to the client go through a bounded outbound queue, so a slow
+client never holds up the game engine or the broadcasts.
 """
-import json
+import asyncio
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.layers import get_channel_layer
+from django.conf import settings
+
+from client.outbound import OutboundQueue
 from game.engine import game_engine
+from game.engine.protocol import encode_message
+from metrics.instruments import CONNECTED_CONSUMERS, WEBSOCKET_MESSAGES_SENT
 
 
 class AsyncWebConsumer(AsyncWebsocketConsumer):
     groups = ["broadcast"]
+    # Close code sent to the clients disconnected by a full outbound queue
+    slow_client_close_code = 4008
 
     def __init__(self) -> None:
         """
@@ -20,12 +31,21 @@ class AsyncWebConsumer(AsyncWebsocketConsumer):
         """
         super().__init__()
         self.game_engine = game_engine.GameEngine(self, get_channel_layer())
+        self.outbound = OutboundQueue(
+            self.send,
+            maxsize=settings.OUTBOUND_QUEUE_SIZE,
+            policy=settings.OUTBOUND_QUEUE_POLICY,
+            on_disconnect=self.__disconnect_slow_client,
+            coalesce_window=settings.OUTBOUND_COALESCE_WINDOW,
+        )
 
     async def connect(self):
         """
         Connect to the websocket
         """
         await self.accept()
+        self.outbound.start()
+        CONNECTED_CONSUMERS.inc()
 
     async def disconnect(self, close_code):
         """
@@ -34,8 +54,10 @@ class AsyncWebConsumer(AsyncWebsocketConsumer):
         Args:
             close_code: The close code of the websocket
         """
+        CONNECTED_CONSUMERS.dec()
+        self.outbound.close()
         await self.game_engine.on_disconnect(close_code)
-        await self.send(text_data=json.dumps({"message": "Goodbye"}))
+        await self.send(text_data=encode_message("Goodbye"))
         await self.close()
 
     async def receive(self, text_data):
@@ -47,25 +69,90 @@ class AsyncWebConsumer(AsyncWebsocketConsumer):
         """
         await self.game_engine.handle_command(text_data)
 
+    async def send_frame(self, frame: str) -> None:
+        """
+        Queue an encoded message for the websocket. Does not wait for the client.
+
+        Args:
+            frame (str): The encoded message
+        """
+        self.outbound.put(frame)
+
+    def __disconnect_slow_client(self) -> None:
+        """
+        Close the websocket of a client that does not keep up with its messages
+        """
+        asyncio.ensure_future(self.close(code=AsyncWebConsumer.slow_client_close_code))
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        """
+        Send a message to the websocket and count it
+
+        Args:
+            text_data (str): The text message
+            bytes_data (bytes): The binary message
+            close (bool): Whether to close the websocket after sending
+        """
+        WEBSOCKET_MESSAGES_SENT.inc()
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+
     async def message_location(self, event):
         """
-        Message handler to broad cast the message to the users in the same location
+        Message handler to broad cast the message to the users in the same location.
+
+        The event carries the encoded message, which is forwarded as-is.
+        The message is only delivered to the consumers in the channel group of the room.
 
         Args:
             event : The event from the channel layer
         """
         if self.game_engine.is_user_authenticated:
             location = self.game_engine.room.id
-            # Only publish message to the current room
+            # Guards against the messages that were in flight while the user moved
             if event["location"] == location:
-                await self.send(text_data=json.dumps({"message": event["message"]}))
+                self.outbound.put(event["frame"])
 
     async def message_broadcast(self, event):
         """
-        Message handler to broad cast the message to all the users
+        Message handler to broad cast the message to all the users.
+
+        The event carries the encoded message, which is forwarded as-is.
+
+        Args:
+            event: The event from the channel layer
+        """
+        if self.game_engine.is_user_authenticated:
+            self.outbound.put(event["frame"])
+
+    async def message_frame(self, event):
+        """
+        Message handler for the messages of the shard handling the player, in sharded mode.
+
+        The event carries the encoded message and the location of the player.
 
         Args:
             event: The event from the channel layer
         """
+        self.game_engine.sync_location(event["location"])
+        self.outbound.put(event["frame"])
+
+    async def world_relocate(self, event):
+        """
+        Message handler of the rooms removed from the world by a reload.
+
+        Sent to the channel groups of the removed rooms. The player is moved to the default room.
+
+        Args:
+            event: The event from the channel layer
+        """
+        await self.game_engine.relocate()
+
+    async def shard_route(self, event):
+        """
+        Message handler for the hand-off of the player to another shard, in sharded mode.
+
+        Args:
+            event: The event carrying the channel of the new shard
+        """
         if self.game_engine.is_user_authenticated:
-            await self.send(text_data=json.dumps({"message": event["message"]}))
+            self.game_engine.shard_channel = event["channel"]
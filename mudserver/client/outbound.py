@@ -0,0 +1,159 @@
+"""
+Class to queue the messages sent to a client.
+
+Each consumer has a bounded queue of outbound frames, drained by a writer task. The game engine
+and the broadcast handlers put their frames in the queue and never wait for a slow client. When
+the queue of a slow client is full, the overflow policy decides what happens:
+
+- drop_oldest: The oldest frame is dropped.
+- coalesce: The queued frames are merged into a single frame.
+- disconnect: The client is disconnected.
+
+Optionally, the writer waits for a short coalescing window after the first queued frame, and
+sends all the frames queued in the meantime as a single batch frame. Bursts of small messages
+(e.g a busy room chatting) then cost one websocket frame per window instead of one per message.
+"""
+import asyncio
+import logging
+import weakref
+from collections import deque
+
+from game.engine.protocol import coalesce_frames, encode_batch
+from metrics.instruments import (
+    OUTBOUND_QUEUE_OVERFLOWS,
+    OUTBOUND_QUEUED_FRAMES,
+    OUTBOUND_QUEUE_MAX_DEPTH,
+)
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+# All the queues of the process, for the metrics
+queues = weakref.WeakSet()
+OUTBOUND_QUEUED_FRAMES.set_function(lambda: sum(queue.depth for queue in list(queues)))
+OUTBOUND_QUEUE_MAX_DEPTH.set_function(
+    lambda: max((queue.depth for queue in list(queues)), default=0)
+)
+
+
+class OutboundQueue:
+    """
+    Bounded queue of the frames sent to a client.
+
+    Attributes:
+        send: Coroutine function writing a frame to the client.
+        maxsize: The maximum number of queued frames.
+        policy: The overflow policy. One of drop_oldest, coalesce or disconnect.
+        on_disconnect: Function called when the disconnect policy is triggered.
+        coalesce_window: The number of seconds to batch the frames for. 0 sends every frame.
+        frames: The queued frames.
+        overflows: The number of times the queue was full.
+        writer_task: The task writing the frames to the client.
+    """
+
+    def __init__(
+        self,
+        send,
+        maxsize: int,
+        policy: str = DROP_OLDEST,
+        on_disconnect=None,
+        coalesce_window: float = 0,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy}. Expected one of {POLICIES}")
+        self.send = send
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_disconnect = on_disconnect
+        self.coalesce_window = coalesce_window
+        self.frames = deque()
+        self.overflows = 0
+        self.writer_task = None
+        self.ready = asyncio.Event()
+        self.closed = False
+        queues.add(self)
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of queued frames.
+        """
+        return len(self.frames)
+
+    def put(self, frame: str) -> None:
+        """
+        Queues a frame. Never waits for the client.
+
+        Args:
+            frame (str): The encoded frame.
+        """
+        if self.closed:
+            return
+        if len(self.frames) >= self.maxsize:
+            self.overflows += 1
+            OUTBOUND_QUEUE_OVERFLOWS.labels(self.policy).inc()
+            if self.policy == DROP_OLDEST:
+                self.frames.popleft()
+            elif self.policy == COALESCE:
+                frames = list(self.frames)
+                self.frames.clear()
+                self.frames.append(coalesce_frames(frames))
+            else:
+                logger.warning("Outbound queue full. Disconnecting the client.")
+                self.close()
+                if self.on_disconnect:
+                    self.on_disconnect()
+                return
+        self.frames.append(frame)
+        self.ready.set()
+
+    def start(self) -> None:
+        """
+        Starts the writer task in the running event loop.
+        """
+        self.writer_task = asyncio.get_running_loop().create_task(self.__write())
+
+    def close(self) -> None:
+        """
+        Stops the writer task and drops the queued frames.
+        """
+        self.closed = True
+        self.frames.clear()
+        if self.writer_task:
+            self.writer_task.cancel()
+
+    def __take_batch(self) -> str:
+        """
+        Takes all the queued frames as a single frame.
+
+        Returns:
+            str: The only queued frame, or a batch frame carrying all the queued messages.
+        """
+        frames = list(self.frames)
+        self.frames.clear()
+        return frames[0] if len(frames) == 1 else encode_batch(frames)
+
+    async def __write(self) -> None:
+        """
+        Writes the queued frames to the client, in order.
+        """
+        try:
+            while True:
+                while not self.frames:
+                    self.ready.clear()
+                    await self.ready.wait()
+                if self.coalesce_window:
+                    await asyncio.sleep(self.coalesce_window)
+                    await self.send(self.__take_batch())
+                else:
+                    await self.send(self.frames.popleft())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cannot write to the client. Closing the outbound queue.")
+            self.closed = True
+            self.frames.clear()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from client.outbound import COALESCE, DISCONNECT, DROP_OLDEST, OutboundQueue
+from game.engine.protocol import encode_message
+
+
+class SlowClient:
+    """
+    Client that only receives the frames once it is released.
+    """
+
+    def __init__(self) -> None:
+        self.frames = []
+        self.released = asyncio.Event()
+
+    async def send(self, frame: str) -> None:
+        await self.released.wait()
+        self.frames.append(frame)
+
+    def messages(self) -> list:
+        return [json.loads(frame)["message"] for frame in self.frames]
+
+
+async def fill_queue(policy: str, count: int, on_disconnect=None) -> tuple:
+    client = SlowClient()
+    queue = OutboundQueue(client.send, maxsize=3, policy=policy, on_disconnect=on_disconnect)
+    queue.start()
+    queue.put(encode_message("0"))
+    # Let the writer take the first frame and wait for the stalled client
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    for index in range(1, count):
+        queue.put(encode_message(str(index)))
+    return client, queue
+
+
+async def release(client: SlowClient, queue: OutboundQueue) -> None:
+    client.released.set()
+    while queue.depth:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    queue.close()
+
+
+def test_frames_are_sent_in_order():
+    async def scenario():
+        client, queue = await fill_queue(DROP_OLDEST, 3)
+        await release(client, queue)
+        return client.messages()
+
+    assert asyncio.run(scenario()) == ["0", "1", "2"]
+
+
+def test_drop_oldest():
+    async def scenario():
+        client, queue = await fill_queue(DROP_OLDEST, 6)
+        # The writer holds the first frame while the client is stalled
+        assert queue.depth == 3
+        assert queue.overflows == 2
+        await release(client, queue)
+        return client.messages()
+
+    assert asyncio.run(scenario()) == ["0", "3", "4", "5"]
+
+
+def test_coalesce():
+    async def scenario():
+        client, queue = await fill_queue(COALESCE, 6)
+        assert queue.depth == 3
+        await release(client, queue)
+        return client.messages()
+
+    assert asyncio.run(scenario()) == ["0", "1<br>2<br>3", "4", "5"]
+
+
+def test_disconnect():
+    disconnected = []
+
+    async def scenario():
+        client, queue = await fill_queue(DISCONNECT, 6, lambda: disconnected.append(True))
+        assert queue.closed
+        assert queue.depth == 0
+        await release(client, queue)
+        return client.messages()
+
+    # The writer is stopped, even the frame held for the stalled client is dropped
+    assert asyncio.run(scenario()) == []
+    assert disconnected == [True]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        OutboundQueue(None, maxsize=3, policy="block")
+
+
+def test_coalesce_window():
+    async def scenario():
+        frames = []
+
+        async def send(frame):
+            frames.append(frame)
+
+        queue = OutboundQueue(send, maxsize=10, coalesce_window=0.02)
+        queue.start()
+        for index in range(3):
+            queue.put(encode_message(str(index)))
+        await asyncio.sleep(0.05)
+        queue.put(encode_message("3"))
+        await asyncio.sleep(0.05)
+        queue.close()
+        return [json.loads(frame) for frame in frames]
+
+    assert asyncio.run(scenario()) == [{"messages": ["0", "1", "2"]}, {"message": "3"}]
@@ -32,15 +32,24 @@ class GameEvents:
     # LOGIN EVENTS
     LOGIN_VALID_PARAM = "login_success"
     LOGIN_INVALID_PARAM = "login_invalid_param"
+    # RESUME EVENTS
+    RESUME_VALID = "resume_success"
+    RESUME_INVALID_PARAM = "resume_invalid_param"
     # LOGOUT EVENTS
     LOGOUT_VALID = "logout_success"
     # ROOM EVENTS
     MOVE_VALID = "move_success"
+    # TRAVEL EVENTS
+    TRAVEL_VALID = "travel_success"
+    TRAVEL_INVALID_PARAM = "travel_invalid_param"
     # LOOK EVENTS
     LOOK_VALID = "look_success"
     # SAY EVENTS
     SAY_VALID = "say_success"
     SAY_INVALID = "say_invalid_param"
+    # SHOUT EVENTS
+    SHOUT_VALID = "shout_success"
+    SHOUT_INVALID = "shout_invalid_param"
     # HELP EVENTS
     HELP_VALID = "help_success"
     # INVALID EVENTS
@@ -167,6 +176,37 @@ class ConnectCommand(Command):
             return GameEvents.LOGIN_INVALID_PARAM, {}
 
 
+class ResumeCommand(Command):
+    """
+    Class to validate and parse the command for resuming a session with a resume token.
+
+    Attributes:
+        key: A list of strings that represent the resume command.
+    """
+
+    key = ["resume"]
+
+    def parse(self, command: str) -> tuple:
+        """
+        Parses the command and returns the event name and the arguments for the event.
+
+        Args:
+            command: The command to check.
+
+        Returns:
+            A tuple containing the event name and the arguments for the event.
+            e.g (GameEvents.RESUME_VALID, {'token': 'token'})
+        """
+        # Slicing to ignore the command key
+        command = command[1:]
+        if len(command) == 1:
+            logger.debug("ResumeCommand parsed")
+            return GameEvents.RESUME_VALID, {"token": command[0]}
+        else:
+            logger.debug(f"ResumeCommand invalid : {command}")
+            return GameEvents.RESUME_INVALID_PARAM, {}
+
+
 class LogoutCommand(Command):
     """
     Class to validate and parse the command for logging out a user.
@@ -230,6 +270,43 @@ class DirectionCommand(Command):
         return GameEvents.MOVE_VALID, {"direction": direction}
 
 
+class TravelCommand(Command):
+    """
+    Class to validate and parse the command for travelling to a room by its name.
+
+    The -v option shows the route taken.
+
+    Attributes:
+        key: A list of strings that represent the travel command.
+    """
+
+    key = ["travel"]
+
+    def parse(self, command: str) -> tuple:
+        """
+        Parses the command and returns the event name and the arguments for the event.
+
+        Args:
+            command: The command to check.
+
+        Returns:
+            A tuple containing the event name and the arguments for the event.
+            e.g (GameEvents.TRAVEL_VALID, {'room': 'The water cooler', 'summary': False})
+        """
+        # Slicing to ignore the command key
+        command = command[1:]
+        summary = bool(command) and command[0] == "-v"
+        if summary:
+            command = command[1:]
+        room = " ".join(word for word in command if word)
+        if room:
+            logger.debug(f"TravelCommand parsed: {room}")
+            return GameEvents.TRAVEL_VALID, {"room": room, "summary": summary}
+        else:
+            logger.debug(f"TravelCommand invalid : {command}")
+            return GameEvents.TRAVEL_INVALID_PARAM, {}
+
+
 class LookCommand(Command):
     """
     Class to validate and parse the command for looking at a location.
@@ -268,6 +345,35 @@ class SayCommand(Command):
         return GameEvents.SAY_VALID, {"message": " ".join(command[1:])}
 
 
+class ShoutCommand(Command):
+    """
+    Class to validate and parse the command for shouting to the players in the nearby rooms.
+
+    Attributes:
+        key: A list of strings that represent the shout command.
+    """
+
+    key = ["shout"]
+
+    def parse(self, command: str) -> tuple:
+        """
+        Parses the command and returns the event name and the arguments for the event.
+
+        Args:
+            command: The command to check.
+
+        Returns:
+            A tuple containing the event name and the arguments for the event.
+            e.g (GameEvents.SHOUT_VALID, {'message': 'message'})
+        """
+        message = " ".join(command[1:])
+        if message.strip():
+            return GameEvents.SHOUT_VALID, {"message": message}
+        else:
+            logger.debug(f"ShoutCommand invalid : {command}")
+            return GameEvents.SHOUT_INVALID, {}
+
+
 class HelpCommand(Command):
     """
     Class to validate and parse the command for displaying the help menu.
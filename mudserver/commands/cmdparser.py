@@ -2,6 +2,7 @@
 Class for parsing commands.
 
 This class determines what commands are available to the user and parse them.
+Commands can be abbreviated to any prefix that matches a single command key.
 
 This class has to be modified to support new commands.
 """
@@ -12,6 +13,94 @@ import commands.cmdhandler as cmd
 logger = logging.getLogger(__name__)
 
 
+class CommandTrie:
+    """
+    Prefix tree of the command keys.
+
+    Each node of the tree is a dict mapping the next character to the child node. The number
+    of keys below each node is counted, so the prefixes that match a single key can be found.
+
+    Attributes:
+        root: The root node of the tree.
+    """
+
+    # Reserved node entries. They are not single characters, so they cannot clash with the keys.
+    COUNT = "count"
+    KEY = "key"
+
+    def __init__(self, keys: list) -> None:
+        self.root = {CommandTrie.COUNT: 0}
+        for key in keys:
+            self.insert(key)
+
+    def insert(self, key: str) -> None:
+        """
+        Inserts the key in the tree.
+
+        Args:
+            key: The command key.
+        """
+        node = self.root
+        node[CommandTrie.COUNT] += 1
+        for char in key:
+            node = node.setdefault(char, {CommandTrie.COUNT: 0})
+            node[CommandTrie.COUNT] += 1
+        node[CommandTrie.KEY] = key
+
+    def get_unambiguous_prefixes(self) -> dict:
+        """
+        Gets the prefixes that match a single key.
+
+        Returns:
+            A dict mapping each unambiguous prefix to the key it abbreviates.
+        """
+        prefixes = {}
+        nodes = [("", self.root)]
+        while nodes:
+            prefix, node = nodes.pop()
+            if prefix and node[CommandTrie.COUNT] == 1:
+                # Every prefix down the only branch abbreviates the same key
+                key = prefix
+                while CommandTrie.KEY not in node:
+                    char, node = next(
+                        (char, child) for char, child in node.items() if char != CommandTrie.COUNT
+                    )
+                    key += char
+                prefixes.update((key[:length], key) for length in range(len(prefix), len(key)))
+                continue
+            for char, child in node.items():
+                if char not in (CommandTrie.COUNT, CommandTrie.KEY):
+                    nodes.append((prefix + char, child))
+        return prefixes
+
+
+def build_dispatch_table(command_set: list) -> dict:
+    """
+    Builds the dispatch table of the commands.
+
+    The table maps each command key, and each unambiguous prefix of the command keys,
+    to the command and the full key. e.g "sou" is mapped to the direction command and "south".
+    The keys take precedence over the prefixes, so "e" is mapped to "e" and not to "east" or "exit".
+
+    Args:
+        command_set: The list of commands.
+
+    Returns:
+        A dict mapping the keys and the prefixes to a tuple of the command and the key.
+    """
+    commands_by_key = {}
+    for command_class in command_set:
+        for key in command_class.key:
+            commands_by_key.setdefault(key, command_class)
+
+    table = {}
+    for prefix, key in CommandTrie(list(commands_by_key)).get_unambiguous_prefixes().items():
+        table[prefix] = (commands_by_key[key], key)
+    for key, command_class in commands_by_key.items():
+        table[key] = (command_class, key)
+    return table
+
+
 class CommandParser:
     """
     Command parser class.
@@ -24,15 +113,25 @@ class CommandParser:
     """
 
     # Commands that are available to the user when they are not logged in.
-    anonymous_user_commands = [cmd.RegisterCommand(), cmd.ConnectCommand(), cmd.HelpCommand()]
+    anonymous_user_commands = [
+        cmd.RegisterCommand(),
+        cmd.ConnectCommand(),
+        cmd.ResumeCommand(),
+        cmd.HelpCommand(),
+    ]
     # Commands that are available to the user when they are logged in.
     authenticated_user_commands = [
         cmd.DirectionCommand(),
+        cmd.TravelCommand(),
         cmd.LogoutCommand(),
         cmd.HelpCommand(),
         cmd.LookCommand(),
         cmd.SayCommand(),
+        cmd.ShoutCommand(),
     ]
+    # Maps the command keys and their unambiguous prefixes to the commands.
+    anonymous_user_dispatch_table = build_dispatch_table(anonymous_user_commands)
+    authenticated_user_dispatch_table = build_dispatch_table(authenticated_user_commands)
 
     @staticmethod
     def parse_command(command, is_user_authenticated: bool) -> tuple:
@@ -47,18 +146,17 @@ class CommandParser:
             A tuple containing the event name and the arguments for the event.
         """
         command = command.split(" ")
-        command_key = command[0].lower()
-        command_set = (
-            CommandParser.anonymous_user_commands
+        dispatch_table = (
+            CommandParser.anonymous_user_dispatch_table
             if not is_user_authenticated
-            else CommandParser.authenticated_user_commands
+            else CommandParser.authenticated_user_dispatch_table
         )
-        for command_class in command_set:
-            if command_class.is_command(command_key):
-                logger.debug(f"{command_class.__class__.__name__} matches parse_command: {command}")
-                return command_class.parse(command)
+        match = dispatch_table.get(command[0].lower())
+        if match is None:
+            return cmd.GameEvents.INVALID_COMMAND, {}
 
-        return cmd.GameEvents.INVALID_COMMAND, {}
+        command_class, command[0] = match
+        return command_class.parse(command)
 
     @staticmethod
     def get_available_commands(is_user_authenticated: bool) -> list:
@@ -1,13 +1,24 @@
 import pytest
 from commands.cmdhandler import GameEvents
-from commands.cmdparser import CommandParser
+from commands.cmdparser import CommandParser, CommandTrie
 
 
 @pytest.mark.parametrize(
     "is_authenticated, expected_result",
     [
-        (True, ["north|south|east|west|n|s|e|w", "quit|exit|logout", "help", "look|l", "say"]),
-        (False, ["register", "connect", "help"]),
+        (
+            True,
+            [
+                "north|south|east|west|n|s|e|w",
+                "travel",
+                "quit|exit|logout",
+                "help",
+                "look|l",
+                "say",
+                "shout",
+            ],
+        ),
+        (False, ["register", "connect", "resume", "help"]),
     ],
 )
 def test_get_available_commands(is_authenticated, expected_result):
@@ -31,6 +42,8 @@ def test_get_available_commands(is_authenticated, expected_result):
             GameEvents.LOGIN_VALID_PARAM,
             {"username": "user", "password": "user"},
         ),
+        # Resume command
+        ("resume token", False, GameEvents.RESUME_VALID, {"token": "token"}),
         # Logout command
         ("quit", True, GameEvents.LOGOUT_VALID, {}),
         ("exit", True, GameEvents.LOGOUT_VALID, {}),
@@ -41,6 +54,8 @@ def test_get_available_commands(is_authenticated, expected_result):
         ("look", True, GameEvents.LOOK_VALID, {}),
         # Say command
         ("say hello Jim", True, GameEvents.SAY_VALID, {"message": "hello Jim"}),
+        # Shout command
+        ("shout hello Jim", True, GameEvents.SHOUT_VALID, {"message": "hello Jim"}),
         # Move command
         ("north", True, GameEvents.MOVE_VALID, {"direction": "north"}),
         ("south", True, GameEvents.MOVE_VALID, {"direction": "south"}),
@@ -50,6 +65,14 @@ def test_get_available_commands(is_authenticated, expected_result):
         ("e", True, GameEvents.MOVE_VALID, {"direction": "east"}),
         ("w", True, GameEvents.MOVE_VALID, {"direction": "west"}),
         ("n", True, GameEvents.MOVE_VALID, {"direction": "north"}),
+        # Travel command
+        (
+            "travel The water  cooler",
+            True,
+            GameEvents.TRAVEL_VALID,
+            {"room": "The water cooler", "summary": False},
+        ),
+        ("travel -v lobby", True, GameEvents.TRAVEL_VALID, {"room": "lobby", "summary": True}),
     ],
 )
 def test_parse_command(command, is_user_authenticated, expected_event, args):
@@ -73,6 +96,9 @@ def test_parse_command(command, is_user_authenticated, expected_event, args):
             GameEvents.LOGIN_INVALID_PARAM,
             {},
         ),
+        # Resume command
+        ("resume", False, GameEvents.RESUME_INVALID_PARAM, {}),
+        ("resume token", True, GameEvents.INVALID_COMMAND, {}),
         # Logout command
         ("quit", False, GameEvents.INVALID_COMMAND, {}),
         ("exit", False, GameEvents.INVALID_COMMAND, {}),
@@ -81,7 +107,58 @@ def test_parse_command(command, is_user_authenticated, expected_event, args):
         ("look", False, GameEvents.INVALID_COMMAND, {}),
         # Say command
         ("say hello Jim", False, GameEvents.INVALID_COMMAND, {}),
+        ("travel", True, GameEvents.TRAVEL_INVALID_PARAM, {}),
+        ("travel -v", True, GameEvents.TRAVEL_INVALID_PARAM, {}),
+        ("travel lobby", False, GameEvents.INVALID_COMMAND, {}),
+        # Shout command
+        ("shout", True, GameEvents.SHOUT_INVALID, {}),
+        ("shout   ", True, GameEvents.SHOUT_INVALID, {}),
     ],
 )
 def test_parse_invalid_command(command, is_user_authenticated, expected_event, args):
     assert CommandParser.parse_command(command, is_user_authenticated) == (expected_event, args)
+
+
+@pytest.mark.parametrize(
+    "command, is_user_authenticated, expected_event, args",
+    [
+        # Unambiguous prefixes
+        ("nor", True, GameEvents.MOVE_VALID, {"direction": "north"}),
+        ("ea", True, GameEvents.MOVE_VALID, {"direction": "east"}),
+        ("lo", True, GameEvents.INVALID_COMMAND, {}),
+        ("loo", True, GameEvents.LOOK_VALID, {}),
+        ("logo", True, GameEvents.LOGOUT_VALID, {}),
+        ("q", True, GameEvents.LOGOUT_VALID, {}),
+        ("t lobby", True, GameEvents.TRAVEL_VALID, {"room": "lobby", "summary": False}),
+        ("sa hi", True, GameEvents.SAY_VALID, {"message": "hi"}),
+        ("sh hi", True, GameEvents.SHOUT_VALID, {"message": "hi"}),
+        (
+            "reg user user",
+            False,
+            GameEvents.REGISTER_VALID,
+            {"username": "user", "password": "user"},
+        ),
+        ("res token", False, GameEvents.RESUME_VALID, {"token": "token"}),
+        ("re token", False, GameEvents.INVALID_COMMAND, {}),
+        # Keys take precedence over the prefixes
+        ("e", True, GameEvents.MOVE_VALID, {"direction": "east"}),
+        # Case insensitive
+        ("North", True, GameEvents.MOVE_VALID, {"direction": "north"}),
+        # Unknown commands
+        ("", True, GameEvents.INVALID_COMMAND, {}),
+        ("northwest", True, GameEvents.INVALID_COMMAND, {}),
+        ("nor", False, GameEvents.INVALID_COMMAND, {}),
+    ],
+)
+def test_parse_abbreviated_command(command, is_user_authenticated, expected_event, args):
+    assert CommandParser.parse_command(command, is_user_authenticated) == (expected_event, args)
+
+
+def test_command_trie():
+    trie = CommandTrie(["look", "logout", "l"])
+    assert trie.get_unambiguous_prefixes() == {
+        "loo": "look",
+        "log": "logout",
+        "logo": "logout",
+        "logou": "logout",
+    }
@@ -0,0 +1,25 @@
+"""
+File to register the models edited by the builders in the admin site.
+"""
+from django.contrib import admin
+
+from game.models import Exit, Room
+
+
+class ExitInline(admin.TabularInline):
+    model = Exit
+    fk_name = "location"
+    extra = 1
+
+
+@admin.register(Room)
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("name",)
+    inlines = [ExitInline]
+
+
+@admin.register(Exit)
+class ExitAdmin(admin.ModelAdmin):
+    list_display = ("id", "location", "name", "destination")
+    raw_id_fields = ("location", "destination")
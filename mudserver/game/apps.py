@@ -0,0 +1,12 @@
+"""
+Configuration of the game app.
+"""
+from django.apps import AppConfig
+
+
+class GameConfig(AppConfig):
+    name = "game"
+
+    def ready(self):
+        # Connects the signal handlers
+        from game import signals  # noqa: F401
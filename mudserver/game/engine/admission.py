@@ -0,0 +1,94 @@
+"""
+Class to limit the number of logins running at the same time.
+
+The connect and register commands hash a password. During a login storm (e.g after a
+deploy), they are admitted a few at a time, in order, so the hashing never takes all the
+resources of the server away from the players already in the game. The clients waiting
+for their turn are told to wait.
+"""
+import asyncio
+import contextlib
+import logging
+from collections import deque
+
+from django.conf import settings
+
+from metrics.instruments import LOGIN_QUEUE_WAITING
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionQueue:
+    """
+    First in, first out queue admitting a bounded number of tasks at a time.
+
+    Unlike an asyncio.Semaphore, the queue is not bound to an event loop.
+
+    Attributes:
+        concurrency: The maximum number of admitted tasks.
+        active: The number of admitted tasks.
+        waiters: The futures of the waiting tasks, in order.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self.active = 0
+        self.waiters = deque()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, on_wait=None):
+        """
+        Waits for the turn of the task, and holds its place until the end of the block.
+
+        Args:
+            on_wait (callable): Coroutine function called with the position in the queue,
+                when the task has to wait.
+        """
+        await self.__acquire(on_wait)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    async def __acquire(self, on_wait) -> None:
+        """
+        Takes a place, or waits for one to be handed over.
+
+        Args:
+            on_wait (callable): Coroutine function called when the task has to wait.
+        """
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            if on_wait:
+                await on_wait(len(self.waiters))
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The place was handed over already, give it to the next task
+                self.__release()
+            else:
+                waiter.cancel()
+                with contextlib.suppress(ValueError):
+                    self.waiters.remove(waiter)
+            raise
+
+    def __release(self) -> None:
+        """
+        Hands the place over to the first waiting task, or frees it.
+        """
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+# Admission queue of the connect and register commands
+login_admission = AdmissionQueue(concurrency=settings.LOGIN_CONCURRENCY)
+LOGIN_QUEUE_WAITING.set_function(lambda: len(login_admission.waiters))
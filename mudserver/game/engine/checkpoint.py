@@ -0,0 +1,165 @@
+"""
+Class to checkpoint the state of the online players, and to recover from a crash.
+
+The write-behind buffer (see game.engine.persistence) only writes the changed fields, and
+loses them if the process crashes. The checkpointer periodically writes the state of every
+online player of the process in a single transaction, so the database is never more than a
+checkpoint interval behind. Every checkpoint stamps the players with the time of the
+checkpoint.
+
+The players of a crashed process are left connected in the database, and would be listed in
+the rooms forever. The recovery pass disconnects, with a single update, the connected players
+that were not checkpointed for PLAYER_CHECKPOINT_STALE_AFTER seconds. It is run on startup,
+and periodically. The periodic pass also checks the presence registry of the process against
+the database.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from game.engine import sharding
+from game.engine.database import database_sync_to_async
+from game.engine.persistence import player_state_writer
+from game.engine.presence import presence
+from game.models import PlayerProfile
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerCheckpointer:
+    """
+    Periodic checkpoint of the online players of the process.
+
+    The checkpoints are run by the tick scheduler. See game.engine.ticker.
+
+    Attributes:
+        interval: The number of seconds between two checkpoints.
+        stale_after: The number of seconds without a checkpoint after which a connected
+            player is considered gone.
+        online: Maps the player profile id to the player profile of the online players.
+    """
+
+    def __init__(self, interval: float, stale_after: float) -> None:
+        self.interval = interval
+        self.stale_after = stale_after
+        self.online = {}
+
+    def add(self, player: PlayerProfile) -> None:
+        """
+        Adds a player who connected to the process.
+
+        Args:
+            player (PlayerProfile): The player profile, updated by the game engine.
+        """
+        player.checkpointed_at = timezone.now()
+        self.online[player.pk] = player
+
+    def remove(self, player: PlayerProfile) -> None:
+        """
+        Removes a player who disconnected.
+
+        Args:
+            player (PlayerProfile): The player profile.
+        """
+        self.online.pop(player.pk, None)
+
+    def snapshot(self) -> list:
+        """
+        Copies the state of the online players, stamped with the current time.
+
+        The copies are written outside of the event loop, while the game engines keep
+        updating the player profiles.
+
+        Returns:
+            list: The copies of the player profiles.
+        """
+        now = timezone.now()
+        snapshot = []
+        for player in self.online.values():
+            player.checkpointed_at = now
+            snapshot.append(
+                PlayerProfile(pk=player.pk, location=player.location, checkpointed_at=now)
+            )
+        return snapshot
+
+    async def checkpoint_async(self) -> int:
+        """
+        Writes the state of the online players to the database from the event loop.
+
+        Returns:
+            int: The number of written player profiles.
+        """
+        snapshot = self.snapshot()
+        if not snapshot:
+            return 0
+        return await database_sync_to_async(self.write)(snapshot)
+
+    def recover_stale_players(self) -> list:
+        """
+        Disconnects the connected players that were not checkpointed for stale_after seconds,
+        with a single update.
+
+        Returns:
+            list: The usernames of the disconnected players.
+        """
+        stale = PlayerProfile.objects.filter(
+            Q(checkpointed_at__isnull=True)
+            | Q(checkpointed_at__lt=timezone.now() - timedelta(seconds=self.stale_after)),
+            is_connected=True,
+        ).exclude(pk__in=list(self.online))
+        usernames = list(stale.values_list("user__username", flat=True))
+        if usernames:
+            count = stale.update(is_connected=False)
+            logger.warning(f"Disconnected {count} stale players: {usernames}")
+        return usernames
+
+    async def recover_async(self) -> int:
+        """
+        Disconnects the stale players from the event loop, and removes them from the
+        presence registry. Then checks the players of the registry against the database,
+        once the buffered locations are written.
+
+        Returns:
+            int: The number of disconnected players.
+        """
+        usernames = await database_sync_to_async(self.recover_stale_players)()
+        for username in usernames:
+            presence.remove(username)
+        await player_state_writer.flush_async()
+        await presence.check_database_consistency_async()
+        return len(usernames)
+
+    def write(self, snapshot: list) -> int:
+        """
+        Writes the copies of the player profiles in a single transaction.
+
+        The snapshot can be written after some of the players logged out, as the database
+        calls run in a pool of threads. The connection status is never written, and the players
+        disconnected in the database are skipped, so the logout wins.
+
+        In sharded mode, the locations are written by the shards owning the players.
+
+        Args:
+            snapshot (list): The copies of the player profiles.
+
+        Returns:
+            int: The number of written player profiles.
+        """
+        fields = ["checkpointed_at"]
+        if not sharding.regions:
+            fields.append("location")
+        with transaction.atomic():
+            count = PlayerProfile.objects.filter(is_connected=True).bulk_update(snapshot, fields)
+        logger.debug(f"Checkpointed {count} players")
+        return count
+
+
+# Checkpointer of the process
+checkpointer = PlayerCheckpointer(
+    interval=settings.PLAYER_CHECKPOINT_INTERVAL,
+    stale_after=settings.PLAYER_CHECKPOINT_STALE_AFTER,
+)
@@ -0,0 +1,62 @@
+"""
+Helpers to access the database from the event loop.
+
+The game engine runs in the event loop, but the ORM is synchronous. The database calls are
+run in the database executor. The calls are timed, so the metrics show how long they wait for
+the executor and how long they run.
+
+With SQLite, the calls run one at a time in the single thread of channels, as SQLite
+serializes the writers anyway. With a DATABASE_POOL_SIZE above 1, e.g with PostgreSQL, the
+calls run in a dedicated pool of DATABASE_POOL_SIZE threads. Each thread keeps its own
+persistent connection (see CONN_MAX_AGE), so the threads are the connection pool.
+"""
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import database_sync_to_async as channels_database_sync_to_async
+from django.conf import settings
+
+from metrics.instruments import DB_CALL_DURATION, DB_POOL_WAIT
+
+# Database executor of the process. None uses the single thread of channels
+executor = None
+if settings.DATABASE_POOL_SIZE > 1:
+    executor = ThreadPoolExecutor(
+        max_workers=settings.DATABASE_POOL_SIZE, thread_name_prefix="database"
+    )
+
+
+def database_sync_to_async(func):
+    """
+    Wraps a synchronous function accessing the database into a coroutine function.
+
+    Can be used as a decorator, in place of channels.db.database_sync_to_async.
+
+    Args:
+        func (callable): The synchronous function.
+
+    Returns:
+        callable: The coroutine function.
+    """
+    wait = DB_POOL_WAIT.labels(func.__name__)
+    duration = DB_CALL_DURATION.labels(func.__name__)
+
+    def timed(queued_at: float, *args, **kwargs):
+        started_at = time.perf_counter()
+        wait.observe(started_at - queued_at)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration.observe(time.perf_counter() - started_at)
+
+    if executor is None:
+        run = channels_database_sync_to_async(timed)
+    else:
+        run = channels_database_sync_to_async(timed, thread_sensitive=False, executor=executor)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(time.perf_counter(), *args, **kwargs)
+
+    return wrapper
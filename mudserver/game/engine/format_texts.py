@@ -8,3 +8,21 @@ mud_server_home_page = """
 |_|__|_|  \_,_|  \__,_|   |___/   \___|   _|_|_   _\_/_   \___|   _|_|_  <br>
 </b><br>
 """
+
+# Room texts. The name, the description and the exits of the room are static, so the texts
+# are formatted once per room by the render cache. Only the players are added on each look.
+room_connect_text = "<b># {name}<b> <br><br> {desc}"
+
+room_move_text = """
+        <br><b># {name}<b><br>
+        <br>{desc}
+        """
+
+room_look_head_text = """
+            <br><b>{name}</b>
+            <br>{desc}
+            <br><b>Players</b>: """
+
+room_look_tail_text = """
+            <br><b>Exits</b>: {exits}
+            """
@@ -3,20 +3,34 @@ Class to handle the state of the player.
 
 Handles all the events triggered by the player.
 """
+import asyncio
 import json
 import logging
+import time
 
 import django.db as django_db
-from django.contrib.auth import authenticate
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils.html import escape
 
 from channels.auth import login, logout
-from channels.db import database_sync_to_async
 
 from commands.cmdparser import CommandParser
 from commands.cmdhandler import GameEvents
+from game.engine import sharding
+from game.engine.admission import login_admission
+from game.engine.checkpoint import checkpointer
+from game.engine.database import database_sync_to_async
+from game.engine.hashing import password_hasher
+from game.engine.persistence import player_state_writer
+from game.engine.presence import presence
+from game.engine.protocol import encode_message, make_event
+from game.engine.resume import InvalidResumeToken, issue_token, read_token
+from game.engine.render_cache import render_cache
 from game.models import PlayerProfile
 from game.rooms.map_navigator import MapNavigator
+from game.rooms.routing import router
+from metrics.instruments import CHANNEL_LAYER_MESSAGES, COMMAND_DURATION
 
 
 logger = logging.getLogger(__name__)
@@ -24,27 +38,43 @@ logger = logging.getLogger(__name__)
 
 class GameEngine:
     groups = ["broadcast"]
-
-    def __init__(self, consumer, channel_layer) -> None:
+    # Prefix of the per room channel groups. e.g room.1
+    room_group_prefix = "room"
+    # Game events handled by the shard owning the room of the player in sharded mode
+    shard_events = {
+        GameEvents.LOOK_VALID,
+        GameEvents.SAY_VALID,
+        GameEvents.MOVE_VALID,
+        GameEvents.TRAVEL_VALID,
+        GameEvents.SHOUT_VALID,
+    }
+
+    def __init__(self, consumer, channel_layer, shard=None) -> None:
         """Initialize the game engine
 
         Args:
             consumer (AsyncWebSocketConsumer): The consumer object
             channel_layer (ChannelLayer): The channel layer object
+            shard (ShardConsumer): The shard running the engine in sharded mode.
+                None for the engine of a consumer.
         """
         logging.debug("GameEngine __init__")
         self.command_handlers = {
             GameEvents.REGISTER_VALID: self.__register_user,
             GameEvents.HELP_VALID: self.__help,
             GameEvents.LOGIN_VALID_PARAM: self.__connect_user,
+            GameEvents.RESUME_VALID: self.__resume_user,
             GameEvents.LOOK_VALID: self.__look,
             GameEvents.SAY_VALID: self.__say,
+            GameEvents.SHOUT_VALID: self.__shout,
             GameEvents.MOVE_VALID: self.__move_to,
+            GameEvents.TRAVEL_VALID: self.__travel,
             GameEvents.LOGOUT_VALID: self.__quit,
         }
 
         self.consumer = consumer
         self.channel_layer = channel_layer
+        self.shard = shard
         self.__init_state_var()
 
     def __init_state_var(self):
@@ -64,18 +94,66 @@ class GameEngine:
         self.room = None
         self.player = None
         self.username = None
+        # Channel of the shard handling the player in sharded mode
+        self.shard_channel = None
+
+    @property
+    def location(self) -> int:
+        """
+        The location id of the player. None if the user is not logged in.
+        """
+        return self.player.location if self.player else None
+
+    def restore_session(self, username: str, player: PlayerProfile) -> None:
+        """
+        Restores the state of a logged in player, without accessing the database.
+        Used by the shards, the player is logged in by the consumer.
+
+        Args:
+            username (str): The name of the player
+            player (PlayerProfile): The player profile
+        """
+        self.is_user_authenticated = True
+        self.username = username
+        self.player = player
+        self.room = MapNavigator.get_room(player.location)
+
+    def sync_location(self, location: int) -> None:
+        """
+        Updates the location of the player from the shard handling the player.
+        Used in sharded mode, where the moves are handled by the shards.
+
+        Args:
+            location (int): The location id
+        """
+        if self.is_user_authenticated and location is not None:
+            self.player.location = location
+            self.room = MapNavigator.get_room(location)
+
+    @staticmethod
+    def get_room_group(location: int) -> str:
+        """
+        Gets the name of the channel group for the given room
+
+        Args:
+            location (int): The location id
+
+        Returns:
+            str: The name of the channel group. e.g room.1
+        """
+        return f"{GameEngine.room_group_prefix}.{location}"
 
     @database_sync_to_async
-    def __create_user(self, name: str, password: str) -> User:
+    def __create_user(self, name: str, encoded_password: str) -> User:
         """
         Create a new user
 
-        Creates a new user from the given name and password.
+        Creates a new user from the given name and hashed password.
         Also creates a new player profile for the user.
 
         Args:
             name (str): The name of the user
-            password (str): The password of the user
+            encoded_password (str): The password of the user, hashed by the password hasher
 
         Returns:
             User: The user object
@@ -83,8 +161,9 @@ class GameEngine:
         Throws:
             IntegrityError: If the user already exists
         """
-        user = User.objects.create_user(username=name, password=password)
-        user.save()
+        user = User.objects.create(
+            username=User.normalize_username(name), password=encoded_password
+        )
         # TODO : Replace creating a player profile with a signal
         player_profile = PlayerProfile.objects.create(
             user=user, is_connected=False, location=MapNavigator.get_default_room_id()
@@ -94,35 +173,47 @@ class GameEngine:
         return user
 
     @database_sync_to_async
-    def __get_user(self, name: str) -> User:
+    def __get_player(self, name: str) -> PlayerProfile:
         """
-        Get the user object for the given name
+        Gets the player profile and the user for the given name, with a single query
 
         Args:
             name (str): The name of the user
 
         Returns:
-            User: The user object
+            PlayerProfile: The player profile, with its user
+
+        Throws:
+            User.DoesNotExist: If the user does not exist
         """
-        return User.objects.get(username=name)
+        player = PlayerProfile.objects.select_related("user").filter(user__username=name).first()
+        if player is None:
+            raise User.DoesNotExist(f"User {name} does not exist")
+        return player
 
     @database_sync_to_async
-    def __get_player_profile(self, user: User) -> PlayerProfile:
+    def __get_resumable_player(self, player_id: int, session_generation: int) -> PlayerProfile:
         """
-        Gets the player profile for the given user
+        Gets the player profile and the user of a resume token, if the token is not revoked
+        and the user is active
 
         Args:
-            user (User): The user object
+            player_id (int): The id of the player profile
+            session_generation (int): The session generation of the token
 
         Returns:
-            PlayerProfile: The player profile object
+            PlayerProfile: The player profile, with its user. None if the token is revoked or
+            the user is not active
         """
-        return PlayerProfile.objects.get(user=user)
+        return (
+            PlayerProfile.objects.select_related("user")
+            .filter(pk=player_id, session_generation=session_generation, user__is_active=True)
+            .first()
+        )
 
-    @database_sync_to_async
     def __get_users_in_location(self, location: int) -> list:
         """
-        Gets the usernames of all the players in the location
+        Gets the usernames of all the players in the location from the presence registry
 
         Args:
             location (int): The location id
@@ -130,35 +221,33 @@ class GameEngine:
         Returns:
             list: The list of usernames
         """
-        players = PlayerProfile.objects.filter(location=location, is_connected=True)
-        res = []
-        for player in players:
-            res.append(
-                player.user.username,
-            )
-        return res
+        return presence.get_users_in_location(location)
 
-    @database_sync_to_async
-    def __update_player_status(self, connected: bool) -> None:
+    async def __update_player_status(self, connected: bool) -> None:
         """
-        Update the player status
+        Update the player status. The change is written by the write-behind buffer.
+        The connected players are checkpointed periodically.
 
         Args:
             connected (bool): The status of the player (connected or disconnected)
         """
         self.player.is_connected = connected
-        self.player.save()
+        if connected:
+            checkpointer.add(self.player)
+            await player_state_writer.save(self.player, "is_connected", "checkpointed_at")
+        else:
+            checkpointer.remove(self.player)
+            await player_state_writer.save(self.player, "is_connected")
 
-    @database_sync_to_async
-    def __update_location(self, location: int) -> None:
+    async def __update_location(self, location: int) -> None:
         """
-        Update the location of the player
+        Update the location of the player. The change is written by the write-behind buffer.
 
         Args:
             location (int): The location id
         """
         self.player.location = location
-        self.player.save()
+        await player_state_writer.save(self.player, "location")
 
     async def __create(self, name: str, password: str) -> None:
         """
@@ -168,10 +257,13 @@ class GameEngine:
             name (str): The name of the user
             password (str): The password of the user
         """
-        user = await self.__create_user(name, password)
+        # The password is hashed outside of the database threads
+        encoded_password = await password_hasher.make_password(password)
+        user = await self.__create_user(name, encoded_password)
         if user:
             await self.__send_message_to_client(
-                f"<b>{name}</b> user has been created. Please login using the same credentials."
+                f"<b>{escape(name)}</b> user has been created. "
+                "Please login using the same credentials."
             )
         else:
             await self.__send_message_to_client(
@@ -197,32 +289,32 @@ class GameEngine:
         # Results in conflicts in the game state
         # Need to implement a way to handle the state of the game in a single session
         logger.debug(f"Login request for {name}")
-        user = await self.__get_user(name)
-        await login(self.consumer.scope, user)
-        if user:
-            logger.debug("User found..Authenticating..")
-            user = await database_sync_to_async(authenticate)(username=name, password=password)
-            if user and user.is_authenticated:
-                logger.debug("User authenticated..")
-
-                # Set the state variables
-                self.player = await self.__get_player_profile(user)
-                self.username = user.username
-                self.is_user_authenticated = True
-                await self.__update_player_status(True)
-                logger.debug(f"Location at the time of login :  {self.player.location}")
-
-                # Send the message to the client
-                await self.__send_message_to_client("User has been logged in : " + user.username)
-                logger.info(f"User {user.username} has logged in")
-            else:
-                logger.error(f"User <b>{name}<b> failed to login")
-                await self.__send_message_to_client("Cannot authenticate user")
+        player = await self.__get_player(name)
+        user = player.user
+        logger.debug("User found..Authenticating..")
+        # The password is checked outside of the database threads
+        is_authenticated = user.is_active and await password_hasher.check_password(
+            password, user.password
+        )
+        if is_authenticated:
+            logger.debug("User authenticated..")
+            await login(self.consumer.scope, user)
+
+            # Set the state variables
+            self.player = player
+            self.username = user.username
+            self.is_user_authenticated = True
+            await self.__update_player_status(True)
+            logger.debug(f"Location at the time of login :  {self.player.location}")
+
+            # Send the message to the client
+            await self.__send_message_to_client("User has been logged in : " + user.username)
+            logger.info(f"User {user.username} has logged in")
         else:
-            logger.error(f"User <b>{name}<b> not found")
-            await self.__send_message_to_client("Wrong username or password")
+            logger.error(f"User <b>{name}<b> failed to login")
+            await self.__send_message_to_client("Cannot authenticate user")
 
-        return user if user and user.is_authenticated else None
+        return user if is_authenticated else None
 
     async def __register_user(self, username: str, password: str) -> None:
         """
@@ -234,7 +326,8 @@ class GameEngine:
         """
         logger.info("Registering user")
         try:
-            await self.__create_new_user(username, password)
+            async with login_admission.admit(on_wait=self.__wait_for_admission):
+                await self.__create_new_user(username, password)
         except django_db.utils.IntegrityError:
             await self.__send_message_to_client(
                 "Username already taken. Please choose a different username"
@@ -249,44 +342,207 @@ class GameEngine:
             password (str): The password of the user
         """
         try:
-            user = await self.__login(username, password)
+            async with login_admission.admit(on_wait=self.__wait_for_admission):
+                user = await self.__login(username, password)
             if user:
-                self.room = MapNavigator.get_room(self.player.location)
-                await self.__send_message_to_client(
-                    f"<b># {self.room.name}<b> <br><br> {self.room.desc}"
-                )
-                # Broadcast the message to all the users
-                await self.channel_layer.group_send(
-                    GameEngine.groups[0],
-                    {
-                        "type": "message.broadcast",
-                        "message": f"<b>{self.username}<b> has joined the game",
-                    },
-                )
+                await self.__start_session()
         except User.DoesNotExist as e:
             logger.exception(f"User {username} does not exist")
             # Reset the user
             self.__init_state_var()
             await self.__send_message_to_client(
-                f"Cannot connect user {username}. Please check the credentials"
+                f"Cannot connect user {escape(username)}. Please check the credentials"
             )
 
-    async def __say(self, message: str) -> None:
+    async def __wait_for_admission(self, position: int) -> None:
         """
-        Send a message to all the active users in the user's location
+        Tells the user to wait for their turn to login or register
 
         Args:
-            message (str): Message to be sent
+            position (int): The position of the user in the admission queue
+        """
+        await self.__send_message_to_client(
+            f"The server is busy. Please wait, you are number {position} in the queue"
+        )
+
+    async def __resume_user(self, token: str) -> None:
+        """
+        Connect the user to the game with a resume token, without checking the password
+
+        Args:
+            token (str): The resume token issued on connect
+        """
+        try:
+            player_id, session_generation = read_token(token)
+            player = await self.__get_resumable_player(player_id, session_generation)
+        except InvalidResumeToken:
+            player = None
+        if player is None:
+            logger.info("Cannot resume a session with an invalid, expired or revoked token")
+            await self.__send_message_to_client(
+                "Cannot resume the session. Please connect using your credentials"
+            )
+            return
+
+        await login(self.consumer.scope, player.user)
+        self.player = player
+        self.username = player.user.username
+        self.is_user_authenticated = True
+        await self.__update_player_status(True)
+        await self.__send_message_to_client("User has been logged in : " + self.username)
+        logger.info(f"User {self.username} has resumed the session")
+        await self.__start_session()
+
+    async def __start_session(self) -> None:
+        """
+        Issues a resume token to the logged in player, and enters the player into the world
+        """
+        token = issue_token(self.player)
+        # The client reads the token from its own field, never from the text of the messages
+        await self.consumer.send_frame(
+            encode_message(
+                f"Type <b>resume {token}</b> to reconnect without your password",
+                resume_token=token,
+            )
+        )
+        if sharding.regions:
+            await self.__enter_shard()
+        else:
+            await self.enter_world()
+
+    async def enter_world(self) -> None:
+        """
+        Enters the logged in player into the room of the player, and announces it to all the users
+        """
+        if MapNavigator.get_room(self.player.location) is None:
+            # The room of the player was removed from the world while the player was away
+            await self.__update_location(MapNavigator.get_default_room_id())
+        presence.add(self.username, self.player.location)
+        self.room = MapNavigator.get_room(self.player.location)
+        await self.__join_room(self.room.id)
+        await self.__send_message_to_client(render_cache.get_frame(self.room).connect)
+        # Broadcast the message to all the users
+        await self.__group_send(
+            GameEngine.groups[0],
+            make_event("message.broadcast", f"<b>{escape(self.username)}<b> has joined the game"),
+        )
+
+    async def enter_room(self) -> None:
+        """
+        Enters the player handed off by another shard into the room of the player
+        """
+        presence.add(self.username, self.player.location)
+        self.room = MapNavigator.get_room(self.player.location)
+        await self.__join_room(self.room.id)
+        await self.__send_message_to_client(render_cache.get_frame(self.room).move)
+
+    async def leave_world(self) -> None:
+        """
+        Removes the player from the room of the player, and announces it to all the users
         """
-        await self.channel_layer.group_send(
+        await self.__group_send(
             GameEngine.groups[0],
+            make_event("message.broadcast", f"<b>{escape(self.username)}<b> has left the game"),
+        )
+        await self.__leave_room(self.player.location)
+        presence.remove(self.username)
+
+    async def relocate(self) -> None:
+        """
+        Moves the player to the default room if the room of the player was removed from the
+        world by a reload. Does nothing if the room still exists.
+        """
+        if not self.is_user_authenticated or self.shard_channel:
+            return
+        old_location = self.player.location
+        if MapNavigator.get_room(old_location) is not None:
+            return
+        new_location = MapNavigator.get_default_room_id()
+        logger.info(f"Relocating {self.username} from the removed room {old_location}")
+        await self.__leave_room(old_location)
+        await self.__join_room(new_location)
+        await self.__update_location(new_location)
+        presence.move(self.username, new_location)
+        self.room = MapNavigator.get_room(new_location)
+        await self.__send_message_to_client(
+            "The world has changed, and the room you were in is gone. You were moved to safety."
+        )
+        await self.__send_message_to_client(render_cache.get_frame(self.room).move)
+
+    async def __relocate_from_removed_room(self) -> bool:
+        """
+        Relocates the player if the room of the player was removed by a reload, and the
+        player was not relocated yet.
+
+        Returns:
+            bool: True if the player was relocated
+        """
+        if MapNavigator.get_room(self.player.location) is not None:
+            return False
+        await self.relocate()
+        return True
+
+    async def __enter_shard(self) -> None:
+        """
+        Sends the logged in player to the shard owning the room of the player
+        """
+        self.room = MapNavigator.get_room(self.player.location)
+        self.shard_channel = sharding.get_shard_channel(
+            sharding.regions.get_shard(self.player.location)
+        )
+        await self.channel_layer.send(
+            self.shard_channel,
             {
-                "type": "message.location",
+                "type": "player.enter",
+                "reply_channel": self.consumer.channel_name,
+                "username": self.username,
+                "player_id": self.player.pk,
                 "location": self.player.location,
-                "message": f"<b>{self.username}</b> says <i>{message}<i>",
             },
         )
 
+    async def __say(self, message: str) -> None:
+        """
+        Send a message to all the active users in the user's location
+
+        Args:
+            message (str): Message to be sent
+        """
+        await self.__group_send(
+            GameEngine.get_room_group(self.player.location),
+            make_event(
+                "message.location",
+                f"<b>{escape(self.username)}</b> says <i>{escape(message)}<i>",
+                location=self.player.location,
+            ),
+        )
+
+    async def __shout(self, message: str) -> None:
+        """
+        Send a message to all the active users within SHOUT_RADIUS exits of the user's location
+
+        The rooms nearby are read from the cached neighbourhood of the room, and the channel
+        group of every room nearby is sent the message, concurrently. The presence registry only
+        knows the players of this process, so it cannot tell which rooms have listeners.
+
+        Args:
+            message (str): Message to be sent
+        """
+        event = make_event(
+            "message.location", f"<b>{escape(self.username)}</b> shouts <i>{escape(message)}</i>"
+        )
+        neighbourhood = router.get_table().get_neighbourhood(
+            self.player.location, settings.SHOUT_RADIUS
+        )
+        await asyncio.gather(
+            *(
+                self.__group_send(
+                    GameEngine.get_room_group(location), {**event, "location": location}
+                )
+                for location in neighbourhood
+            )
+        )
+
     async def __move_to(self, direction: str) -> None:
         """
         Move the user to the given direction
@@ -294,14 +550,63 @@ class GameEngine:
         Args:
             direction (str): The direction to move to
         """
-        new_location = MapNavigator.move_to(self.player.location, direction)
+        if await self.__relocate_from_removed_room():
+            return
+        await self.__go_to(MapNavigator.move_to(self.player.location, direction))
+
+    async def __travel(self, room: str, summary: bool) -> None:
+        """
+        Move the user to the nearest room with the given name, along the shortest route.
+
+        The whole route is applied as a single move: only the last room is rendered, and the
+        location is updated once.
+
+        Args:
+            room (str): The name of the room to travel to
+            summary (bool): Whether to show the route taken
+        """
+        if await self.__relocate_from_removed_room():
+            return
+        table = router.get_table()
+        targets = table.get_room_ids(room)
+        if not targets:
+            await self.__send_message_to_client(f"There is no room named <b>{escape(room)}</b>")
+            return
+        route = table.find_route(self.player.location, targets)
+        if route is None:
+            await self.__send_message_to_client(f"You cannot find a way to <b>{escape(room)}</b>")
+            return
+        destination, directions = route
+        if not directions:
+            await self.__send_message_to_client(f"You are already in <b>{escape(room)}</b>")
+            return
+        if summary:
+            await self.__send_message_to_client(
+                f"You travel {', '.join(directions)} ({len(directions)} exits)"
+            )
+        await self.__go_to(destination)
+
+    async def __go_to(self, new_location: int) -> None:
+        """
+        Move the user to the given room, and show the room
+
+        Args:
+            new_location (int): The location id of the room
+        """
+        old_location = self.player.location
+        if new_location != old_location:
+            await self.__leave_room(old_location)
+            if self.shard and not self.shard.owns(new_location):
+                # The new room is in another region
+                presence.remove(self.username)
+                self.player.location = new_location
+                await self.shard.hand_off(self)
+                return
+            await self.__join_room(new_location)
         await self.__update_location(new_location)
+        presence.move(self.username, new_location)
         self.room = MapNavigator.get_room(new_location)
-        message = f"""
-        <br><b># {self.room.name}<b><br>
-        <br>{self.room.desc}
-        """
-        await self.__send_message_to_client(message)
+        await self.__send_message_to_client(render_cache.get_frame(self.room).move)
 
     async def __look(self):
         """
@@ -309,32 +614,37 @@ class GameEngine:
         players in the room and the exits available
         """
         logger.info(f"Location is: {self.player.location}")
-        players = await self.__get_users_in_location(self.player.location)
-        players = " ".join(players)
-        await self.__send_message_to_client(
-            f"""
-            <br><b>{self.room.name}</b>
-            <br>{self.room.desc}
-            <br><b>Players</b>: {players}
-            <br><b>Exits</b>: {MapNavigator.get_printable_exits(self.room)}
-            """
-        )
+        if await self.__relocate_from_removed_room():
+            return
+        players = self.__get_users_in_location(self.player.location)
+        players = " ".join(escape(player) for player in players)
+        await self.__send_message_to_client(render_cache.get_frame(self.room).look(players))
 
     async def __quit(self):
         """
-        Quits the game/disconnects the user
+        Quits the game/disconnects the user. Revokes the resume tokens of the player
         """
-        await self.channel_layer.group_send(
-            GameEngine.groups[0],
-            {
-                "type": "message.broadcast",
-                "message": f"<b>{self.username}<b> has left the game",
-            },
-        )
+        self.player.session_generation += 1
+        await player_state_writer.save(self.player, "session_generation")
+        await self.__leave_game()
+        await self.__send_message_to_client("You have been logged out")
+
+    async def __leave_game(self):
+        """
+        Removes the player from the world and logs out the user
+        """
+        if self.shard_channel:
+            await self.channel_layer.send(
+                self.shard_channel,
+                {"type": "player.leave", "reply_channel": self.consumer.channel_name},
+            )
+        else:
+            await self.leave_world()
         await logout(self.consumer.scope)
         await self.__update_player_status(False)
+        # Persist the state of the player before the session ends
+        await player_state_writer.flush_async()
         self.__init_state_var()
-        await self.__send_message_to_client("You have been logged out")
 
     async def handle_command(self, text_data: str) -> None:
         """
@@ -343,18 +653,30 @@ class GameEngine:
         Args:
             text_data (str): The command sent by the user
         """
+        started_at = time.perf_counter()
         text_data_json = json.loads(text_data)
         message = text_data_json["message"]
 
         command_event, args = CommandParser.parse_command(message, self.is_user_authenticated)
-        # Convert it to lower case to make it case insensitive
-        if command_event in self.command_handlers:
-            command_handler = self.command_handlers[command_event]
-            logger.debug(f"Command handler for {command_event} is {command_handler}")
-            await command_handler(**args)
-        else:
-            logger.debug(f"Command {command_event} not found")
-            await self.__invalid_command(message)
+        try:
+            if self.shard_channel and command_event in GameEngine.shard_events:
+                await self.channel_layer.send(
+                    self.shard_channel,
+                    {
+                        "type": "player.command",
+                        "reply_channel": self.consumer.channel_name,
+                        "text": text_data,
+                    },
+                )
+            elif command_event in self.command_handlers:
+                command_handler = self.command_handlers[command_event]
+                logger.debug(f"Command handler for {command_event} is {command_handler}")
+                await command_handler(**args)
+            else:
+                logger.debug(f"Command {command_event} not found")
+                await self.__invalid_command(message)
+        finally:
+            COMMAND_DURATION.labels(command_event).observe(time.perf_counter() - started_at)
 
     async def on_disconnect(self, close_code: int):
         """
@@ -363,10 +685,46 @@ class GameEngine:
         Args:
             close_code (int): The close code of the connection
         """
-        # Log out the user if they are logged in
+        # Log out the user if they are logged in. The resume tokens stay valid to reconnect
         if self.is_user_authenticated:
             logger.debug("User is authenticated..Logging out on disconnect")
-            await self.__quit()
+            await self.__leave_game()
+
+    async def __group_send(self, group: str, event: dict) -> None:
+        """
+        Sends the event to the channel group
+
+        Args:
+            group (str): The name of the channel group
+            event (dict): The event. The type of the event is the name of the consumer handler.
+                See protocol.make_event()
+        """
+        CHANNEL_LAYER_MESSAGES.labels(event["type"]).inc()
+        await self.channel_layer.group_send(group, event)
+
+    async def __join_room(self, location: int) -> None:
+        """
+        Adds the consumer to the channel group of the room
+
+        Args:
+            location (int): The location id
+        """
+        logger.debug(f"Joining room group of {location}")
+        await self.channel_layer.group_add(
+            GameEngine.get_room_group(location), self.consumer.channel_name
+        )
+
+    async def __leave_room(self, location: int) -> None:
+        """
+        Removes the consumer from the channel group of the room
+
+        Args:
+            location (int): The location id
+        """
+        logger.debug(f"Leaving room group of {location}")
+        await self.channel_layer.group_discard(
+            GameEngine.get_room_group(location), self.consumer.channel_name
+        )
 
     async def __broadcast_message(self, message: str) -> None:
         """
@@ -376,7 +734,7 @@ class GameEngine:
             message (str): The message to be broadcasted
         """
         logger.debug(f"Broadcasting message : {message}")
-        await self.consumer.send(text_data=json.dumps({"message": message}))
+        await self.consumer.send_frame(encode_message(message))
 
     async def __send_message_to_client(self, message: str) -> None:
         """
@@ -386,7 +744,7 @@ class GameEngine:
             message (str): The message to be sent
         """
         logger.debug(f"Sending message to client : {message}")
-        await self.consumer.send(text_data=json.dumps({"message": message}))
+        await self.consumer.send_frame(encode_message(message))
 
     async def __create_new_user(self, name: str, password: str) -> None:
         """Creates a new user
@@ -414,5 +772,7 @@ class GameEngine:
         Args:
             message (str): The message to be sent
         """
-        error_message = f"""Command <b>{message}</b> is not available. Type "help" for help."""
+        error_message = (
+            f"""Command <b>{escape(message)}</b> is not available. Type "help" for help."""
+        )
         await self.__send_message_to_client(error_message)
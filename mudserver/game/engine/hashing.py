@@ -0,0 +1,104 @@
+"""
+Class to hash the passwords outside of the event loop and the database threads.
+
+Hashing a password (PBKDF2 by default) keeps a CPU busy for a long time while holding the
+GIL. Run in the database threads, a storm of logins would starve the database calls of the
+connected players. The passwords are hashed in a dedicated, bounded process pool instead.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from metrics.instruments import PASSWORD_HASH_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker() -> None:
+    """
+    Sets up Django in a worker process of the pool, to load the password hashers.
+    """
+    django.setup()
+
+
+class PasswordHasher:
+    """
+    Hashes and checks the passwords in a process pool.
+
+    The pool is started on first use with PASSWORD_HASHER_PROCESSES processes. When the setting
+    is 0 (e.g in the tests), the passwords are hashed in a thread outside of the database threads.
+
+    Attributes:
+        pool: The process pool. None until the first password is hashed.
+    """
+
+    def __init__(self) -> None:
+        self.pool = None
+
+    async def make_password(self, password: str) -> str:
+        """
+        Hashes the password.
+
+        Args:
+            password (str): The raw password.
+
+        Returns:
+            str: The encoded password, stored in the user model.
+        """
+        return await self.__run("make_password", hashers.make_password, password)
+
+    async def check_password(self, password: str, encoded: str) -> bool:
+        """
+        Checks the password against the encoded password.
+
+        Args:
+            password (str): The raw password.
+            encoded (str): The encoded password stored in the user model.
+
+        Returns:
+            bool: True if the password is correct.
+        """
+        return await self.__run("check_password", hashers.check_password, password, encoded)
+
+    def shutdown(self) -> None:
+        """
+        Stops the processes of the pool.
+        """
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def __run(self, operation: str, func, *args):
+        """
+        Runs the hashing function in the pool and times it.
+
+        Args:
+            operation (str): The name of the operation, used in the metrics.
+            func (callable): The hashing function.
+            args: The arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        started_at = time.perf_counter()
+        try:
+            if not settings.PASSWORD_HASHER_PROCESSES:
+                return await sync_to_async(func, thread_sensitive=False)(*args)
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHER_PROCESSES, initializer=init_worker
+                )
+                logger.info(f"Started {settings.PASSWORD_HASHER_PROCESSES} password hashers")
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+
+
+# Password hasher of the process
+password_hasher = PasswordHasher()
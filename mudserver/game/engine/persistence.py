@@ -0,0 +1,150 @@
+"""
+Class to persist the state of the players.
+
+The player state (location, connection status) changes on almost every command. Instead of
+saving the player profile on every change, the changed fields are collected in a write-behind
+buffer and written to the database in batches.
+"""
+import logging
+
+from django.conf import settings
+
+from game.engine.database import database_sync_to_async
+from game.models import PlayerProfile
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerStateWriter:
+    """
+    Write-behind buffer for the player profiles.
+
+    The buffer is flushed when the number of dirty players reaches the flush size, every flush
+    interval, or when a flush is forced (e.g on logout or on shutdown). Only the changed fields
+    are written, with one bulk update for each set of changed fields.
+
+    The periodic flushes are run by the tick scheduler. See game.engine.ticker.
+
+    Attributes:
+        flush_interval: The number of seconds between the periodic flushes.
+        flush_size: The number of dirty players that triggers a flush.
+        pending: Maps the player profile id to the player profile and its changed fields.
+    """
+
+    def __init__(self, flush_interval: float, flush_size: int) -> None:
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.pending = {}
+
+    def mark_dirty(self, player: PlayerProfile, *fields: str) -> None:
+        """
+        Marks the fields of the player profile as changed.
+
+        Args:
+            player (PlayerProfile): The player profile.
+            fields (str): The names of the changed fields.
+        """
+        _, dirty_fields = self.pending.setdefault(player.pk, (player, set()))
+        dirty_fields.update(fields)
+
+    def take(self, player: PlayerProfile) -> set:
+        """
+        Removes the changes of the player profile from the buffer, without writing them.
+
+        Used when another process takes over the player, along with its changes.
+
+        Args:
+            player (PlayerProfile): The player profile.
+
+        Returns:
+            set: The names of the changed fields.
+        """
+        _, dirty_fields = self.pending.pop(player.pk, (player, set()))
+        return dirty_fields
+
+    async def save(self, player: PlayerProfile, *fields: str) -> None:
+        """
+        Schedules the changed fields of the player profile to be written.
+
+        Args:
+            player (PlayerProfile): The player profile.
+            fields (str): The names of the changed fields.
+        """
+        self.mark_dirty(player, *fields)
+        if len(self.pending) >= self.flush_size:
+            await self.flush_async()
+
+    async def flush_async(self) -> int:
+        """
+        Writes the pending changes to the database from the event loop.
+
+        Returns:
+            int: The number of written player profiles.
+        """
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        try:
+            return await database_sync_to_async(self.__write)(pending)
+        except Exception:
+            # Put back in the event loop, which owns the buffer
+            self.__restore(pending)
+            return 0
+
+    def flush(self) -> int:
+        """
+        Writes the pending changes to the database. Used on shutdown.
+
+        Returns:
+            int: The number of written player profiles.
+        """
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        try:
+            return self.__write(pending)
+        except Exception:
+            self.__restore(pending)
+            return 0
+
+    def __restore(self, pending: dict) -> None:
+        """
+        Puts the changes that could not be written back into the buffer.
+
+        Args:
+            pending (dict): Maps the player profile id to the player profile and its changed fields.
+        """
+        logger.exception(f"Cannot write the state of {len(pending)} players")
+        for player, fields in pending.values():
+            self.mark_dirty(player, *fields)
+
+    def __write(self, pending: dict) -> int:
+        """
+        Writes the changes with one bulk update for each set of changed fields.
+
+        Runs in the database executor, so the buffer is not touched: the callers put the
+        changes back into the buffer if they cannot be written.
+
+        Args:
+            pending (dict): Maps the player profile id to the player profile and its changed fields.
+
+        Returns:
+            int: The number of written player profiles.
+
+        Throws:
+            Exception: If the changes cannot be written.
+        """
+        batches = {}
+        for player, fields in pending.values():
+            batches.setdefault(frozenset(fields), []).append(player)
+        for fields, players in batches.items():
+            PlayerProfile.objects.bulk_update(players, sorted(fields))
+        logger.debug(f"Wrote the state of {len(pending)} players")
+        return len(pending)
+
+
+# Write-behind buffer of the process
+player_state_writer = PlayerStateWriter(
+    flush_interval=settings.PLAYER_STATE_FLUSH_INTERVAL,
+    flush_size=settings.PLAYER_STATE_FLUSH_SIZE,
+)
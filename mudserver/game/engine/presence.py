@@ -0,0 +1,197 @@
+"""
+Class to keep track of the players connected to the server.
+
+The presence registry is an in-memory index of the connected players in every room.
+The game engine updates the registry whenever a player logs in, moves or logs out, so
+the players in a room can be listed without accessing the database.
+
+Every process starts with an empty registry, fed only by the game engines of its own
+consumers. The PlayerProfile table is not loaded: it also lists the players of the other
+processes, and the players left behind by a crash, which would never be removed. For the
+same reason, the registry is only compared with the rows of its own players: the recovery
+pass (see game.engine.checkpoint) checks them against the database and logs the mismatches.
+"""
+import logging
+
+from game.engine.database import database_sync_to_async
+from game.models import PlayerProfile
+from metrics.instruments import PLAYERS_ONLINE
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceRegistry:
+    """
+    In-memory index of the connected players.
+
+    The players of a room are kept in a dict used as an ordered set, so the players
+    are listed in the order they entered the room.
+
+    Attributes:
+        rooms: Maps the room id to the usernames of the connected players in the room.
+        locations: Maps the username to the room id of the connected player.
+    """
+
+    def __init__(self) -> None:
+        self.rooms = {}
+        self.locations = {}
+
+    def add(self, username: str, location: int) -> None:
+        """
+        Adds a connected player to the given location.
+
+        Args:
+            username (str): The name of the player.
+            location (int): The location id.
+        """
+        self.remove(username)
+        self.rooms.setdefault(location, {})[username] = None
+        self.locations[username] = location
+
+    def move(self, username: str, location: int) -> None:
+        """
+        Moves a connected player to the given location.
+
+        Args:
+            username (str): The name of the player.
+            location (int): The id of the new location.
+        """
+        if self.locations.get(username) != location:
+            self.add(username, location)
+
+    def remove(self, username: str) -> None:
+        """
+        Removes a player from the registry. Does nothing if the player is not connected.
+
+        Args:
+            username (str): The name of the player.
+        """
+        location = self.locations.pop(username, None)
+        if location is None:
+            return
+        players = self.rooms[location]
+        del players[username]
+        if not players:
+            del self.rooms[location]
+
+    def get_users_in_location(self, location: int) -> list:
+        """
+        Gets the usernames of all the connected players in the location.
+
+        Args:
+            location (int): The location id.
+
+        Returns:
+            list: The list of usernames.
+        """
+        return list(self.rooms.get(location, ()))
+
+    def load(self, players: dict) -> None:
+        """
+        Replaces the content of the registry.
+
+        Args:
+            players (dict): Maps the username to the location id of the connected players.
+        """
+        self.rooms = {}
+        self.locations = {}
+        for username, location in players.items():
+            self.add(username, location)
+
+    def check_consistency(self, players: dict, locations: dict = None) -> dict:
+        """
+        Compares the registry with the given connected players.
+
+        Args:
+            players (dict): Maps the username to the location id of the connected players.
+            locations (dict): The content of the registry to compare. Defaults to the
+                current content.
+
+        Returns:
+            dict: Maps the username of every mismatching player to a tuple of the location
+            in the registry and the given location. The location is None when the player
+            is missing on one of the sides.
+        """
+        if locations is None:
+            locations = self.locations
+        mismatches = {}
+        for username in locations.keys() | players.keys():
+            registry_location = locations.get(username)
+            location = players.get(username)
+            if registry_location != location:
+                mismatches[username] = (registry_location, location)
+        return mismatches
+
+    @staticmethod
+    def get_connected_players(usernames: list) -> dict:
+        """
+        Gets the given players from the database with a single query, if they are connected.
+
+        Args:
+            usernames (list): The usernames of the players.
+
+        Returns:
+            dict: Maps the username to the location id of the connected players.
+        """
+        return dict(
+            PlayerProfile.objects.filter(
+                is_connected=True, user__username__in=usernames
+            ).values_list("user__username", "location")
+        )
+
+    def check_database_consistency(self) -> dict:
+        """
+        Compares the players of the registry with their rows in the PlayerProfile table.
+
+        Returns:
+            dict: The mismatching players. See check_consistency().
+        """
+        if not self.locations:
+            return {}
+        players = PresenceRegistry.get_connected_players(list(self.locations))
+        return self.__report(self.check_consistency(players))
+
+    async def check_database_consistency_async(self) -> dict:
+        """
+        Compares the players of the registry with their rows in the PlayerProfile table,
+        from the event loop.
+
+        The players who logged in, moved or logged out during the query are not compared.
+
+        Returns:
+            dict: The mismatching players. See check_consistency().
+        """
+        locations = dict(self.locations)
+        if not locations:
+            return {}
+        players = await database_sync_to_async(PresenceRegistry.get_connected_players)(
+            list(locations)
+        )
+        mismatches = self.check_consistency(players, locations)
+        return self.__report(
+            {
+                username: mismatch
+                for username, mismatch in mismatches.items()
+                if self.locations.get(username) == locations[username]
+            }
+        )
+
+    @staticmethod
+    def __report(mismatches: dict) -> dict:
+        """
+        Logs the mismatches between the registry and the database.
+
+        Args:
+            mismatches (dict): The mismatching players.
+
+        Returns:
+            dict: The mismatching players.
+        """
+        if mismatches:
+            logger.warning(f"Presence registry does not match the database: {mismatches}")
+        return mismatches
+
+
+# Presence registry of the process
+presence = PresenceRegistry()
+PLAYERS_ONLINE.set_function(lambda: len(presence.locations))
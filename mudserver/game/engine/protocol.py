@@ -0,0 +1,107 @@
+"""
+Functions to encode the messages sent to the clients.
+
+Every message sent to a client is a JSON object carrying the message text. A message is
+encoded once by its sender. Broadcast events carry the encoded frame, and the consumers
+forward the frame as-is to their client instead of encoding the message again.
+
+Several frames can be batched into a single frame carrying the list of messages.
+e.g {"messages": ["first message", "second message"]}
+
+A few frames carry data for the client in fields next to the message text, e.g the resume
+token. The client reads the data from the fields only, never from the message texts, which
+can hold the text of the other players.
+e.g {"resume_token": "...", "message": "..."}
+"""
+import json
+
+# Start of every encoded frame, followed by the encoded message text and a closing brace
+MESSAGE_PREFIX = '{"message": '
+
+
+def encode_message(message: str, **fields) -> str:
+    """
+    Encodes a message into a websocket frame.
+
+    Args:
+        message (str): The message text.
+        fields: The data fields of the frame. e.g resume_token="..."
+
+    Returns:
+        str: The encoded frame. e.g {"message": "You have been logged out"}
+    """
+    if fields:
+        # The frame does not start with MESSAGE_PREFIX, so it is not copied as a plain message
+        return json.dumps({**fields, "message": message})
+    return MESSAGE_PREFIX + json.dumps(message) + "}"
+
+
+def decode_frames(frames: list) -> tuple:
+    """
+    Decodes the message texts and the data fields of encoded frames.
+
+    Args:
+        frames (list): The encoded frames.
+
+    Returns:
+        tuple: The list of the message texts, and the dict of the data fields of all the frames.
+    """
+    messages = []
+    fields = {}
+    for frame in frames:
+        data = json.loads(frame)
+        messages.append(data.pop("message"))
+        fields.update(data)
+    return messages, fields
+
+
+def make_event(event_type: str, message: str, **fields) -> dict:
+    """
+    Creates a channel layer event carrying an encoded message.
+
+    Args:
+        event_type (str): The type of the event. The type is the name of the consumer handler.
+        message (str): The message text.
+        fields: Additional fields of the event. e.g location=1
+
+    Returns:
+        dict: The event. e.g {"type": "message.broadcast", "frame": '{"message": "..."}'}
+    """
+    return {"type": event_type, "frame": encode_message(message), **fields}
+
+
+def coalesce_frames(frames: list) -> str:
+    """
+    Merges encoded frames into a single frame.
+
+    The messages are joined with line breaks, so the client displays the merged
+    message like the separate messages.
+
+    Args:
+        frames (list): The encoded frames.
+
+    Returns:
+        str: The encoded frame carrying all the messages, and the data fields of the frames.
+    """
+    messages, fields = decode_frames(frames)
+    return encode_message("<br>".join(messages), **fields)
+
+
+def encode_batch(frames: list) -> str:
+    """
+    Batches encoded frames into a single frame carrying the list of messages.
+
+    The encoded message texts are copied from the frames, without decoding them, unless a
+    frame carries data fields.
+
+    Args:
+        frames (list): The frames encoded by encode_message().
+
+    Returns:
+        str: The encoded frame. e.g {"messages": ["first message", "second message"]}
+    """
+    if not all(frame.startswith(MESSAGE_PREFIX) for frame in frames):
+        messages, fields = decode_frames(frames)
+        return json.dumps({**fields, "messages": messages})
+    start = len(MESSAGE_PREFIX)
+    return '{"messages": [' + ", ".join(frame[start:-1] for frame in frames) + "]}"
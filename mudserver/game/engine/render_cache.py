@@ -0,0 +1,128 @@
+"""
+Class to cache the rendered texts of the rooms.
+
+The name, the description and the exits of a room do not change while the world is loaded,
+so the texts describing a room are rendered once, the first time they are needed. Only the
+list of players is added when a player looks around.
+"""
+import logging
+from dataclasses import dataclass
+
+import game.rooms.map_navigator as map_navigator
+from game.engine import format_texts
+from game.rooms.map_navigator import MapNavigator, Room, WorldGraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RoomFrame:
+    """
+    Class to represent the rendered texts of a room.
+
+    Attributes:
+        connect: The text sent when the player connects to the game in the room.
+        move: The text sent when the player moves to the room.
+        look_head: The text sent on look before the players in the room.
+        look_tail: The text sent on look after the players in the room.
+    """
+
+    connect: str
+    move: str
+    look_head: str
+    look_tail: str
+
+    def look(self, players: str) -> str:
+        """
+        Renders the text sent on look.
+
+        Args:
+            players (str): The players in the room.
+
+        Returns:
+            str: The text describing the room and its players.
+        """
+        return self.look_head + players + self.look_tail
+
+
+def render_room(room: Room) -> RoomFrame:
+    """
+    Renders the static texts of the room.
+
+    Args:
+        room (Room): The room to render.
+
+    Returns:
+        RoomFrame: The rendered texts of the room.
+    """
+    return RoomFrame(
+        connect=format_texts.room_connect_text.format(name=room.name, desc=room.desc),
+        move=format_texts.room_move_text.format(name=room.name, desc=room.desc),
+        look_head=format_texts.room_look_head_text.format(name=room.name, desc=room.desc),
+        look_tail=format_texts.room_look_tail_text.format(
+            exits=MapNavigator.get_printable_exits(room)
+        ),
+    )
+
+
+class RoomRenderCache:
+    """
+    Cache of the rendered texts of the rooms.
+
+    The texts of a room are rendered on the first access, so a large world is not rendered up
+    front. The cache is reloaded as soon as the map navigator uses another world.
+
+    Attributes:
+        world: The world that the texts were rendered from.
+        frames: Maps the room id to the rendered texts of the room.
+    """
+
+    def __init__(self) -> None:
+        self.world = None
+        self.frames = {}
+
+    def load(self, world: WorldGraph) -> None:
+        """
+        Drops the texts of the previous world, to render the rooms of the world.
+
+        Args:
+            world (WorldGraph): The world to render.
+        """
+        self.frames = {}
+        self.world = world
+        logger.info(f"Rendering the rooms of a world of {len(world.rooms)} rooms")
+
+    def invalidate(self) -> None:
+        """
+        Drops the rendered texts. They are rendered again on the next access.
+        """
+        self.world = None
+        self.frames = {}
+
+    def get_frame(self, room: Room) -> RoomFrame:
+        """
+        Gets the rendered texts of the room.
+
+        The world can be swapped while a player enters a room. A room missing from the world of
+        the map navigator, e.g removed by a reload, is rendered again on every access, without
+        being cached.
+
+        Args:
+            room (Room): The room.
+
+        Returns:
+            RoomFrame: The rendered texts of the room.
+        """
+        if self.world is not map_navigator.world:
+            self.load(map_navigator.world)
+        frame = self.frames.get(room.id)
+        if frame is None:
+            current_room = self.world.rooms.get(room.id)
+            if current_room is None:
+                return render_room(room)
+            frame = self.frames[room.id] = render_room(current_room)
+        return frame
+
+
+# Render cache of the process
+render_cache = RoomRenderCache()
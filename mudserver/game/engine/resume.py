@@ -0,0 +1,57 @@
+"""
+Functions to issue and read the session resume tokens.
+
+A player gets a resume token on connect. A reconnecting client presents the token with the
+resume command, instead of the password, so the server does not hash the password again.
+The token is signed with the secret key and expires after RESUME_TOKEN_MAX_AGE seconds.
+It carries the session generation of the player profile, which is incremented on quit to
+revoke all the tokens issued before.
+"""
+from django.conf import settings
+from django.core import signing
+
+from game.models import PlayerProfile
+
+# Salt of the signatures, so a token cannot be used in place of other signed values
+SALT = "game.engine.resume"
+
+
+class InvalidResumeToken(Exception):
+    """
+    Raised when a resume token is malformed, tampered with or expired.
+    """
+
+
+def issue_token(player: PlayerProfile) -> str:
+    """
+    Issues a resume token for the current session of the player.
+
+    Args:
+        player (PlayerProfile): The player profile.
+
+    Returns:
+        str: The signed token.
+    """
+    return signing.dumps([player.pk, player.session_generation], salt=SALT)
+
+
+def read_token(token: str) -> tuple:
+    """
+    Reads a resume token, without accessing the database.
+
+    Args:
+        token (str): The signed token.
+
+    Returns:
+        tuple: The id of the player profile and the session generation of the token.
+
+    Throws:
+        InvalidResumeToken: If the token is malformed, tampered with or expired.
+    """
+    try:
+        player_id, session_generation = signing.loads(
+            token, salt=SALT, max_age=settings.RESUME_TOKEN_MAX_AGE
+        )
+    except (signing.BadSignature, TypeError, ValueError) as e:
+        raise InvalidResumeToken(str(e)) from e
+    return player_id, session_generation
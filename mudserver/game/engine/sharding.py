@@ -0,0 +1,246 @@
+"""
+Classes to run the world in shards.
+
+In sharded mode, the rooms are partitioned into regions (see game.rooms.regions), and every
+region is owned by a shard: a worker process listening on the channel of the shard. The
+websocket consumers only authenticate the players. Once a player enters the world, the
+commands of the player are sent to the shard owning the room of the player, which runs them
+with its own game engine and sends the messages back to the consumer.
+
+When a player moves to a room of another region, the shard hands the player off to the
+shard owning the new room, and tells the consumer to send the next commands there. The
+commands still in flight to the old shard are forwarded to the new one.
+
+The shards are run with the runshard management command.
+"""
+import logging
+
+from django.conf import settings
+
+from channels.consumer import AsyncConsumer
+
+from game.engine.persistence import player_state_writer
+from game.models import PlayerProfile
+from game.rooms import map_navigator
+from game.rooms.regions import partition_world, restrict_world
+from game.rooms.routing import router
+
+logger = logging.getLogger(__name__)
+
+
+def load_region(shard: int) -> None:
+    """
+    Restricts the world of the map navigator to the region of a shard and the rooms next to it.
+
+    The routes of the travel command, and the rooms reached by a shout, are still found on the
+    whole world. A player travelling out of the region is handed off to the shard owning the
+    destination.
+
+    Args:
+        shard (int): The number of the shard
+    """
+    router.world = map_navigator.world
+    map_navigator.world = restrict_world(map_navigator.world, regions.get_rooms(shard))
+
+
+def get_shard_channel(shard: int) -> str:
+    """
+    Gets the name of the channel the shard listens on
+
+    Args:
+        shard (int): The shard number
+
+    Returns:
+        str: The name of the channel. e.g shard-0
+    """
+    return f"shard-{shard}"
+
+
+class RemoteClient:
+    """
+    Stands in for the websocket consumer of a player handled by a shard.
+
+    The messages to the client are sent to the channel of its consumer, with the location
+    of the player, so the consumer keeps track of the room of the player.
+
+    Attributes:
+        channel_layer: The channel layer.
+        channel_name: The channel of the consumer. Joins the channel groups of the rooms.
+        scope: Empty, the session of the player is handled by the consumer.
+        game_engine: The game engine of the player in the shard.
+    """
+
+    def __init__(self, channel_layer, channel_name: str) -> None:
+        self.channel_layer = channel_layer
+        self.channel_name = channel_name
+        self.scope = {}
+        self.game_engine = None
+
+    async def send_frame(self, frame: str) -> None:
+        """
+        Sends an encoded message to the consumer of the player
+
+        Args:
+            frame (str): The encoded message
+        """
+        await self.channel_layer.send(
+            self.channel_name,
+            {"type": "message.frame", "frame": frame, "location": self.game_engine.location},
+        )
+
+
+class ShardConsumer(AsyncConsumer):
+    """
+    Consumer of the channel of a shard. Handles the players in the region of the shard.
+
+    Attributes:
+        shard: The shard number.
+        sessions: Maps the channel of the consumer of each player to the game engine of the player.
+        forwards: Maps the channel of the consumer of each player handed off to another shard
+            to the new shard.
+    """
+
+    def __init__(self, shard: int) -> None:
+        super().__init__()
+        self.shard = shard
+        self.sessions = {}
+        self.forwards = {}
+
+    def owns(self, location: int) -> bool:
+        """
+        Checks whether the room is in the region of the shard
+
+        Args:
+            location (int): The location id
+
+        Returns:
+            bool: True if the shard owns the room
+        """
+        return regions.get_shard(location) == self.shard
+
+    async def player_enter(self, event):
+        """
+        Handler of a player entering the world in the region of the shard
+
+        Args:
+            event: The event carrying the channel of the consumer, the username,
+                the id of the player profile and the location
+        """
+        self.forwards.pop(event["reply_channel"], None)
+        game_engine = self.__add_session(event)
+        await game_engine.enter_world()
+
+    async def player_handoff(self, event):
+        """
+        Handler of a player handed off by another shard
+
+        Args:
+            event: The event of player_enter(), with the changed fields of the player profile
+                that are not written yet
+        """
+        self.forwards.pop(event["reply_channel"], None)
+        game_engine = self.__add_session(event)
+        player_state_writer.mark_dirty(game_engine.player, *event["dirty_fields"])
+        await game_engine.enter_room()
+
+    async def player_command(self, event):
+        """
+        Handler of a command of a player
+
+        Args:
+            event: The event carrying the channel of the consumer and the command
+        """
+        game_engine = self.sessions.get(event["reply_channel"])
+        if game_engine:
+            await game_engine.handle_command(event["text"])
+        else:
+            await self.__forward(event)
+
+    async def player_leave(self, event):
+        """
+        Handler of a player leaving the world
+
+        Args:
+            event: The event carrying the channel of the consumer
+        """
+        game_engine = self.sessions.pop(event["reply_channel"], None)
+        if game_engine:
+            await game_engine.leave_world()
+            await player_state_writer.flush_async()
+        elif await self.__forward(event):
+            del self.forwards[event["reply_channel"]]
+
+    async def hand_off(self, game_engine) -> None:
+        """
+        Hands the player off to the shard owning the location of the player
+
+        The changed fields of the player profile are handed off with the player, so only the
+        new shard writes the state of the player.
+
+        Args:
+            game_engine (GameEngine): The game engine of the player, moved out of the region
+        """
+        reply_channel = game_engine.consumer.channel_name
+        player = game_engine.player
+        shard = regions.get_shard(player.location)
+        del self.sessions[reply_channel]
+        self.forwards[reply_channel] = shard
+        dirty_fields = player_state_writer.take(player) | {"location"}
+        logger.debug(f"Handing off {game_engine.username} from shard {self.shard} to {shard}")
+        await self.channel_layer.send(
+            get_shard_channel(shard),
+            {
+                "type": "player.handoff",
+                "reply_channel": reply_channel,
+                "username": game_engine.username,
+                "player_id": player.pk,
+                "location": player.location,
+                "dirty_fields": sorted(dirty_fields),
+            },
+        )
+        await self.channel_layer.send(
+            reply_channel, {"type": "shard.route", "channel": get_shard_channel(shard)}
+        )
+
+    def __add_session(self, event):
+        """
+        Creates the game engine of a player entering the region
+
+        Args:
+            event: The event carrying the channel of the consumer, the username,
+                the id of the player profile and the location
+
+        Returns:
+            GameEngine: The game engine of the player
+        """
+        # Imported here, the game engine depends on this module
+        from game.engine.game_engine import GameEngine
+
+        client = RemoteClient(self.channel_layer, event["reply_channel"])
+        client.game_engine = GameEngine(client, self.channel_layer, shard=self)
+        client.game_engine.restore_session(
+            event["username"], PlayerProfile(pk=event["player_id"], location=event["location"])
+        )
+        self.sessions[client.channel_name] = client.game_engine
+        return client.game_engine
+
+    async def __forward(self, event) -> bool:
+        """
+        Forwards an event of a player handed off to another shard
+
+        Args:
+            event: The event carrying the channel of the consumer
+
+        Returns:
+            bool: True if the event was forwarded
+        """
+        shard = self.forwards.get(event["reply_channel"])
+        if shard is None:
+            logger.error(f"Shard {self.shard} has no player for {event['reply_channel']}")
+            return False
+        await self.channel_layer.send(get_shard_channel(shard), event)
+        return True
+
+
+# Regions of the world in sharded mode. None when the world is not sharded
+regions = partition_world(map_navigator.world, settings.SHARDS) if settings.SHARDS else None
@@ -0,0 +1,51 @@
+import asyncio
+
+from game.engine.admission import AdmissionQueue
+
+
+def test_admits_in_order_within_concurrency():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=2)
+        events = []
+
+        async def on_wait(position):
+            events.append(f"wait {position}")
+
+        async def task(name):
+            async with queue.admit(on_wait):
+                events.append(f"start {name}")
+                await asyncio.sleep(0.01)
+                events.append(f"end {name}")
+
+        await asyncio.gather(*(task(name) for name in "abcd"))
+        return queue, events
+
+    queue, events = asyncio.run(scenario())
+    assert events[:4] == ["start a", "start b", "wait 1", "wait 2"]
+    assert events.index("start c") > events.index("end a")
+    assert events.index("start d") > events.index("start c")
+    assert queue.active == 0 and not queue.waiters
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=1)
+        started = []
+
+        async def task(name):
+            async with queue.admit():
+                started.append(name)
+                await asyncio.sleep(0.02)
+
+        first = asyncio.ensure_future(task("first"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(task("second"))
+        third = asyncio.ensure_future(task("third"))
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.gather(first, third, return_exceptions=True)
+        return queue, started
+
+    queue, started = asyncio.run(scenario())
+    assert started == ["first", "third"]
+    assert queue.active == 0 and not queue.waiters
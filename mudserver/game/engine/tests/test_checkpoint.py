@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from game.engine.checkpoint import PlayerCheckpointer
+from game.engine.presence import presence
+from game.models import PlayerProfile
+
+
+def create_players(states: list) -> list:
+    players = []
+    for name, is_connected, checkpointed_at in states:
+        user = User.objects.create(username=name)
+        players.append(
+            PlayerProfile.objects.create(
+                user=user, location=1, is_connected=is_connected, checkpointed_at=checkpointed_at
+            )
+        )
+    return players
+
+
+@pytest.mark.django_db(transaction=True)
+def test_checkpoint_writes_online_players_in_one_transaction(django_assert_max_num_queries):
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    players = create_players([(name, True, None) for name in ["alice", "bob", "carol"]])
+    for location, player in enumerate(players, start=2):
+        checkpointer.add(player)
+        player.location = location
+    checkpointer.remove(players[2])
+
+    # A single transaction, with one update of each table of the profiles for all the players
+    with django_assert_max_num_queries(4):
+        assert async_to_sync(checkpointer.checkpoint_async)() == 2
+
+    profiles = PlayerProfile.objects.order_by("pk")
+    assert [profile.location for profile in profiles] == [2, 3, 1]
+    assert [profile.checkpointed_at is not None for profile in profiles] == [True, True, False]
+
+
+@pytest.mark.django_db
+def test_checkpoint_written_after_a_logout():
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    alice, bob = create_players([("alice", True, None), ("bob", True, None)])
+    for player in (alice, bob):
+        checkpointer.add(player)
+    snapshot = checkpointer.snapshot()
+
+    # Alice logs out before the checkpoint is written
+    checkpointer.remove(alice)
+    alice.is_connected = False
+    alice.save()
+    assert checkpointer.write(snapshot) == 1
+
+    assert not PlayerProfile.objects.get(pk=alice.pk).is_connected
+    bob = PlayerProfile.objects.get(pk=bob.pk)
+    assert bob.is_connected
+    assert bob.checkpointed_at is not None
+
+
+def test_checkpoint_without_online_players():
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    assert async_to_sync(checkpointer.checkpoint_async)() == 0
+
+
+@pytest.mark.django_db
+def test_recover_stale_players(django_assert_num_queries):
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    now = timezone.now()
+    long_ago = now - timedelta(minutes=5)
+    alice, *_, erin = create_players(
+        [
+            ("alice", True, long_ago),
+            ("bob", True, None),
+            ("carol", True, now),
+            ("dave", False, long_ago),
+            ("erin", True, long_ago),
+        ]
+    )
+    # The online players of the process are never stale
+    checkpointer.add(erin)
+
+    # The stale players are read, then disconnected with a single update
+    with django_assert_num_queries(2):
+        assert sorted(checkpointer.recover_stale_players()) == ["alice", "bob"]
+    connected = PlayerProfile.objects.filter(is_connected=True).values_list(
+        "user__username", flat=True
+    )
+    assert sorted(connected) == ["carol", "erin"]
+
+    with django_assert_num_queries(1):
+        assert checkpointer.recover_stale_players() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_recover_removes_stale_players_from_presence():
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    create_players([("alice", True, timezone.now() - timedelta(minutes=5))])
+    presence.add("alice", 1)
+    try:
+        assert async_to_sync(checkpointer.recover_async)() == 1
+        assert "alice" not in presence.locations
+        assert presence.get_users_in_location(1) == []
+    finally:
+        presence.remove("alice")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_recover_checks_presence_against_database(caplog):
+    checkpointer = PlayerCheckpointer(interval=10, stale_after=30)
+    create_players([("alice", True, timezone.now()), ("bob", False, timezone.now())])
+    presence.add("alice", 1)
+    presence.add("bob", 1)
+    try:
+        assert async_to_sync(checkpointer.recover_async)() == 0
+        assert "Presence registry does not match the database: {'bob': (1, None)}" in caplog.text
+    finally:
+        presence.remove("alice")
+        presence.remove("bob")
@@ -0,0 +1,28 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from game.engine import database
+
+
+def get_thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_calls_run_in_the_pool_of_the_database_executor(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="database")
+    monkeypatch.setattr(database, "executor", executor)
+    try:
+        call = database.database_sync_to_async(get_thread_name)
+        assert async_to_sync(call)().startswith("database")
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_calls_run_in_a_single_thread_without_pool():
+    assert database.executor is None
+    call = database.database_sync_to_async(get_thread_name)
+    assert async_to_sync(call)() == async_to_sync(call)()
@@ -0,0 +1,390 @@
+import contextlib
+import json
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.db.backends.utils import CursorWrapper
+
+from client.consumers import AsyncWebConsumer
+from game.engine.admission import login_admission
+from game.engine.game_engine import GameEngine
+from game.engine.hashing import password_hasher
+from game.engine.persistence import player_state_writer
+from game.engine.protocol import encode_message
+from game.models import PlayerProfile
+
+
+@contextlib.contextmanager
+def capture_queries():
+    """
+    Captures the queries of all the database connections. The consumers run the queries on
+    their own connections, which the CaptureQueriesContext of the test connection does not see.
+    """
+    queries = []
+    execute = CursorWrapper.execute
+
+    def capture(self, sql, params=None):
+        queries.append(sql)
+        return execute(self, sql, params)
+
+    with mock.patch.object(CursorWrapper, "execute", capture):
+        yield queries
+
+
+async def open_client() -> WebsocketCommunicator:
+    communicator = WebsocketCommunicator(
+        AuthMiddlewareStack(AsyncWebConsumer.as_asgi()), "/ws/client/"
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+    return communicator
+
+
+async def send_command(communicator: WebsocketCommunicator, command: str) -> str:
+    await communicator.send_to(text_data=json.dumps({"message": command}))
+    response = await communicator.receive_from()
+    return json.loads(response)["message"]
+
+
+async def drain_frames(communicator: WebsocketCommunicator) -> list:
+    frames = []
+    while not await communicator.receive_nothing(timeout=0.05):
+        frames.append(json.loads(await communicator.receive_from()))
+    return frames
+
+
+async def drain(communicator: WebsocketCommunicator) -> list:
+    return [frame["message"] for frame in await drain_frames(communicator)]
+
+
+async def connect_player(name: str) -> WebsocketCommunicator:
+    communicator = await open_client()
+    await send_command(communicator, f"register {name} {name}")
+    await send_command(communicator, f"connect {name} {name}")
+    await drain(communicator)
+    return communicator
+
+
+@pytest.mark.django_db(transaction=True)
+def test_say_reaches_only_players_in_the_same_room():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        carol = await connect_player("carol")
+        await drain(alice)
+        await drain(bob)
+
+        # Carol walks to the lobby, away from Alice and Bob
+        await send_command(carol, "west")
+        await send_command(alice, "say hello")
+
+        assert any("says <i>hello" in message for message in await drain(bob))
+        assert not any("says" in message for message in await drain(carol))
+
+        for communicator in (alice, bob, carol):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_shout_reaches_players_within_the_radius(settings):
+    settings.SHOUT_RADIUS = 2
+
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        carol = await connect_player("carol")
+        # Bob is 1 exit away from Alice, Carol is 3 exits away
+        await send_command(bob, "west")
+        await send_command(carol, "travel The backend machine room")
+        for communicator in (alice, bob, carol):
+            await drain(communicator)
+
+        assert await send_command(alice, "shout hello") == "<b>alice</b> shouts <i>hello</i>"
+        assert await drain(bob) == ["<b>alice</b> shouts <i>hello</i>"]
+        assert await drain(carol) == []
+
+        # A blank shout is not sent
+        assert "is not available" in await send_command(alice, "shout  ")
+        assert await drain(bob) == []
+
+        for communicator in (alice, bob, carol):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_shout_reaches_players_of_other_processes(settings):
+    settings.SHOUT_RADIUS = 1
+
+    async def scenario():
+        alice = await connect_player("alice")
+        # A player connected to another process, in the room west of Alice
+        channel_layer = get_channel_layer()
+        channel_name = await channel_layer.new_channel()
+        await channel_layer.group_add(GameEngine.get_room_group(2), channel_name)
+
+        await send_command(alice, "shout hello")
+        event = await channel_layer.receive(channel_name)
+        assert event["location"] == 2
+        assert json.loads(event["frame"]) == {"message": "<b>alice</b> shouts <i>hello</i>"}
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_quit_leaves_the_room_group():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        await drain(alice)
+
+        await send_command(bob, "quit")
+        await send_command(alice, "say anyone there")
+
+        assert not any("says" in message for message in await drain(bob))
+
+        for communicator in (alice, bob):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_look_lists_players_without_queries():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        await drain(alice)
+
+        with capture_queries() as queries:
+            look = await send_command(alice, "look")
+
+        assert queries == []
+        assert "alice bob" in look
+
+        for communicator in (alice, bob):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_player_state_is_written_on_quit():
+    async def scenario():
+        alice = await connect_player("alice")
+        await send_command(alice, "west")
+        await send_command(alice, "quit")
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
+
+    player = PlayerProfile.objects.get(user__username="alice")
+    assert player.location == 2
+    assert not player.is_connected
+
+
+@pytest.mark.django_db(transaction=True)
+def test_travel_is_a_single_move():
+    async def scenario():
+        alice = await connect_player("alice")
+        with capture_queries() as queries, mock.patch.object(
+            player_state_writer, "save", wraps=player_state_writer.save
+        ) as save:
+            summary = await send_command(alice, "travel -v The backend machine room")
+            messages = await drain(alice)
+
+        assert queries == []
+        save.assert_called_once_with(mock.ANY, "location")
+        assert summary == "You travel west, north, west (3 exits)"
+        assert len(messages) == 1
+        assert "The backend machine room" in messages[0]
+        assert "alice" in await send_command(alice, "look")
+
+        assert "The water cooler" in await send_command(alice, "travel the water cooler")
+        assert await send_command(alice, "travel the water cooler") == (
+            "You are already in <b>the water cooler</b>"
+        )
+        assert await send_command(alice, "travel attic") == "There is no room named <b>attic</b>"
+        await send_command(alice, "quit")
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
+
+    assert PlayerProfile.objects.get(user__username="alice").location == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_broadcast_frame_is_forwarded_as_is():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        await drain(alice)
+        await drain(bob)
+
+        frame = encode_message("The lights flicker")
+        event = {"type": "message.location", "location": 1, "frame": frame}
+        await get_channel_layer().group_send(GameEngine.get_room_group(1), event)
+
+        for communicator in (alice, bob):
+            assert await communicator.receive_from() == frame
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+def get_resume_token(frames: list) -> str:
+    for frame in frames:
+        if "resume_token" in frame:
+            return frame["resume_token"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_resume_session_without_password():
+    async def scenario():
+        alice = await open_client()
+        await send_command(alice, "register alice alice")
+        await send_command(alice, "connect alice alice")
+        token = get_resume_token(await drain_frames(alice))
+        await send_command(alice, "west")
+        # The connection drops without quitting
+        await alice.disconnect()
+
+        alice = await open_client()
+        with mock.patch.object(password_hasher, "check_password") as check_password:
+            assert await send_command(alice, f"resume {token}") == "User has been logged in : alice"
+        check_password.assert_not_called()
+        frames = await drain_frames(alice)
+        assert get_resume_token(frames)
+        assert any("The ridiculously large lobby" in frame["message"] for frame in frames)
+
+        await send_command(alice, "quit")
+        # Quitting revokes the token
+        assert (await send_command(alice, f"resume {token}")).startswith("Cannot resume")
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_resume_token_is_not_read_from_the_messages():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        await drain(alice)
+
+        await send_command(bob, 'say <span class="resume-token">forged</span>')
+        frames = await drain_frames(alice)
+        assert any("forged" in frame["message"] for frame in frames)
+        assert get_resume_token(frames) is None
+        await alice.disconnect()
+        await bob.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_chat_text_is_escaped():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        await drain(alice)
+
+        await send_command(bob, "say <script>steal()</script>")
+        assert await drain(alice) == ["<b>bob</b> says <i>&lt;script&gt;steal()&lt;/script&gt;<i>"]
+        await alice.disconnect()
+        await bob.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_resume_session_of_an_inactive_user():
+    async def scenario():
+        alice = await open_client()
+        await send_command(alice, "register alice alice")
+        await send_command(alice, "connect alice alice")
+        token = get_resume_token(await drain_frames(alice))
+        await alice.disconnect()
+        await database_sync_to_async(User.objects.filter(username="alice").update)(is_active=False)
+
+        alice = await open_client()
+        assert (await send_command(alice, f"resume {token}")).startswith("Cannot resume")
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_logins_wait_for_admission(monkeypatch):
+    monkeypatch.setattr(login_admission, "concurrency", 1)
+
+    async def scenario():
+        for name in ("alice", "bob"):
+            communicator = await open_client()
+            await send_command(communicator, f"register {name} {name}")
+            await communicator.disconnect()
+
+        alice = await open_client()
+        bob = await open_client()
+        await alice.send_to(text_data=json.dumps({"message": "connect alice alice"}))
+        await bob.send_to(text_data=json.dumps({"message": "connect bob bob"}))
+
+        waits = 0
+        for communicator, name in ((alice, "alice"), (bob, "bob")):
+            message = None
+            while message != f"User has been logged in : {name}":
+                message = json.loads(await communicator.receive_from(timeout=5))["message"]
+                waits += message == "The server is busy. Please wait, you are number 1 in the queue"
+        # Whichever login came second waited for the first one
+        assert waits == 1
+
+        for communicator in (alice, bob):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connect_queries():
+    async def scenario():
+        alice = await open_client()
+        await send_command(alice, "register alice alice")
+        with capture_queries() as queries:
+            login = await send_command(alice, "connect alice alice")
+            await drain(alice)
+        assert login == "User has been logged in : alice"
+        await alice.disconnect()
+        return queries
+
+    queries = async_to_sync(scenario)()
+    # The user and the player profile are fetched together. The session is created and the last
+    # login is updated by the login of channels. The status of the player is written behind.
+    assert len(queries) == 5
+    assert queries[0].count("JOIN") == 2
+    assert all("game_" not in sql for sql in queries[1:])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connect_with_wrong_password():
+    async def scenario():
+        alice = await open_client()
+        await send_command(alice, "register alice alice")
+        assert await send_command(alice, "connect alice wrong") == "Cannot authenticate user"
+        assert await send_command(alice, "connect nobody nobody") == (
+            "Cannot connect user nobody. Please check the credentials"
+        )
+        # Still anonymous
+        assert (await send_command(alice, "look")).startswith("Command <b>look</b>")
+        await alice.disconnect()
+
+    async_to_sync(scenario)()
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from game.engine.hashing import PasswordHasher
+
+
+@pytest.mark.parametrize("processes", [0, 1])
+def test_make_and_check_password(settings, processes):
+    settings.PASSWORD_HASHER_PROCESSES = processes
+    hasher = PasswordHasher()
+
+    async def scenario():
+        encoded = await hasher.make_password("secret")
+        return (
+            encoded,
+            await hasher.check_password("secret", encoded),
+            await hasher.check_password("wrong", encoded),
+        )
+
+    try:
+        encoded, correct, wrong = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+    assert encoded.startswith("pbkdf2_sha256$")
+    assert correct and not wrong
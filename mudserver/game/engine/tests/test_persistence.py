@@ -0,0 +1,85 @@
+import threading
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+
+from game.engine.persistence import PlayerStateWriter
+from game.models import PlayerProfile
+
+
+@pytest.fixture
+def players():
+    players = []
+    for name in ["alice", "bob", "carol"]:
+        user = User.objects.create(username=name)
+        players.append(PlayerProfile.objects.create(user=user, location=1))
+    return players
+
+
+@pytest.mark.django_db
+def test_flush_writes_changed_fields_only(players):
+    writer = PlayerStateWriter(flush_interval=60, flush_size=100)
+    alice, bob, _ = players
+    alice.location = 2
+    writer.mark_dirty(alice, "location")
+    bob.is_connected = True
+    writer.mark_dirty(bob, "is_connected")
+    # Changes to the fields that are not marked are not written
+    bob.location = 5
+
+    assert PlayerProfile.objects.get(pk=alice.pk).location == 1
+    assert writer.flush() == 2
+    assert writer.pending == {}
+
+    bob_profile = PlayerProfile.objects.get(pk=bob.pk)
+    assert PlayerProfile.objects.get(pk=alice.pk).location == 2
+    assert bob_profile.is_connected
+    assert bob_profile.location == 1
+
+
+@pytest.mark.django_db
+def test_flush_batches_players(players, django_assert_max_num_queries):
+    writer = PlayerStateWriter(flush_interval=60, flush_size=100)
+    for player in players:
+        player.location = 3
+        writer.mark_dirty(player, "location")
+        writer.mark_dirty(player, "location")
+
+    assert len(writer.pending) == len(players)
+    # One update of the location for the whole batch
+    with django_assert_max_num_queries(3):
+        writer.flush()
+    assert list(PlayerProfile.objects.values_list("location", flat=True)) == [3, 3, 3]
+
+
+def test_flush_without_changes():
+    writer = PlayerStateWriter(flush_interval=60, flush_size=100)
+    assert writer.flush() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_flush_is_put_back_in_the_event_loop(players):
+    writer = PlayerStateWriter(flush_interval=60, flush_size=100)
+    alice = players[0]
+    alice.location = 2
+    writer.mark_dirty(alice, "location")
+    threads = []
+    mark_dirty = writer.mark_dirty
+
+    def record_thread(*args):
+        threads.append(threading.get_ident())
+        mark_dirty(*args)
+
+    async def flush():
+        with mock.patch.object(writer, "mark_dirty", record_thread):
+            count = await writer.flush_async()
+        return count, threading.get_ident()
+
+    with mock.patch.object(PlayerProfile.objects, "bulk_update", side_effect=RuntimeError):
+        count, loop_thread = async_to_sync(flush)()
+
+    assert count == 0
+    assert threads == [loop_thread]
+    assert writer.pending == {alice.pk: (alice, {"location"})}
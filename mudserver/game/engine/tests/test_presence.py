@@ -0,0 +1,77 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+
+from game.engine.presence import PresenceRegistry
+from game.models import PlayerProfile
+
+
+@pytest.fixture
+def registry():
+    registry = PresenceRegistry()
+    registry.add("alice", 1)
+    registry.add("bob", 1)
+    registry.add("carol", 2)
+    return registry
+
+
+def test_get_users_in_location(registry):
+    assert registry.get_users_in_location(1) == ["alice", "bob"]
+    assert registry.get_users_in_location(2) == ["carol"]
+    assert registry.get_users_in_location(3) == []
+
+
+def test_move(registry):
+    registry.move("alice", 2)
+    assert registry.get_users_in_location(1) == ["bob"]
+    assert registry.get_users_in_location(2) == ["carol", "alice"]
+
+
+def test_remove(registry):
+    registry.remove("carol")
+    registry.remove("unknown")
+    assert registry.get_users_in_location(2) == []
+    assert 2 not in registry.rooms
+
+
+def test_check_consistency(registry):
+    assert registry.check_consistency({"alice": 1, "bob": 1, "carol": 2}) == {}
+    assert registry.check_consistency({"alice": 3, "bob": 1, "dave": 2}) == {
+        "alice": (1, 3),
+        "carol": (2, None),
+        "dave": (None, 2),
+    }
+
+
+def create_profiles():
+    for name, location, is_connected in [
+        ("alice", 1, True),
+        ("bob", 2, True),
+        ("carol", 2, False),
+        # Connected to another process
+        ("dave", 3, True),
+    ]:
+        user = User.objects.create(username=name)
+        PlayerProfile.objects.create(user=user, location=location, is_connected=is_connected)
+
+
+@pytest.mark.django_db
+def test_check_database_consistency(registry, django_assert_num_queries):
+    create_profiles()
+
+    with django_assert_num_queries(1):
+        assert registry.check_database_consistency() == {
+            "bob": (1, 2),
+            "carol": (2, None),
+        }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_check_database_consistency_async(registry):
+    create_profiles()
+
+    assert async_to_sync(registry.check_database_consistency_async)() == {
+        "bob": (1, 2),
+        "carol": (2, None),
+    }
+    assert async_to_sync(PresenceRegistry().check_database_consistency_async)() == {}
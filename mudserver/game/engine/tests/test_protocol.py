@@ -0,0 +1,37 @@
+import json
+
+from game.engine.protocol import coalesce_frames, encode_batch, encode_message, make_event
+
+
+def test_encode_message():
+    frame = encode_message('<b>alice</b> says "hi"\n')
+    assert json.loads(frame) == {"message": '<b>alice</b> says "hi"\n'}
+
+
+def test_encode_message_with_fields():
+    frame = encode_message("Welcome", resume_token="abc")
+    assert json.loads(frame) == {"message": "Welcome", "resume_token": "abc"}
+
+
+def test_make_event():
+    assert make_event("message.location", "hello", location=1) == {
+        "type": "message.location",
+        "frame": encode_message("hello"),
+        "location": 1,
+    }
+
+
+def test_encode_batch():
+    frames = [encode_message(message) for message in ["one", 'two "2"', "thrée"]]
+    assert json.loads(encode_batch(frames)) == {"messages": ["one", 'two "2"', "thrée"]}
+
+
+def test_coalesce_frames():
+    frames = [encode_message("one"), encode_message("two")]
+    assert json.loads(coalesce_frames(frames)) == {"message": "one<br>two"}
+
+
+def test_frames_with_fields_keep_their_fields():
+    frames = [encode_message("one"), encode_message("two", resume_token="abc")]
+    assert json.loads(encode_batch(frames)) == {"messages": ["one", "two"], "resume_token": "abc"}
+    assert json.loads(coalesce_frames(frames)) == {"message": "one<br>two", "resume_token": "abc"}
@@ -0,0 +1,42 @@
+from unittest import mock
+
+import game.rooms.map_navigator as map_navigator
+from game.engine.render_cache import RoomRenderCache
+from game.rooms.map_navigator import construct_world
+
+
+def test_look():
+    cache = RoomRenderCache()
+    frame = cache.get_frame(map_navigator.world.rooms[1])
+    look = frame.look("alice bob")
+
+    assert "Just outside the k6 virtual offices" in look
+    assert "<b>Players</b>: alice bob" in look
+    assert "The ridiculously large lobby#(west)" in look
+    assert cache.get_frame(map_navigator.world.rooms[1]) is frame
+
+
+def test_reload_on_world_change():
+    cache = RoomRenderCache()
+    room = map_navigator.world.rooms[1]
+    cache.get_frame(room)
+    world = construct_world(
+        {"rooms": [{"id": 1, "name": "New room", "desc": "A new room"}], "exits": []}
+    )
+
+    with mock.patch.object(map_navigator, "world", world):
+        # The texts of the room in the new world
+        assert "New room" in cache.get_frame(room).move
+        assert cache.world is world
+
+
+def test_room_removed_from_the_world():
+    cache = RoomRenderCache()
+    room = map_navigator.world.rooms[2]
+    world = construct_world(
+        {"rooms": [{"id": 1, "name": "New room", "desc": "A new room"}], "exits": []}
+    )
+
+    with mock.patch.object(map_navigator, "world", world):
+        assert room.name in cache.get_frame(room).move
+        assert room.id not in cache.frames
@@ -0,0 +1,31 @@
+import pytest
+from django.contrib.auth.models import User
+
+from game.engine.resume import InvalidResumeToken, issue_token, read_token
+from game.models import PlayerProfile
+
+
+@pytest.fixture
+def player():
+    user = User.objects.create(username="alice")
+    return PlayerProfile.objects.create(user=user, location=1, session_generation=3)
+
+
+@pytest.mark.django_db
+def test_read_token(player):
+    assert read_token(issue_token(player)) == (player.pk, 3)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("token", ["", "not a token", "W1sxLDNd:tampered:signature"])
+def test_read_invalid_token(player, token):
+    with pytest.raises(InvalidResumeToken):
+        read_token(token)
+
+
+@pytest.mark.django_db
+def test_read_expired_token(player, settings):
+    token = issue_token(player)
+    settings.RESUME_TOKEN_MAX_AGE = -1
+    with pytest.raises(InvalidResumeToken):
+        read_token(token)
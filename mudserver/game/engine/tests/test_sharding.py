@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.routing import ChannelNameRouter
+from channels.worker import Worker
+
+from game.engine import sharding
+from game.engine.sharding import ShardConsumer, get_shard_channel
+from game.engine.tests.test_game_engine import connect_player, drain, send_command
+from game.models import PlayerProfile
+from game.rooms import map_navigator
+from game.rooms.map_navigator import construct_world
+from game.rooms.regions import partition_world
+from game.rooms.routing import router
+
+
+@pytest.fixture
+def two_shards(monkeypatch):
+    # Rooms 1, 2 and 3 are in the region of shard 0, rooms 4 and 5 in the region of shard 1
+    monkeypatch.setattr(sharding, "regions", partition_world(map_navigator.world, 2))
+
+
+def start_shards(count: int):
+    channels = [get_shard_channel(shard) for shard in range(count)]
+    application = ChannelNameRouter(
+        {get_shard_channel(shard): ShardConsumer.as_asgi(shard=shard) for shard in range(count)}
+    )
+    worker = Worker(application, channels=channels, channel_layer=get_channel_layer())
+    return worker, asyncio.ensure_future(worker.handle())
+
+
+def stop_shards(worker, task) -> None:
+    task.cancel()
+    for details in worker.application_instances.values():
+        details["future"].cancel()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_player_is_handed_off_between_shards(two_shards):
+    async def scenario():
+        worker, task = start_shards(2)
+        try:
+            alice = await connect_player("alice")
+            bob = await connect_player("bob")
+            await drain(alice)
+            await send_command(bob, "west")
+            await send_command(bob, "west")
+
+            await send_command(alice, "west")
+            # The look is sent before the consumer knows about the hand-off,
+            # so the first shard forwards it to the second one
+            await alice.send_to(text_data=json.dumps({"message": "west"}))
+            await alice.send_to(text_data=json.dumps({"message": "look"}))
+            move = json.loads(await alice.receive_from())["message"]
+            look = json.loads(await alice.receive_from())["message"]
+            assert "The water cooler" in move
+            assert "The water cooler" in look
+            assert "bob alice" in look
+
+            await send_command(alice, "say hello")
+            assert any("says <i>hello" in message for message in await drain(bob))
+
+            await send_command(alice, "east")
+            await send_command(alice, "quit")
+            for communicator in (alice, bob):
+                await communicator.disconnect()
+        finally:
+            stop_shards(worker, task)
+
+    async_to_sync(scenario)()
+
+    player = PlayerProfile.objects.get(user__username="alice")
+    assert player.location == 2
+    assert not player.is_connected
+
+
+def test_shard_routes_on_the_whole_world(monkeypatch):
+    # A corridor of 8 rooms, split in two regions
+    world = construct_world(
+        {
+            "rooms": [{"id": id, "name": f"Room {id}", "desc": ""} for id in range(1, 9)],
+            "exits": [
+                {"id": id, "name": "east", "location": id, "destination": id + 1}
+                for id in range(1, 8)
+            ],
+        }
+    )
+    monkeypatch.setattr(map_navigator, "world", world)
+    monkeypatch.setattr(router, "world", None)
+    monkeypatch.setattr(sharding, "regions", partition_world(world, 2))
+    shard = sharding.regions.get_shard(1)
+
+    sharding.load_region(shard)
+
+    assert 8 not in map_navigator.world.rooms
+    route = router.get_table().find_route(1, frozenset([8]))
+    assert route == (8, ("east",) * 7)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_travel_out_of_the_region(two_shards):
+    async def scenario():
+        worker, task = start_shards(2)
+        try:
+            alice = await connect_player("alice")
+            await drain(alice)
+            assert "The backend machine room" in await send_command(
+                alice, "travel the backend machine room"
+            )
+            assert "The backend machine room" in await send_command(alice, "look")
+            await send_command(alice, "quit")
+            await alice.disconnect()
+        finally:
+            stop_shards(worker, task)
+
+    async_to_sync(scenario)()
+
+    assert PlayerProfile.objects.get(user__username="alice").location == 5
@@ -0,0 +1,85 @@
+import asyncio
+
+from game.engine.ticker import TickerMiddleware, TickScheduler
+from metrics.instruments import TICK_OVERRUNS
+
+
+def test_systems_run_at_their_interval():
+    async def scenario():
+        runs = []
+        scheduler = TickScheduler(tick_rate=10)
+
+        async def every_tick():
+            runs.append("every_tick")
+
+        async def every_half_second():
+            runs.append("every_half_second")
+
+        scheduler.register("every_tick", every_tick)
+        scheduler.register("every_half_second", every_half_second, interval=0.5)
+        for _ in range(10):
+            await scheduler.run_tick()
+        return runs
+
+    runs = asyncio.run(scenario())
+    assert runs.count("every_tick") == 10
+    assert runs.count("every_half_second") == 2
+
+
+def test_failing_system_does_not_stop_others():
+    async def scenario():
+        runs = []
+        scheduler = TickScheduler(tick_rate=10)
+
+        async def failing():
+            raise RuntimeError("System failure")
+
+        async def working():
+            runs.append(scheduler.tick)
+
+        scheduler.register("failing", failing)
+        scheduler.register("working", working)
+        await scheduler.run_tick()
+        await scheduler.run_tick()
+        return runs
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_scheduler_counts_overruns():
+    async def scenario():
+        scheduler = TickScheduler(tick_rate=100)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+
+        scheduler.register("slow", slow)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        scheduler.stop()
+        return scheduler.tick
+
+    overruns = TICK_OVERRUNS.labels().value
+    ticks = asyncio.run(scenario())
+    # The missed ticks are skipped instead of being run back to back
+    assert 2 <= ticks <= 6
+    assert TICK_OVERRUNS.labels().value > overruns
+
+
+def test_middleware_starts_scheduler_once():
+    async def scenario():
+        calls = []
+        scheduler = TickScheduler(tick_rate=10)
+
+        async def app(scope, receive, send):
+            calls.append(scope["type"])
+
+        middleware = TickerMiddleware(app, scheduler)
+        await middleware({"type": "http"}, None, None)
+        task = scheduler.task
+        await middleware({"type": "websocket"}, None, None)
+        assert scheduler.task is task and not task.done()
+        scheduler.stop()
+        return calls
+
+    assert asyncio.run(scenario()) == ["http", "websocket"]
@@ -0,0 +1,244 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.core.management import call_command
+
+from game import models
+from game.engine import sharding
+from game.engine.database import database_sync_to_async
+from game.engine.presence import presence
+from game.engine.tests.test_game_engine import connect_player, drain, send_command
+from game.engine.world_cache import WorldCache
+from game.models import PlayerProfile
+from game.rooms import map_navigator
+from game.rooms.loader import write_world
+from game.rooms.data import room_data
+from game.rooms.map_navigator import MapNavigator, WorldGraph, construct_world
+from game.rooms.regions import partition_world
+from game.signals import WORLD_GROUP
+
+
+@pytest.fixture(autouse=True)
+def restore_world():
+    with mock.patch.object(map_navigator, "world", map_navigator.world):
+        yield
+
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("The world was not reloaded")
+
+
+def create_rooms():
+    hall = models.Room.objects.create(name="Hall", desc="A hall")
+    garden = models.Room.objects.create(name="Garden", desc="A garden")
+    models.Exit.objects.create(name="north", location=hall, destination=garden)
+    models.Exit.objects.create(name="south", location=garden, destination=hall)
+    return hall, garden
+
+
+@pytest.mark.django_db
+def test_load_from_database(django_assert_num_queries):
+    hall, garden = create_rooms()
+    with django_assert_num_queries(2):
+        assert WorldCache().load_from_database()
+
+    assert map_navigator.world.default_room_id == hall.id
+    # The map navigator does not query the room tables
+    with django_assert_num_queries(0):
+        assert MapNavigator.get_room_name(hall.id) == "Hall"
+        assert MapNavigator.move_to(hall.id, "north") == garden.id
+        assert MapNavigator.get_printable_exits(MapNavigator.get_room(garden.id)) == [
+            "Hall#(south)"
+        ]
+
+
+@pytest.mark.django_db
+def test_empty_database_keeps_the_world():
+    world = map_navigator.world
+    assert not WorldCache().load_from_database()
+    assert map_navigator.world is world
+
+
+@pytest.mark.django_db
+def test_importworld():
+    call_command("importworld")
+    WorldCache().load_from_database()
+
+    assert map_navigator.world == construct_world(room_data)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_changes_are_reloaded_in_every_process(settings):
+    settings.WORLD_DATABASE = True
+    hall, garden = create_rooms()
+    cache = WorldCache()
+    cache.load_from_database()
+
+    @database_sync_to_async
+    def edit_rooms():
+        models.Room.objects.filter(pk=hall.pk).update(name="Great hall")
+        # update() sends no signals, the next save reloads both rooms
+        cellar = models.Room.objects.create(name="Cellar", desc="A cellar")
+        exit = models.Exit.objects.get(location=hall)
+        exit.location = cellar
+        exit.save()
+        return cellar
+
+    async def scenario():
+        cache.start()
+        try:
+            # Lets the listener join the world group
+            await asyncio.sleep(0.01)
+            world = map_navigator.world
+            cellar = await edit_rooms()
+            await wait_for(lambda: cellar.id in map_navigator.world.rooms)
+            await wait_for(lambda: not map_navigator.world.rooms[hall.id].exits)
+            assert map_navigator.world.rooms[cellar.id].directions == {"north": garden.id}
+            assert map_navigator.world.rooms[hall.id].name == "Great hall"
+            # The world is swapped, not modified in place
+            assert hall.id in world.rooms and cellar.id not in world.rooms
+
+            await database_sync_to_async(models.Room.objects.filter(pk=cellar.pk).delete)()
+            await wait_for(lambda: cellar.id not in map_navigator.world.rooms)
+        finally:
+            cache.stop()
+
+    async_to_sync(scenario)()
+
+
+def test_group_membership_is_renewed():
+    cache = WorldCache()
+
+    async def scenario():
+        cache.start()
+        try:
+            await wait_for(lambda: cache.channel_name)
+            # The channel layer expired the membership of the listener
+            channel_layer = get_channel_layer()
+            await channel_layer.group_discard(WORLD_GROUP, cache.channel_name)
+            await cache.renew_group()
+
+            world = map_navigator.world
+            await channel_layer.group_send(WORLD_GROUP, {"type": "world.reload"})
+            await wait_for(lambda: map_navigator.world is not world)
+        finally:
+            cache.stop()
+
+    async_to_sync(scenario)()
+    assert cache.channel_name is None
+
+
+@pytest.mark.django_db
+def test_rooms_are_not_reloaded_in_sharded_mode(settings, monkeypatch):
+    settings.WORLD_DATABASE = True
+    monkeypatch.setattr(sharding, "regions", partition_world(map_navigator.world, 2))
+    world = map_navigator.world
+
+    async_to_sync(WorldCache().reload_rooms)([1])
+    assert map_navigator.world is world
+
+
+def test_reload_room_data():
+    world = map_navigator.world
+    assert async_to_sync(WorldCache().reload_world)()
+
+    assert map_navigator.world is not world
+    assert map_navigator.world == construct_world(room_data)
+
+
+def test_invalid_world_is_not_swapped(settings, tmp_path):
+    settings.WORLD_FILE = str(tmp_path / "world.jsonl")
+    (tmp_path / "world.jsonl").write_text('{"format": "mudworld", "version": 1}\n')
+    world = map_navigator.world
+
+    assert not async_to_sync(WorldCache().reload_world)()
+    assert map_navigator.world is world
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reload_relocates_players_of_removed_rooms(settings, tmp_path):
+    # The lobby (room 2) is removed from the world
+    settings.WORLD_FILE = str(tmp_path / "world.jsonl")
+    write_world(
+        {
+            "rooms": [room for room in room_data["rooms"] if room["id"] != 2],
+            "exits": [
+                exit
+                for exit in room_data["exits"]
+                if 2 not in (exit["location"], exit["destination"])
+            ],
+        },
+        settings.WORLD_FILE,
+    )
+    cache = WorldCache()
+
+    async def scenario():
+        cache.start()
+        try:
+            alice = await connect_player("alice")
+            bob = await connect_player("bob")
+            await drain(alice)
+            await send_command(alice, "west")
+            await drain(bob)
+
+            world = map_navigator.world
+            await sync_to_async(call_command)("reloadworld")
+            await wait_for(lambda: map_navigator.world is not world)
+
+            messages = await drain(alice)
+            assert "the room you were in is gone" in messages[0]
+            assert "Just outside the k6 virtual offices" in messages[1]
+            assert "alice" in presence.get_users_in_location(1)
+            # Bob was not in a removed room, and stays connected
+            assert not await drain(bob)
+            assert "bob alice" in await send_command(bob, "look")
+            assert "Just outside" in await send_command(alice, "look")
+
+            await send_command(alice, "quit")
+            for communicator in (alice, bob):
+                await communicator.disconnect()
+        finally:
+            cache.stop()
+
+    async_to_sync(scenario)()
+
+    assert PlayerProfile.objects.get(user__username="alice").location == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_commands_in_a_removed_room_before_the_relocation():
+    async def scenario():
+        alice = await connect_player("alice")
+        bob = await connect_player("bob")
+        for communicator in (alice, bob):
+            await send_command(communicator, "west")
+            await drain(communicator)
+
+        # The lobby (room 2) is removed, and the players are not relocated yet
+        rooms = dict(map_navigator.world.rooms)
+        del rooms[2]
+        map_navigator.world = WorldGraph(rooms=rooms, default_room_id=1)
+
+        for communicator, command in ((alice, "look"), (bob, "north")):
+            assert "the room you were in is gone" in await send_command(communicator, command)
+            assert "Just outside the k6 virtual offices" in (await drain(communicator))[0]
+        assert "alice bob" in await send_command(alice, "look")
+
+        # A player logging in to a removed room enters the default room
+        await send_command(alice, "quit")
+        await database_sync_to_async(PlayerProfile.objects.filter(user__username="alice").update)(
+            location=2
+        )
+        await send_command(alice, "connect alice alice")
+        assert any("Just outside" in message for message in await drain(alice))
+        for communicator in (alice, bob):
+            await communicator.disconnect()
+
+    async_to_sync(scenario)()
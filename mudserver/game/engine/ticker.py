@@ -0,0 +1,129 @@
+"""
+Class to run the periodic world work of the server.
+
+The game engine only reacts to the messages of the clients. The work that concerns the whole
+world (e.g writing the player state) is done by systems, run by a single tick scheduler in
+every process. Each system is run in a batched pass every few ticks, instead of one timer for
+every connection.
+"""
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+
+from metrics.instruments import TICK_DURATION, TICK_OVERRUNS, TICK_SYSTEM_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class TickScheduler:
+    """
+    Fixed-timestep scheduler running the registered systems.
+
+    The ticks are scheduled at a fixed rate. When a tick takes longer than the tick interval,
+    the overrun is counted and the missed ticks are skipped instead of being run back to back.
+
+    Attributes:
+        tick_rate: The number of ticks per second.
+        interval: The number of seconds between two ticks.
+        systems: The registered systems, as tuples of name, coroutine function and number of
+            ticks between two runs.
+        tick: The number of the last tick.
+        task: The task running the ticks.
+    """
+
+    def __init__(self, tick_rate: float) -> None:
+        self.tick_rate = tick_rate
+        self.interval = 1 / tick_rate
+        self.systems = []
+        self.tick = 0
+        self.task = None
+
+    def register(self, name: str, system, interval: float = 0) -> None:
+        """
+        Registers a system run by the scheduler.
+
+        Args:
+            name (str): The name of the system, used in the logs and the metrics.
+            system (callable): The coroutine function run without arguments.
+            interval (float): The number of seconds between two runs. 0 runs it on every tick.
+        """
+        every = max(1, round(interval * self.tick_rate))
+        self.systems.append((name, system, every))
+
+    def start(self) -> None:
+        """
+        Starts the scheduler in the running event loop if it is not running already.
+        """
+        loop = asyncio.get_running_loop()
+        if self.task and not self.task.done() and self.task.get_loop() is loop:
+            return
+        self.task = loop.create_task(self.__run())
+        logger.info(f"Tick scheduler started at {self.tick_rate} ticks per second")
+
+    def stop(self) -> None:
+        """
+        Stops the scheduler.
+        """
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def run_tick(self) -> None:
+        """
+        Runs the systems due on the next tick.
+
+        A failing system is logged and does not prevent the other systems from running.
+        """
+        self.tick += 1
+        for name, system, every in self.systems:
+            if self.tick % every:
+                continue
+            started_at = time.perf_counter()
+            try:
+                await system()
+            except Exception:
+                logger.exception(f"System {name} failed on tick {self.tick}")
+            finally:
+                TICK_SYSTEM_DURATION.labels(name).observe(time.perf_counter() - started_at)
+
+    async def __run(self) -> None:
+        """
+        Runs the ticks at a fixed rate.
+        """
+        loop = asyncio.get_running_loop()
+        next_tick_at = loop.time()
+        while True:
+            started_at = loop.time()
+            await self.run_tick()
+            TICK_DURATION.observe(loop.time() - started_at)
+            next_tick_at += self.interval
+            delay = next_tick_at - loop.time()
+            if delay < 0:
+                TICK_OVERRUNS.inc()
+                logger.debug(f"Tick {self.tick} overran by {-delay:.3f} seconds")
+                next_tick_at = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+class TickerMiddleware:
+    """
+    ASGI middleware starting the tick scheduler.
+
+    The event loop of the server only exists once it serves the first connection, so the
+    scheduler is started on every call. Starting it again while it runs does nothing.
+    """
+
+    def __init__(self, app, scheduler: TickScheduler) -> None:
+        self.app = app
+        self.scheduler = scheduler
+
+    async def __call__(self, scope, receive, send):
+        self.scheduler.start()
+        return await self.app(scope, receive, send)
+
+
+# Tick scheduler of the process
+ticker = TickScheduler(tick_rate=settings.TICK_RATE)
@@ -0,0 +1,282 @@
+"""
+Class to keep the world of the process up to date while the server runs.
+
+With WORLD_DATABASE set, the world is loaded from the Room and Exit tables when the server
+starts, and the map navigator serves every read from the world graph in memory. The game never
+queries the room tables while it runs. When builders change a room (see game.signals), every
+process is told through the world channel group, and reloads only the changed rooms.
+
+The whole world can also be reloaded from its source (the database, the world file, or the
+room_data dict) with the reloadworld command, without restarting the server. The new world is
+built and validated outside of the event loop.
+
+The world graph is never modified in place: a new graph is swapped in, so the commands running
+see either the old world or the new one. The players in the rooms removed from the world are
+moved to the default room.
+
+The channel layer forgets the members of a group after its group expiry (a day by default with
+Redis), so the listener joins the world channel group again periodically (see renew_group).
+"""
+import asyncio
+import importlib
+import logging
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+import game.rooms.map_navigator as map_navigator
+from game import models
+from game.engine import sharding
+from game.engine.database import database_sync_to_async
+from game.engine.game_engine import GameEngine
+from game.engine.presence import presence
+from game.rooms import data, loader
+from game.rooms.map_navigator import Exit, WorldGraph, make_room
+from game.signals import WORLD_GROUP
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds between two renewals of the membership of the world channel group, well
+# below the group expiry of the channel layers
+GROUP_RENEWAL_INTERVAL = 3600
+
+
+def fetch_rooms(room_ids: list = None) -> dict:
+    """
+    Reads rooms and their exits from the database, with two queries.
+
+    Args:
+        room_ids (list): The ids of the rooms. None reads all the rooms.
+
+    Returns:
+        dict: Maps the room id to the room, for the rooms that exist.
+    """
+    rooms = models.Room.objects.order_by("id")
+    exits = models.Exit.objects.order_by("id")
+    if room_ids is not None:
+        rooms = rooms.filter(id__in=room_ids)
+        exits = exits.filter(location_id__in=room_ids)
+
+    exits_by_room = {}
+    for exit in exits.values_list("id", "name", "location_id", "destination_id"):
+        exit = Exit._make(exit)
+        exits_by_room.setdefault(exit.location, []).append(exit)
+    return {
+        room_id: make_room(room_id, name, desc, exits_by_room.get(room_id, ()))
+        for room_id, name, desc in rooms.values_list("id", "name", "desc")
+    }
+
+
+def load_world_from_database() -> WorldGraph:
+    """
+    Loads the world from the rooms of the database. The room with the lowest id is the
+    default room.
+
+    Returns:
+        The world graph.
+
+    Throws:
+        WorldValidationError: If there are no rooms in the database.
+    """
+    rooms = fetch_rooms()
+    if not rooms:
+        raise loader.WorldValidationError(["There are no rooms in the database"])
+    return WorldGraph(rooms=MappingProxyType(rooms), default_room_id=min(rooms))
+
+
+def build_world() -> WorldGraph:
+    """
+    Builds and validates the world from its source: the database with WORLD_DATABASE, the
+    world file in WORLD_FILE, or the room_data dict, read again from game/rooms/data.py.
+
+    Returns:
+        The world graph.
+
+    Throws:
+        WorldValidationError: If the world is invalid.
+    """
+    if settings.WORLD_DATABASE:
+        return load_world_from_database()
+    if settings.WORLD_FILE:
+        return map_navigator.load_default_world()
+    room_data = importlib.reload(data).room_data
+    return loader.build_world(loader.iter_world_records(room_data))
+
+
+class WorldCache:
+    """
+    Keeps the world graph of the map navigator up to date.
+
+    Attributes:
+        task: The task listening to the world channel group.
+        channel_name: The channel of the listener. None when it is not listening.
+    """
+
+    def __init__(self) -> None:
+        self.task = None
+        self.channel_name = None
+
+    def load_from_database(self) -> bool:
+        """
+        Replaces the world of the map navigator with the rooms of the database.
+        Used on startup. The world is kept when the database has no rooms.
+
+        Returns:
+            bool: True if the world was loaded.
+        """
+        try:
+            world = load_world_from_database()
+        except loader.WorldValidationError:
+            logger.warning("There are no rooms in the database, keeping the world")
+            return False
+        map_navigator.world = world
+        logger.info(f"Loaded {len(world.rooms)} rooms from the database")
+        return True
+
+    async def reload_world(self) -> bool:
+        """
+        Builds the world again from its source and swaps it in. The world is kept when the new
+        world is invalid.
+
+        Returns:
+            bool: True if the world was swapped.
+        """
+        if sharding.regions:
+            logger.error("The world cannot be reloaded in sharded mode, restart the shards")
+            return False
+        if settings.WORLD_DATABASE:
+            build = database_sync_to_async(build_world)
+        else:
+            build = sync_to_async(build_world, thread_sensitive=False)
+        try:
+            world = await build()
+        except (OSError, ValueError):
+            # The validation errors of the world files and the snapshots are ValueErrors
+            logger.exception("Cannot reload the world, keeping the current world")
+            return False
+        await self.swap(world)
+        logger.info(f"Reloaded the world, {len(world.rooms)} rooms")
+        return True
+
+    async def reload_rooms(self, room_ids: list = None) -> None:
+        """
+        Reloads the rooms changed in the database and swaps in the new world.
+        Does nothing without WORLD_DATABASE.
+
+        Args:
+            room_ids (list): The ids of the changed rooms. None reloads the whole world.
+        """
+        if not settings.WORLD_DATABASE:
+            return
+        if sharding.regions:
+            logger.error("The rooms cannot be reloaded in sharded mode, restart the shards")
+            return
+        if room_ids is None:
+            await self.reload_world()
+            return
+
+        changed_rooms = await database_sync_to_async(fetch_rooms)(room_ids)
+        world = map_navigator.world
+        rooms = dict(world.rooms)
+        for room_id in room_ids:
+            rooms.pop(room_id, None)
+        rooms.update(changed_rooms)
+        if not rooms:
+            logger.warning("All the rooms were deleted, keeping the world")
+            return
+
+        default_room_id = world.default_room_id if world.default_room_id in rooms else min(rooms)
+        await self.swap(WorldGraph(rooms=MappingProxyType(rooms), default_room_id=default_room_id))
+        logger.info(f"Reloaded the rooms {room_ids}")
+
+    async def swap(self, world: WorldGraph) -> None:
+        """
+        Replaces the world of the map navigator, and moves the players in the removed rooms
+        to the default room.
+
+        Args:
+            world (WorldGraph): The new world.
+        """
+        map_navigator.world = world
+        removed_rooms = [location for location in presence.rooms if location not in world.rooms]
+        if not removed_rooms:
+            return
+        logger.info(f"Relocating the players of the removed rooms {removed_rooms}")
+        channel_layer = get_channel_layer()
+        for location in removed_rooms:
+            await channel_layer.group_send(
+                GameEngine.get_room_group(location), {"type": "world.relocate"}
+            )
+
+    def start(self) -> None:
+        """
+        Starts listening to the world channel group in the running event loop, if it is not
+        listening already.
+        """
+        loop = asyncio.get_running_loop()
+        if self.task and not self.task.done() and self.task.get_loop() is loop:
+            return
+        self.task = loop.create_task(self.__listen())
+
+    def stop(self) -> None:
+        """
+        Stops listening to the world channel group.
+        """
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def renew_group(self) -> None:
+        """
+        Adds the channel of the listener to the world channel group again, before the channel
+        layer expires its membership. Run by the tick scheduler. Does nothing when the listener
+        is not listening.
+        """
+        if self.channel_name:
+            await get_channel_layer().group_add(WORLD_GROUP, self.channel_name)
+
+    async def __listen(self) -> None:
+        """
+        Reloads the world, or the rooms, sent to the world channel group.
+        """
+        channel_layer = get_channel_layer()
+        channel_name = await channel_layer.new_channel()
+        await channel_layer.group_add(WORLD_GROUP, channel_name)
+        self.channel_name = channel_name
+        logger.info("Listening to the changes of the world")
+        try:
+            while True:
+                message = await channel_layer.receive(channel_name)
+                try:
+                    if message["type"] == "world.reload":
+                        await self.reload_world()
+                    else:
+                        await self.reload_rooms(message["rooms"])
+                except Exception:
+                    logger.exception(f"Cannot apply the change of the world {message}")
+        finally:
+            self.channel_name = None
+            await channel_layer.group_discard(WORLD_GROUP, channel_name)
+
+
+class WorldCacheMiddleware:
+    """
+    ASGI middleware starting the world cache listener.
+
+    The event loop of the server only exists once it serves the first connection, so the
+    listener is started on every call. Starting it again while it listens does nothing.
+    """
+
+    def __init__(self, app, cache: WorldCache) -> None:
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        self.cache.start()
+        return await self.app(scope, receive, send)
+
+
+# World cache of the process
+world_cache = WorldCache()
@@ -0,0 +1,31 @@
+"""
+Command to compile the world into a binary snapshot, memory-mapped by the workers on startup.
+
+e.g python manage.py compileworld world.snapshot
+    python manage.py compileworld world.snapshot --source world.jsonl
+"""
+from django.core.management import BaseCommand
+
+from game.rooms import map_navigator
+from game.rooms.loader import load_world
+from game.rooms.snapshot import compile_world, open_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compiles the world into a binary snapshot. See game.rooms.snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The path of the snapshot, e.g world.snapshot.")
+        parser.add_argument(
+            "--source",
+            help="The world file to compile (.jsonl or .msgpack). Defaults to the loaded world.",
+        )
+
+    def handle(self, *args, **options):
+        world = load_world(options["source"]) if options["source"] else map_navigator.world
+        compile_world(world, options["path"])
+        # Validates the compiled snapshot
+        snapshot = open_snapshot(options["path"])
+        if snapshot != world:
+            raise RuntimeError(f"The snapshot {options['path']} does not match the world")
+        self.stdout.write(f"Compiled {len(snapshot.rooms)} rooms into {options['path']}")
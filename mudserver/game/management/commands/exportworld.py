@@ -0,0 +1,22 @@
+"""
+Command to write the built-in world of game/rooms/data.py to a world file.
+
+e.g python manage.py exportworld world.jsonl
+"""
+from django.core.management import BaseCommand
+
+from game.rooms.data import room_data
+from game.rooms.loader import load_world, write_world
+
+
+class Command(BaseCommand):
+    help = "Writes the built-in world to a world file (.jsonl or .msgpack). See game.rooms.loader"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The path of the world file.")
+
+    def handle(self, *args, **options):
+        write_world(room_data, options["path"])
+        # Validates the written world
+        world = load_world(options["path"])
+        self.stdout.write(f"Wrote {len(world.rooms)} rooms to {options['path']}")
@@ -0,0 +1,54 @@
+"""
+Command to fill the Room and Exit tables with a world, served with WORLD_DATABASE=1.
+
+The rooms and the exits in the tables are replaced, and the running servers reload the world.
+
+e.g python manage.py importworld
+    python manage.py importworld --source world.jsonl
+"""
+from django.core.management import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from game import models
+from game.rooms import map_navigator
+from game.rooms.loader import load_world
+from game.signals import publish_world_change
+
+
+class Command(BaseCommand):
+    help = "Replaces the rooms and the exits of the database with a world"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help="The world file to import (.jsonl or .msgpack). Defaults to the loaded world.",
+        )
+
+    def handle(self, *args, **options):
+        world = load_world(options["source"]) if options["source"] else map_navigator.world
+        rooms = [world.rooms[room_id] for room_id in sorted(world.rooms)]
+        with transaction.atomic():
+            models.Exit.objects.all().delete()
+            models.Room.objects.all().delete()
+            models.Room.objects.bulk_create(
+                models.Room(id=room.id, name=room.name, desc=room.desc) for room in rooms
+            )
+            models.Exit.objects.bulk_create(
+                models.Exit(
+                    id=exit.id,
+                    name=exit.name,
+                    location_id=exit.location,
+                    destination_id=exit.destination,
+                )
+                for room in rooms
+                for exit in room.exits
+            )
+            # The ids were set explicitly, the sequences of the ids have to catch up (PostgreSQL)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [models.Room, models.Exit]
+                ):
+                    cursor.execute(sql)
+            publish_world_change()
+        self.stdout.write(f"Imported {len(rooms)} rooms")
@@ -0,0 +1,20 @@
+"""
+Command to reload the world in the running servers, without restarting them.
+
+Every process builds the world again from its source (WORLD_DATABASE, WORLD_FILE or
+game/rooms/data.py), validates it, and swaps it in. The players stay connected. The players
+in the removed rooms are moved to the default room.
+
+e.g python manage.py reloadworld
+"""
+from django.core.management import BaseCommand
+
+from game.signals import send_world_reload
+
+
+class Command(BaseCommand):
+    help = "Reloads the world in the running servers. See game.engine.world_cache"
+
+    def handle(self, *args, **options):
+        send_world_reload()
+        self.stdout.write("Sent the reload to the servers")
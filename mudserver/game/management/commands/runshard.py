@@ -0,0 +1,45 @@
+"""
+Command to run a shard of the world.
+
+The shard listens on its channel, and handles the players in the rooms of its region.
+e.g SHARDS=2 python manage.py runshard 0
+"""
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from channels.layers import get_channel_layer
+from channels.routing import get_default_application
+from channels.worker import Worker
+
+from game.engine import sharding
+from game.engine.presence import presence
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Runs the shard owning a region of the world. See game.engine.sharding"
+
+    def add_arguments(self, parser):
+        parser.add_argument("shard", type=int, help="The number of the shard, from 0.")
+
+    def handle(self, *args, **options):
+        shard = options["shard"]
+        if not sharding.regions:
+            raise CommandError("The world is not sharded. Set SHARDS to the number of shards.")
+        if not 0 <= shard < sharding.regions.shard_count:
+            raise CommandError(
+                f"Shard {shard} does not exist. There are {sharding.regions.shard_count} shards."
+            )
+
+        # The shard only keeps the rooms of its region and their neighbours
+        sharding.load_region(shard)
+        rooms = sharding.regions.get_rooms(shard)
+        application = get_default_application()
+        # The players enter the shard when they log in or cross into the region
+        presence.load({})
+
+        channel = sharding.get_shard_channel(shard)
+        logger.info(f"Running shard {shard} with {len(rooms)} rooms on channel {channel}")
+        Worker(application=application, channels=[channel], channel_layer=get_channel_layer()).run()
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.6 on 2026-10-18 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerprofile',
+            name='session_generation',
+            field=models.IntegerField(default=0),
+        ),
+    ]
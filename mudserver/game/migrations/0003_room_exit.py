@@ -0,0 +1,35 @@
+# Generated by Django 4.0.6 on 2026-10-18 03:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_playerprofile_session_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('desc', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Exit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entrances', to='game.room')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exits', to='game.room')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='exit',
+            constraint=models.UniqueConstraint(fields=('location', 'name'), name='unique_exit_direction'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.6 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_room_exit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerprofile',
+            name='checkpointed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
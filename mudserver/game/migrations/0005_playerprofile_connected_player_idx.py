@@ -0,0 +1,17 @@
+# Generated by Django 4.0.6 on 2026-10-18 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_playerprofile_checkpointed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerprofile',
+            index=models.Index(condition=models.Q(('is_connected', True)), fields=['checkpointed_at'], name='connected_player_idx'),
+        ),
+    ]
@@ -32,7 +32,66 @@ class PlayerProfile(Profile):
     Attributes:
         user: The user that this profile belongs to.
         is_connected: Whether the player is currently connected to the server.
+        session_generation: Incremented on quit, to revoke the resume tokens issued before.
+        checkpointed_at: When the state of the connected player was last written by the
+            checkpointer of its process. Connected players not checkpointed for a while were
+            left behind by a crashed process.
     """
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     is_connected = models.BooleanField(default=False)
+    session_generation = models.IntegerField(default=0)
+    checkpointed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The connected players are loaded on startup, and the stale ones are looked up
+            # by their last checkpoint. The location is in the table of the base profile
+            models.Index(
+                fields=["checkpointed_at"],
+                condition=models.Q(is_connected=True),
+                name="connected_player_idx",
+            ),
+        ]
+
+
+class Room(models.Model):
+    """
+    Room of the world, editable by the builders while the server runs.
+
+    The game does not read this table while it runs. The rooms are cached in the world graph
+    of every process (see game.rooms.world_cache), which is updated when a room is changed.
+
+    Attributes:
+        name: The name of the room.
+        desc: The description of the room.
+    """
+
+    name = models.CharField(max_length=100)
+    desc = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Exit(models.Model):
+    """
+    Exit leading from a room to another room.
+
+    Attributes:
+        name: The direction of the exit. e.g north
+        location: The room where the exit is.
+        destination: The room where the exit leads to.
+    """
+
+    name = models.CharField(max_length=20)
+    location = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="exits")
+    destination = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="entrances")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["location", "name"], name="unique_exit_direction")
+        ]
+
+    def __str__(self):
+        return f"{self.location} ({self.name})"
@@ -0,0 +1,286 @@
+"""
+Functions to load the world from a world file.
+
+A world file is a stream of records, either in the JSON lines format (.jsonl, one JSON object
+per line) or in the msgpack format (.msgpack, needs the msgpack package). The first record is
+the header. The next records are chunks of rooms or exits, stored column by column so the
+records stay small and fast to decode.
+
+    {"format": "mudworld", "version": 1, "default_room": 1}
+    {"rooms": {"id": [1, 2], "name": ["Hall", "Garden"], "desc": ["A hall", "A garden"]}}
+    {"exits": {"id": [1, 2], "name": ["north", "south"], "location": [1, 2], "destination": [2, 1]}}
+
+The loader reads the records in a single pass and builds the world graph. The world is
+validated before it is used: every exit must lead from and to an existing room, the ids of
+the rooms must be unique, and a room cannot have two exits in the same direction.
+"""
+import gc
+import json
+import logging
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from types import MappingProxyType
+
+from .map_navigator import Exit, Room, WorldGraph
+
+logger = logging.getLogger(__name__)
+
+FORMAT = "mudworld"
+VERSION = 1
+# Number of rooms or exits in each record of the written world files
+CHUNK_SIZE = 10_000
+# Maximum number of ids listed in the validation errors
+MAX_LISTED_IDS = 10
+
+ROOM_COLUMNS = ("id", "name", "desc")
+EXIT_COLUMNS = ("id", "name", "location", "destination")
+
+
+class WorldValidationError(ValueError):
+    """
+    Raised when a world file is malformed or its rooms and exits are inconsistent.
+
+    Attributes:
+        errors: The list of the problems found in the world.
+    """
+
+    def __init__(self, errors: list) -> None:
+        super().__init__("Invalid world: " + "; ".join(errors))
+        self.errors = errors
+
+
+def import_msgpack():
+    """
+    Imports the optional msgpack package.
+
+    Returns:
+        The msgpack module.
+
+    Throws:
+        ImportError: If the package is not installed.
+    """
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError("Loading msgpack world files needs the msgpack package") from e
+    return msgpack
+
+
+def read_records(path: str):
+    """
+    Reads the records of a world file one at a time.
+
+    Args:
+        path (str): The path of the world file. The format is chosen from the extension.
+
+    Yields:
+        dict: The records.
+    """
+    path = Path(path)
+    if path.suffix == ".msgpack":
+        msgpack = import_msgpack()
+        with open(path, "rb") as file:
+            yield from msgpack.Unpacker(file, raw=False)
+    else:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def describe_ids(ids) -> str:
+    """
+    Formats the ids listed in a validation error.
+
+    Args:
+        ids: The ids.
+
+    Returns:
+        str: The first ids, sorted.
+    """
+    ids = sorted(ids)
+    listed = ", ".join(str(id) for id in ids[:MAX_LISTED_IDS])
+    return listed + (f" and {len(ids) - MAX_LISTED_IDS} more" if len(ids) > MAX_LISTED_IDS else "")
+
+
+def get_columns(record: dict, kind: str, names: tuple) -> tuple:
+    """
+    Gets the columns of a chunk of rooms or exits.
+
+    Args:
+        record (dict): The record.
+        kind (str): The kind of the chunk, rooms or exits.
+        names (tuple): The names of the columns.
+
+    Returns:
+        tuple: The columns, in the order of the names.
+
+    Throws:
+        WorldValidationError: If a column is missing, or the columns have different lengths.
+    """
+    chunk = record[kind]
+    try:
+        columns = tuple(chunk[name] for name in names)
+    except (KeyError, TypeError):
+        raise WorldValidationError([f"A chunk of {kind} does not have the columns {names}"])
+    if len({len(column) for column in columns}) > 1:
+        raise WorldValidationError([f"The columns of a chunk of {kind} have different lengths"])
+    return columns
+
+
+def build_world(records) -> WorldGraph:
+    """
+    Builds the world graph from the records of a world file, in a single pass.
+
+    The garbage collector is paused while the graph is built. The graph holds no reference
+    cycles, and collecting while creating hundreds of thousands of objects would only slow
+    the build down. The rooms and the exits are created with tuple.__new__ rather than the
+    named tuple constructors, which run Python code for every object, and the exits are
+    grouped by room one run of consecutive exits at a time.
+
+    Args:
+        records: The records, starting with the header.
+
+    Returns:
+        The world graph.
+
+    Throws:
+        WorldValidationError: If the world is invalid.
+    """
+    records = iter(records)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get("format") != FORMAT:
+        raise WorldValidationError([f"The world does not start with a {FORMAT} header"])
+    if header.get("version") != VERSION:
+        raise WorldValidationError([f"Unsupported world version {header.get('version')}"])
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        make_exit = partial(tuple.__new__, Exit)
+        get_location = itemgetter(2)
+        get_direction = itemgetter(1, 3)
+        room_chunks = []
+        room_count = 0
+        exits_by_room = {}
+        get_exits = exits_by_room.get
+        destinations = set()
+        for record in records:
+            if "rooms" in record:
+                columns = get_columns(record, "rooms", ROOM_COLUMNS)
+                room_chunks.append(columns)
+                room_count += len(columns[0])
+            elif "exits" in record:
+                columns = get_columns(record, "exits", EXIT_COLUMNS)
+                destinations.update(columns[3])
+                # World files list the exits room by room, so most rooms are a single run
+                for location, run in groupby(map(make_exit, zip(*columns)), get_location):
+                    exits = get_exits(location)
+                    if exits is None:
+                        exits_by_room[location] = list(run)
+                    else:
+                        exits.extend(run)
+            else:
+                raise WorldValidationError([f"Unknown record with the keys {list(record)}"])
+
+        rooms = {}
+        make_room = tuple.__new__
+        no_exits = MappingProxyType({})
+        duplicate_directions = []
+        for ids, names, descs in room_chunks:
+            for room_id, name, desc in zip(ids, names, descs):
+                exits = get_exits(room_id)
+                if exits is None:
+                    rooms[room_id] = make_room(Room, (room_id, name, desc, (), no_exits))
+                    continue
+                directions = dict(map(get_direction, exits))
+                if len(directions) != len(exits):
+                    duplicate_directions.append(room_id)
+                rooms[room_id] = make_room(
+                    Room, (room_id, name, desc, tuple(exits), MappingProxyType(directions))
+                )
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    errors = []
+    if len(rooms) != room_count:
+        errors.append(f"{room_count - len(rooms)} room ids are used more than once")
+    if duplicate_directions:
+        errors.append(
+            f"Rooms with two exits in the same direction: {describe_ids(duplicate_directions)}"
+        )
+    missing_locations = exits_by_room.keys() - rooms.keys()
+    if missing_locations:
+        errors.append(f"Exits lead from the missing rooms {describe_ids(missing_locations)}")
+    dangling_destinations = destinations.difference(rooms)
+    if dangling_destinations:
+        errors.append(f"Exits lead to the missing rooms {describe_ids(dangling_destinations)}")
+    default_room_id = header.get("default_room")
+    if default_room_id not in rooms:
+        errors.append(f"The default room {default_room_id} does not exist")
+    if errors:
+        raise WorldValidationError(errors)
+
+    logger.debug(f"Built a world of {len(rooms)} rooms")
+    return WorldGraph(rooms=MappingProxyType(rooms), default_room_id=default_room_id)
+
+
+def load_world(path: str) -> WorldGraph:
+    """
+    Loads and validates the world from a world file.
+
+    Args:
+        path (str): The path of the world file, .jsonl or .msgpack.
+
+    Returns:
+        The world graph.
+
+    Throws:
+        WorldValidationError: If the world is invalid.
+    """
+    world = build_world(read_records(path))
+    logger.info(f"Loaded {len(world.rooms)} rooms from {path}")
+    return world
+
+
+def iter_world_records(room_data: dict, chunk_size: int = CHUNK_SIZE):
+    """
+    Converts room data to the records of a world file.
+
+    Args:
+        room_data (dict): The room data, in the format of game.rooms.data.room_data.
+        chunk_size (int): The number of rooms or exits in each record.
+
+    Yields:
+        dict: The records, starting with the header.
+    """
+    yield {"format": FORMAT, "version": VERSION, "default_room": room_data["rooms"][0]["id"]}
+    for kind, names in (("rooms", ROOM_COLUMNS), ("exits", EXIT_COLUMNS)):
+        items = room_data[kind]
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start : start + chunk_size]
+            yield {kind: {name: [item[name] for item in chunk] for name in names}}
+
+
+def write_world(room_data: dict, path: str, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Writes room data to a world file.
+
+    Args:
+        room_data (dict): The room data, in the format of game.rooms.data.room_data.
+        path (str): The path of the world file. The format is chosen from the extension.
+        chunk_size (int): The number of rooms or exits in each record.
+    """
+    records = iter_world_records(room_data, chunk_size)
+    if Path(path).suffix == ".msgpack":
+        packer = import_msgpack().Packer()
+        with open(path, "wb") as file:
+            for record in records:
+                file.write(packer.pack(record))
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
@@ -5,6 +5,10 @@ Also supports in navigation of the map.
 """
 import logging
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from django.conf import settings
 
 from .data import room_data
 
@@ -14,15 +18,16 @@ logger = logging.getLogger(__name__)
 DEFAULT_ROOM_INDEX = 0
 
 
-# TODO : Map the rooms to the ORM model so that we can add rooms to the database dynamically.
 # TODO Validate the JSON data describing the rooms and the exits
 
 
-@dataclass(frozen=True)
-class Exit:
+class Exit(NamedTuple):
     """
     Class to represent an exit.
 
+    The rooms and the exits are named tuples, which are much cheaper to create than
+    dataclasses when loading a large world.
+
     Attributes:
         name: The name of the exit.
         id: The id of the exit.
@@ -36,8 +41,7 @@ class Exit:
     destination: int
 
 
-@dataclass(frozen=True)
-class Room:
+class Room(NamedTuple):
     """
     Class to represent a room.
 
@@ -45,50 +49,109 @@ class Room:
         id: The id of the room.
         name: The name of the room.
         description: The description of the room.
-        exits: A list of exits in the room.
+        exits: The exits in the room.
+        directions: Maps the direction of each exit to the id of the destination room.
     """
 
     id: int
     name: str
     desc: str
-    exits: list
+    exits: tuple
+    directions: Mapping[str, int]
+
+
+@dataclass(frozen=True)
+class WorldGraph:
+    """
+    Immutable graph of the rooms.
+
+    Attributes:
+        rooms: Maps the room id to the room.
+        default_room_id: The id of the default room.
+    """
+
+    rooms: Mapping[int, Room]
+    default_room_id: int
+
+
+def make_room(room_id: int, name: str, desc: str, exits) -> Room:
+    """
+    Makes a room and indexes its exits by direction.
+
+    If the room has multiple exits in the same direction, the first one is used to move
+    in that direction.
 
+    Args:
+        room_id (int): The id of the room.
+        name (str): The name of the room.
+        desc (str): The description of the room.
+        exits: The exits in the room.
+
+    Returns:
+        The room.
+    """
+    exits = tuple(exits)
+    directions = {}
+    for exit in exits:
+        directions.setdefault(exit.name, exit.destination)
+    return Room(
+        id=room_id, name=name, desc=desc, exits=exits, directions=MappingProxyType(directions)
+    )
 
-def construct_rooms(room_data: dict) -> list:
+
+def construct_world(room_data: dict) -> WorldGraph:
     """
-    Constructs a list of rooms from the data in the room_data dict.
+    Constructs the world graph from the data in the room_data dict.
+
+    The exits are grouped by room in a single pass, so the cost of building
+    the graph is linear in the number of rooms and exits.
+
+    If a room has multiple exits in the same direction, the first exit
+    in the list of exits is used to move in that direction.
 
     Args:
         room_data: A dict containing the data for the rooms.
 
     Returns:
-        A list of rooms.
+        The world graph.
     """
-    rooms = []
+    exits_by_room = {}
+    for exit_dict in room_data["exits"]:
+        exits_by_room.setdefault(exit_dict["location"], []).append(Exit(**exit_dict))
+
+    rooms = {}
     for room_dict in room_data["rooms"]:
         room_id = room_dict["id"]
-        logger.debug(f"Constructing room {room_id}")
-        exits = []
+        rooms[room_id] = make_room(
+            room_id, room_dict["name"], room_dict["desc"], exits_by_room.get(room_id, ())
+        )
+    logger.debug(f"Constructed {len(rooms)} rooms")
+
+    # Assumptions : There is always a default room and it is the first room in the list.
+    default_room_id = room_data["rooms"][DEFAULT_ROOM_INDEX]["id"]
+    return WorldGraph(rooms=MappingProxyType(rooms), default_room_id=default_room_id)
+
+
+def load_default_world() -> WorldGraph:
+    """
+    Loads the world from the world file in the WORLD_FILE setting, or from the room_data dict
+    when there is no world file. A world snapshot (.snapshot) is memory-mapped.
 
-        # Create the exits for the room
-        # TODO: Check for multiple exits in the same direction
-        # This is a bit of a hack. This logic allows a room to have exits
-        # to the different rooms for the same direction. The get_room_by_id()
-        # will fetch the first exit in the list of exits for the room.
-        for exit_dict in room_data["exits"]:
-            if exit_dict["location"] == room_id:
-                logger.debug(f"Adding exit {exit_dict['id']} to room {room_id}")
-                exit = Exit(**exit_dict)
-                exits.append(exit)
+    Returns:
+        The world graph.
+    """
+    if settings.WORLD_FILE:
+        # Imported here, the loader and the snapshots depend on the classes of this module
+        from .loader import load_world
+        from .snapshot import open_snapshot
 
-        room_dict["exits"] = exits
-        room = Room(**room_dict)
-        rooms.append(room)
-        logger.debug(f"Constructed room {room_id}")
-    return rooms
+        if settings.WORLD_FILE.endswith(".snapshot"):
+            return open_snapshot(settings.WORLD_FILE)
+        return load_world(settings.WORLD_FILE)
+    return construct_world(room_data)
 
 
-rooms = construct_rooms(room_data)
+world = load_default_world()
 
 
 class MapNavigator:
@@ -104,8 +167,7 @@ class MapNavigator:
         Returns:
             int: The default room id.
         """
-        # Assumptions : There is always a default room and it is the first room in the list.
-        return rooms[DEFAULT_ROOM_INDEX].id
+        return world.default_room_id
 
     @staticmethod
     def get_room(room_id: int) -> Room:
@@ -117,11 +179,7 @@ class MapNavigator:
         Returns:
             Room: Room with the given id.
         """
-        logging.debug(f"Getting room with id {room_id}")
-        for room in rooms:
-            if room.id == room_id:
-                return room
-        return None
+        return world.rooms.get(room_id)
 
     @staticmethod
     def move_to(current_location_id: int, direction: str) -> int:
@@ -135,21 +193,17 @@ class MapNavigator:
         Returns:
             int: The id of the room that the player is moved to.
         """
-        # Get the room that the player is in
-        logger.debug(f"Moving {direction} from {current_location_id}")
-        current_location = [room for room in rooms if room.id == current_location_id][0]
-        logger.debug("Current location: " + str(current_location))
-
-        # Check if the direction is valid
-        for exit in current_location.exits:
-            logger.debug("Exit: " + str(exit))
-            if exit.name == direction:
-                logger.debug("Found exit: " + str(exit))
-                return exit.destination
-        logger.error("No exit found")
-
-        # If no exit was found, return the current location
-        return current_location_id
+        current_location = world.rooms.get(current_location_id)
+        if current_location is None:
+            logger.error(f"Room {current_location_id} not found")
+            return current_location_id
+
+        destination = current_location.directions.get(direction)
+        if destination is None:
+            logger.error("No exit found")
+            # If no exit was found, return the current location
+            return current_location_id
+        return destination
 
     @staticmethod
     def get_room_name(room_id: int) -> str:
@@ -0,0 +1,117 @@
+"""
+Functions to partition the map of the game into regions.
+
+In sharded mode, every region is owned by a shard, a worker process handling the players
+in the rooms of the region. The rooms are partitioned along the exits, so most moves stay
+within a region and only the moves crossing a region boundary hand the player off to
+another shard.
+"""
+import logging
+from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from .map_navigator import WorldGraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RegionMap:
+    """
+    Maps every room to the shard owning its region.
+
+    Attributes:
+        shards: Maps the room id to the shard number.
+        shard_count: The number of shards.
+    """
+
+    shards: Mapping[int, int]
+    shard_count: int
+
+    def get_shard(self, room_id: int) -> int:
+        """
+        Gets the shard owning the room. Unknown rooms are owned by the first shard.
+
+        Args:
+            room_id (int): The room id.
+
+        Returns:
+            int: The shard number.
+        """
+        return self.shards.get(room_id, 0)
+
+    def get_rooms(self, shard: int) -> set:
+        """
+        Gets the rooms of the region owned by the shard.
+
+        Args:
+            shard (int): The shard number.
+
+        Returns:
+            set: The room ids.
+        """
+        return {room_id for room_id, owner in self.shards.items() if owner == shard}
+
+
+def partition_world(world: WorldGraph, shard_count: int) -> RegionMap:
+    """
+    Partitions the rooms into regions of the same size.
+
+    The rooms are ordered by a breadth first walk along the exits from the default room,
+    then split into contiguous slices, so neighbouring rooms tend to share a region.
+    The partition only depends on the world, so every process computes the same regions.
+
+    Args:
+        world (WorldGraph): The world graph.
+        shard_count (int): The number of shards.
+
+    Returns:
+        RegionMap: The region of every room.
+    """
+    order = []
+    visited = set()
+    # The rooms that cannot be reached from the default room are walked in the order of their ids
+    for start in [world.default_room_id, *sorted(world.rooms)]:
+        if start in visited or start not in world.rooms:
+            continue
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            room_id = queue.popleft()
+            order.append(room_id)
+            for exit in world.rooms[room_id].exits:
+                if exit.destination not in visited and exit.destination in world.rooms:
+                    visited.add(exit.destination)
+                    queue.append(exit.destination)
+
+    region_size = -(-len(order) // shard_count) or 1
+    shards = {room_id: index // region_size for index, room_id in enumerate(order)}
+    logger.debug(f"Partitioned {len(shards)} rooms into {shard_count} regions")
+    return RegionMap(shards=MappingProxyType(shards), shard_count=shard_count)
+
+
+def restrict_world(world: WorldGraph, room_ids: set) -> WorldGraph:
+    """
+    Restricts the world graph to the given rooms and the rooms their exits lead to.
+
+    A shard only needs the rooms of its region, and the names of the neighbouring rooms
+    to describe the exits.
+
+    Args:
+        world (WorldGraph): The world graph.
+        room_ids (set): The ids of the rooms to keep.
+
+    Returns:
+        WorldGraph: The restricted world graph.
+    """
+    kept = set()
+    for room_id in room_ids:
+        room = world.rooms.get(room_id)
+        if room is None:
+            continue
+        kept.add(room_id)
+        kept.update(exit.destination for exit in room.exits)
+    rooms = {room_id: world.rooms[room_id] for room_id in kept if room_id in world.rooms}
+    return WorldGraph(rooms=MappingProxyType(rooms), default_room_id=world.default_room_id)
@@ -0,0 +1,232 @@
+"""
+Class to find the shortest routes between the rooms, for the travel command, and the rooms
+close to a room, for the shout command.
+
+In a small world, the next hop from every room to every other room is computed once, with a
+breadth-first search from every room, and the routes are read from the table. A large world
+would make the table too big, so the routes are found with a breadth-first search stopping at
+the destination, and the recent routes are cached.
+
+The routes follow the exits the players move through: the first exit in a direction.
+
+The neighbourhood of a room is the set of the rooms within a number of exits of the room.
+It is computed on first use, and the neighbourhoods of the busiest rooms are cached.
+"""
+import functools
+import logging
+from collections import deque
+
+import game.rooms.map_navigator as map_navigator
+from game.rooms.map_navigator import WorldGraph
+
+logger = logging.getLogger(__name__)
+
+# Worlds up to this number of rooms get a precomputed next-hop table
+NEXT_HOP_TABLE_MAX_ROOMS = 128
+# Number of routes cached in the worlds without a next-hop table
+ROUTE_CACHE_SIZE = 1024
+# Number of neighbourhoods cached
+NEIGHBOURHOOD_CACHE_SIZE = 4096
+
+
+class RoutingTable:
+    """
+    Routes between the rooms of a world.
+
+    Attributes:
+        world: The world.
+        next_hops: Maps each room id to a dict mapping the id of every reachable room to the
+            direction of the first exit of the route and the number of exits of the route.
+            None if the world is too large for the table.
+        rooms_by_name: Maps the lowercase room names to the ids of the rooms. Built on first use.
+        search: Finds the route to the nearest target with a breadth-first search, cached.
+        get_neighbourhood: Gets the ids of the rooms within a number of exits of a room, cached.
+    """
+
+    def __init__(self, world: WorldGraph) -> None:
+        self.world = world
+        self.next_hops = None
+        self.rooms_by_name = None
+        self.search = functools.lru_cache(maxsize=ROUTE_CACHE_SIZE)(self.__search)
+        self.get_neighbourhood = functools.lru_cache(maxsize=NEIGHBOURHOOD_CACHE_SIZE)(
+            self.__find_neighbourhood
+        )
+        if len(world.rooms) <= NEXT_HOP_TABLE_MAX_ROOMS:
+            self.next_hops = {room_id: self.__walk(room_id) for room_id in world.rooms}
+            logger.debug(f"Computed the next hops of {len(world.rooms)} rooms")
+
+    def get_room_ids(self, name: str) -> frozenset:
+        """
+        Gets the rooms with the given name, ignoring the case.
+
+        Args:
+            name (str): The name of the room.
+
+        Returns:
+            frozenset: The ids of the rooms. Empty if there is no room with the name.
+        """
+        if self.rooms_by_name is None:
+            rooms_by_name = {}
+            for room in self.world.rooms.values():
+                rooms_by_name.setdefault(room.name.lower(), set()).add(room.id)
+            self.rooms_by_name = {name: frozenset(ids) for name, ids in rooms_by_name.items()}
+        return self.rooms_by_name.get(name.strip().lower(), frozenset())
+
+    def find_route(self, source: int, targets: frozenset) -> tuple:
+        """
+        Finds the shortest route from a room to the nearest of the target rooms.
+
+        Args:
+            source (int): The id of the room where the route starts.
+            targets (frozenset): The ids of the rooms where the route can end.
+
+        Returns:
+            tuple: The id of the room where the route ends, and the tuple of the directions of
+            the exits to take, in order. None if no target can be reached.
+        """
+        if self.next_hops is None:
+            return self.search(source, targets)
+
+        hops = self.next_hops.get(source)
+        if hops is None:
+            return None
+        reachable = [target for target in targets if target in hops]
+        if not reachable:
+            return None
+        target = min(reachable, key=lambda target: (hops[target][1], target))
+        directions = []
+        room_id = source
+        while room_id != target:
+            direction, _ = self.next_hops[room_id][target]
+            directions.append(direction)
+            room_id = self.world.rooms[room_id].directions[direction]
+        return target, tuple(directions)
+
+    def __find_neighbourhood(self, room_id: int, radius: int) -> tuple:
+        """
+        Finds the rooms within a number of exits of a room. Cached by get_neighbourhood().
+
+        Args:
+            room_id (int): The room id.
+            radius (int): The maximum number of exits between the room and its neighbourhood.
+
+        Returns:
+            tuple: The ids of the rooms of the neighbourhood, nearest first, starting with
+            the room itself. Empty if the room does not exist.
+        """
+        if room_id not in self.world.rooms:
+            return ()
+        if self.next_hops is not None:
+            hops = self.next_hops[room_id]
+            return tuple(target for target, (_, distance) in hops.items() if distance <= radius)
+
+        distances = {room_id: 0}
+        queue = deque([room_id])
+        while queue:
+            current = queue.popleft()
+            if distances[current] == radius:
+                continue
+            for _, destination in self.__get_neighbours(current):
+                if destination not in distances:
+                    distances[destination] = distances[current] + 1
+                    queue.append(destination)
+        return tuple(distances)
+
+    def __get_neighbours(self, room_id: int):
+        """
+        Gets the rooms the exits of a room lead to.
+
+        Args:
+            room_id (int): The room id.
+
+        Yields:
+            tuple: The direction of the exit, and the id of the room it leads to.
+        """
+        for direction, destination in self.world.rooms[room_id].directions.items():
+            if destination in self.world.rooms:
+                yield direction, destination
+
+    def __walk(self, source: int) -> dict:
+        """
+        Walks the world from a room, breadth first.
+
+        Args:
+            source (int): The id of the room where the walk starts.
+
+        Returns:
+            dict: Maps the id of every reachable room to the direction of the first exit of the
+            shortest route to the room, and the number of exits of the route.
+        """
+        hops = {source: (None, 0)}
+        queue = deque([source])
+        while queue:
+            room_id = queue.popleft()
+            first_direction, distance = hops[room_id]
+            for direction, destination in self.__get_neighbours(room_id):
+                if destination not in hops:
+                    hops[destination] = (first_direction or direction, distance + 1)
+                    queue.append(destination)
+        return hops
+
+    def __search(self, source: int, targets: frozenset) -> tuple:
+        """
+        Searches the shortest route to the nearest target, breadth first.
+
+        Args:
+            source (int): The id of the room where the route starts.
+            targets (frozenset): The ids of the rooms where the route can end.
+
+        Returns:
+            tuple: See find_route().
+        """
+        if source not in self.world.rooms:
+            return None
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            room_id = queue.popleft()
+            if room_id in targets:
+                target = room_id
+                directions = []
+                while parents[room_id] is not None:
+                    room_id, direction = parents[room_id]
+                    directions.append(direction)
+                return target, tuple(reversed(directions))
+            for direction, destination in self.__get_neighbours(room_id):
+                if destination not in parents:
+                    parents[destination] = (room_id, direction)
+                    queue.append(destination)
+        return None
+
+
+class Router:
+    """
+    Routing table of the world of the map navigator.
+
+    The table is built again as soon as the map navigator uses another world.
+
+    Attributes:
+        world: The world to route in place of the world of the map navigator. e.g a shard
+            routes on the whole world, while its map navigator only keeps its region.
+        table: The routing table of the world.
+    """
+
+    def __init__(self) -> None:
+        self.world = None
+        self.table = None
+
+    def get_table(self) -> RoutingTable:
+        """
+        Gets the routing table of the world, or of the world of the map navigator.
+
+        Returns:
+            RoutingTable: The routing table.
+        """
+        world = map_navigator.world if self.world is None else self.world
+        if self.table is None or self.table.world is not world:
+            self.table = RoutingTable(world)
+        return self.table
+
+
+# Router of the process
+router = Router()
@@ -0,0 +1,349 @@
+"""
+Functions to compile the world into a binary snapshot, and to open a snapshot.
+
+A snapshot holds the rooms and the exits in flat arrays, and every string once in a string
+table. The server memory-maps the snapshot instead of building the world graph: opening it
+does not depend on the size of the world, and the worker processes share the pages of the
+file. The rooms are decoded when they are looked up.
+
+The trade-off is the cost of a lookup: decoding a room takes about 10 µs, against well under
+1 µs for the world graph in memory, and every move looks up the rooms. The most recently used
+rooms are cached (see ROOM_CACHE_SIZE), so the rooms the players are in stay decoded, but a
+snapshot suits a large world rarely visited as a whole rather than a small busy one.
+
+Layout, little-endian, every section aligned on 8 bytes:
+
+    header          magic, version, default room id, number of rooms, exits and strings
+    room ids        int64, sorted
+    room names      uint32, index in the string table
+    room descs      uint32, index in the string table
+    room exits      uint32, index of the first exit of each room, plus the number of exits
+    exit ids        int64
+    exit names      uint32, index in the string table
+    exit dests      int64, id of the destination room
+    string offsets  uint64, offset of each string in the string data, plus its size
+    string data     UTF-8
+"""
+import bisect
+import functools
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping
+from itertools import repeat
+from types import MappingProxyType
+
+from .map_navigator import Exit, Room, WorldGraph
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MUDSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIxxxxqQQQ")
+# Number of decoded rooms kept by each opened snapshot
+ROOM_CACHE_SIZE = 4096
+# Permissions of the compiled snapshots. The temporary files are only readable by their owner
+FILE_MODE = 0o644
+
+# Type code of the array of each section, in the order of the file
+SECTIONS = (
+    ("room_ids", "q"),
+    ("room_names", "I"),
+    ("room_descs", "I"),
+    ("room_exits", "I"),
+    ("exit_ids", "q"),
+    ("exit_names", "I"),
+    ("exit_destinations", "q"),
+    ("string_offsets", "Q"),
+)
+
+
+class SnapshotError(ValueError):
+    """
+    Raised when a file is not a world snapshot, or not a snapshot this server can read.
+    """
+
+
+def align(size: int) -> int:
+    """
+    Rounds a size up to the alignment of the sections.
+
+    Args:
+        size (int): The size in bytes.
+
+    Returns:
+        int: The aligned size.
+    """
+    return (size + 7) & ~7
+
+
+def get_section_lengths(room_count: int, exit_count: int, string_count: int) -> tuple:
+    """
+    Gets the number of items of each section.
+
+    Args:
+        room_count (int): The number of rooms.
+        exit_count (int): The number of exits.
+        string_count (int): The number of strings.
+
+    Returns:
+        tuple: The number of items of each section, in the order of SECTIONS.
+    """
+    return (
+        room_count,
+        room_count,
+        room_count,
+        room_count + 1,
+        exit_count,
+        exit_count,
+        exit_count,
+        string_count + 1,
+    )
+
+
+def compile_world(world: WorldGraph, path: str) -> None:
+    """
+    Compiles the world graph into a snapshot file.
+
+    The snapshot is written to a temporary file, which then replaces the file at the path.
+    The servers that memory-mapped the previous snapshot keep reading the previous file:
+    rewriting a mapped file in place would crash them.
+
+    Args:
+        world (WorldGraph): The world.
+        path (str): The path of the snapshot.
+    """
+    strings = {}
+
+    def intern(string: str) -> int:
+        return strings.setdefault(string, len(strings))
+
+    columns = {name: array(type_code) for name, type_code in SECTIONS}
+    for room_id in sorted(world.rooms):
+        room = world.rooms[room_id]
+        columns["room_ids"].append(room_id)
+        columns["room_names"].append(intern(room.name))
+        columns["room_descs"].append(intern(room.desc))
+        columns["room_exits"].append(len(columns["exit_ids"]))
+        for exit in room.exits:
+            columns["exit_ids"].append(exit.id)
+            columns["exit_names"].append(intern(exit.name))
+            columns["exit_destinations"].append(exit.destination)
+    columns["room_exits"].append(len(columns["exit_ids"]))
+
+    data = bytearray()
+    for string in strings:
+        columns["string_offsets"].append(len(data))
+        data += string.encode("utf-8")
+    columns["string_offsets"].append(len(data))
+
+    path = os.fspath(path)
+    file = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp", delete=False
+    )
+    try:
+        with file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    world.default_room_id,
+                    len(world.rooms),
+                    len(columns["exit_ids"]),
+                    len(strings),
+                )
+            )
+            file.write(bytes(align(HEADER.size) - HEADER.size))
+            for name, _ in SECTIONS:
+                column = columns[name]
+                if sys.byteorder != "little":
+                    column.byteswap()
+                size = column.itemsize * len(column)
+                file.write(column.tobytes())
+                file.write(bytes(align(size) - size))
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(file.name, FILE_MODE)
+        os.replace(file.name, path)
+    except BaseException:
+        os.unlink(file.name)
+        raise
+    logger.info(f"Compiled {len(world.rooms)} rooms into {path}")
+
+
+class SnapshotRooms(Mapping):
+    """
+    Read-only mapping of the room ids to the rooms, backed by a memory-mapped snapshot.
+
+    The rooms are decoded on access. The most recently used ones are cached.
+
+    Attributes:
+        buffer: The memory map of the snapshot.
+        view: The view on the memory map, sliced into the arrays of the sections.
+        strings: The string data.
+        exit_name_cache: Maps the index of the name of an exit in the string table to the name.
+    """
+
+    def __init__(self, buffer, counts: tuple) -> None:
+        room_count, exit_count, string_count = counts
+        self.buffer = buffer
+        self.view = view = memoryview(buffer)
+        offset = align(HEADER.size)
+        for (name, type_code), length in zip(
+            SECTIONS, get_section_lengths(room_count, exit_count, string_count)
+        ):
+            size = struct.calcsize(type_code) * length
+            if offset + size > len(buffer):
+                raise SnapshotError("The snapshot is truncated")
+            setattr(self, name, view[offset : offset + size].cast(type_code))
+            offset = align(offset + size)
+        self.strings = view[offset:]
+        if len(self.strings) != self.string_offsets[-1]:
+            raise SnapshotError("The snapshot is truncated")
+
+        # With contiguous ids, the index of a room is computed instead of searched
+        self.first_id = self.room_ids[0] if room_count else 0
+        self.contiguous = room_count == 0 or self.room_ids[-1] - self.first_id == room_count - 1
+        self.exit_name_cache = {}
+        self.get_room = functools.lru_cache(maxsize=ROOM_CACHE_SIZE)(self.__decode_room)
+
+    def __getitem__(self, room_id: int) -> Room:
+        room = self.get_room(room_id)
+        if room is None:
+            raise KeyError(room_id)
+        return room
+
+    def __contains__(self, room_id) -> bool:
+        return self.__find(room_id) is not None
+
+    def __iter__(self):
+        return iter(self.room_ids)
+
+    def __len__(self) -> int:
+        return len(self.room_ids)
+
+    def close(self) -> None:
+        """
+        Unmaps the snapshot. The rooms already decoded stay valid.
+        """
+        self.get_room.cache_clear()
+        for name, _ in SECTIONS:
+            getattr(self, name).release()
+        self.strings.release()
+        self.view.release()
+        self.buffer.close()
+
+    def __find(self, room_id) -> int:
+        """
+        Finds the index of a room in the arrays of the rooms.
+
+        Args:
+            room_id (int): The room id.
+
+        Returns:
+            int: The index of the room, None if there is no room with the id.
+        """
+        if not isinstance(room_id, int):
+            return None
+        if self.contiguous:
+            index = room_id - self.first_id
+            return index if 0 <= index < len(self.room_ids) else None
+        index = bisect.bisect_left(self.room_ids, room_id)
+        if index < len(self.room_ids) and self.room_ids[index] == room_id:
+            return index
+        return None
+
+    def __get_string(self, index: int) -> str:
+        """
+        Decodes a string of the string table.
+
+        Args:
+            index (int): The index of the string.
+
+        Returns:
+            str: The string.
+        """
+        start, end = self.string_offsets[index], self.string_offsets[index + 1]
+        return str(self.strings[start:end], "utf-8")
+
+    def __get_exit_name(self, index: int) -> str:
+        """
+        Decodes the name of an exit. The exits share a few names, which are decoded once.
+
+        Args:
+            index (int): The index of the name in the string table.
+
+        Returns:
+            str: The name of the exit.
+        """
+        name = self.exit_name_cache.get(index)
+        if name is None:
+            name = self.exit_name_cache[index] = sys.intern(self.__get_string(index))
+        return name
+
+    def __decode_room(self, room_id: int) -> Room:
+        """
+        Decodes a room from the snapshot.
+
+        Args:
+            room_id (int): The room id.
+
+        Returns:
+            Room: The room, None if there is no room with the id.
+        """
+        index = self.__find(room_id)
+        if index is None:
+            return None
+        start, end = self.room_exits[index], self.room_exits[index + 1]
+        names = [self.__get_exit_name(name) for name in self.exit_names[start:end].tolist()]
+        destinations = self.exit_destinations[start:end].tolist()
+        exits = tuple(
+            map(Exit, self.exit_ids[start:end].tolist(), names, repeat(room_id), destinations)
+        )
+        # Reversed, so the first exit in a direction is used to move
+        directions = dict(zip(reversed(names), reversed(destinations)))
+        return Room(
+            room_id,
+            self.__get_string(self.room_names[index]),
+            self.__get_string(self.room_descs[index]),
+            exits,
+            MappingProxyType(directions),
+        )
+
+
+def open_snapshot(path: str) -> WorldGraph:
+    """
+    Memory-maps a snapshot file. Only the header is read.
+
+    Args:
+        path (str): The path of the snapshot.
+
+    Returns:
+        The world graph, with the rooms read from the snapshot.
+
+    Throws:
+        SnapshotError: If the file is not a snapshot, or was compiled by another version.
+    """
+    if sys.byteorder != "little":
+        raise SnapshotError("Snapshots can only be opened on little-endian machines")
+    with open(path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            # The file is empty
+            raise SnapshotError(f"{path} is not a world snapshot") from e
+    if len(buffer) < HEADER.size:
+        raise SnapshotError(f"{path} is not a world snapshot")
+    magic, version, default_room_id, *counts = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not a world snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}, recompile the world")
+    rooms = SnapshotRooms(buffer, tuple(counts))
+    logger.info(f"Opened a snapshot of {len(rooms)} rooms from {path}")
+    return WorldGraph(rooms=rooms, default_room_id=default_room_id)
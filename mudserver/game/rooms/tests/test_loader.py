@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from game.rooms.data import room_data
+from game.rooms.loader import (
+    WorldValidationError,
+    build_world,
+    iter_world_records,
+    load_world,
+    write_world,
+)
+from game.rooms.map_navigator import construct_world
+
+HEADER = {"format": "mudworld", "version": 1, "default_room": 1}
+
+
+def rooms(*ids):
+    names = [f"Room {id}" for id in ids]
+    return {"rooms": {"id": list(ids), "name": names, "desc": [""] * len(ids)}}
+
+
+def exits(*exits):
+    return {
+        "exits": {
+            "id": list(range(1, len(exits) + 1)),
+            "name": [name for name, _, _ in exits],
+            "location": [location for _, location, _ in exits],
+            "destination": [destination for _, _, destination in exits],
+        }
+    }
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".msgpack"])
+def test_write_and_load_world(tmp_path, suffix):
+    if suffix == ".msgpack":
+        pytest.importorskip("msgpack")
+    path = tmp_path / f"world{suffix}"
+    write_world(room_data, path, chunk_size=3)
+
+    assert load_world(path) == construct_world(room_data)
+
+
+def test_world_file_is_versioned(tmp_path):
+    path = tmp_path / "world.jsonl"
+    write_world(room_data, path)
+    header = json.loads(path.read_text().splitlines()[0])
+    assert header == {"format": "mudworld", "version": 1, "default_room": 1}
+
+
+def test_build_world_from_chunks():
+    # The exits can come before the rooms, and the rooms can be split in several chunks
+    world = build_world([HEADER, exits(("east", 1, 2), ("west", 2, 1)), rooms(1), rooms(2, 3)])
+
+    assert list(world.rooms) == [1, 2, 3]
+    assert world.rooms[1].directions == {"east": 2}
+    assert world.rooms[3].exits == ()
+    assert world.default_room_id == 1
+
+
+@pytest.mark.parametrize(
+    "records, error",
+    [
+        ([], "does not start with a mudworld header"),
+        ([{**HEADER, "version": 2}], "Unsupported world version 2"),
+        ([HEADER, rooms(1), exits(("east", 1, 2))], "Exits lead to the missing rooms 2"),
+        ([HEADER, rooms(1), exits(("east", 3, 1))], "Exits lead from the missing rooms 3"),
+        (
+            [HEADER, rooms(1, 2), exits(("east", 1, 2), ("east", 1, 1))],
+            "Rooms with two exits in the same direction: 1",
+        ),
+        ([HEADER, rooms(1, 2), rooms(2)], "1 room ids are used more than once"),
+        ([{**HEADER, "default_room": 5}, rooms(1)], "The default room 5 does not exist"),
+        ([HEADER, {"rooms": {"id": [1], "name": []}}], "does not have the columns"),
+        ([HEADER, {"rooms": {"id": [1], "name": [], "desc": []}}], "different lengths"),
+        ([HEADER, {"doors": {}}], "Unknown record"),
+    ],
+)
+def test_invalid_world(records, error):
+    with pytest.raises(WorldValidationError, match=error):
+        build_world(records)
+
+
+def test_validation_lists_all_errors():
+    with pytest.raises(WorldValidationError) as e:
+        build_world([HEADER, rooms(1), exits(("east", 1, 2), ("west", 4, 1))])
+    assert len(e.value.errors) == 2
+
+
+def test_iter_world_records_chunks():
+    records = list(iter_world_records(room_data, chunk_size=2))
+    assert [list(record)[0] for record in records] == ["format"] + ["rooms"] * 3 + ["exits"] * 5
@@ -45,3 +45,36 @@ def test_get_room_name(room_id):
 def test_get_room_name_not_found():
     room_name = map_navigator.MapNavigator.get_room_name(room_id=-1)
     assert room_name == None
+
+
+def test_construct_world():
+    room_data = {
+        "rooms": [
+            {"id": 7, "name": "Hall", "desc": "A hall"},
+            {"id": 8, "name": "Garden", "desc": "A garden"},
+            {"id": 9, "name": "Cellar", "desc": "A cellar"},
+        ],
+        "exits": [
+            {"id": 1, "name": "north", "location": 7, "destination": 8},
+            {"id": 2, "name": "north", "location": 7, "destination": 9},
+            {"id": 3, "name": "south", "location": 8, "destination": 7},
+        ],
+    }
+    world = map_navigator.construct_world(room_data)
+
+    assert world.default_room_id == 7
+    assert list(world.rooms) == [7, 8, 9]
+    # The first exit is used when a room has multiple exits in the same direction
+    assert world.rooms[7].directions == {"north": 8}
+    assert [exit.id for exit in world.rooms[7].exits] == [1, 2]
+    assert world.rooms[9].exits == ()
+    # The room data is not modified
+    assert "exits" not in room_data["rooms"][0]
+
+
+@pytest.mark.parametrize(
+    "current_location_id, direction",
+    [(1, "north"), (1, "up"), (-1, "west")],
+)
+def test_move_to_without_exit(current_location_id, direction):
+    assert map_navigator.MapNavigator.move_to(current_location_id, direction) == current_location_id
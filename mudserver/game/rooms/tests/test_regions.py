@@ -0,0 +1,35 @@
+from game.rooms.map_navigator import construct_world
+from game.rooms.regions import partition_world, restrict_world
+
+room_data = {
+    "rooms": [{"id": id, "name": f"Room {id}", "desc": ""} for id in range(1, 7)],
+    # A corridor 1 - 2 - 3 - 4 - 5, and room 6 that cannot be reached
+    "exits": [
+        {"id": 1, "name": "east", "location": 1, "destination": 2},
+        {"id": 2, "name": "east", "location": 2, "destination": 3},
+        {"id": 3, "name": "east", "location": 3, "destination": 4},
+        {"id": 4, "name": "east", "location": 4, "destination": 5},
+        {"id": 5, "name": "west", "location": 5, "destination": 4},
+    ],
+}
+
+
+def test_partition_world():
+    regions = partition_world(construct_world(room_data), 3)
+    assert dict(regions.shards) == {1: 0, 2: 0, 3: 1, 4: 1, 5: 2, 6: 2}
+    assert regions.get_rooms(1) == {3, 4}
+    # Unknown rooms are owned by the first shard
+    assert regions.get_shard(100) == 0
+
+
+def test_partition_world_into_more_shards_than_rooms():
+    regions = partition_world(construct_world(room_data), 10)
+    assert sorted(regions.shards.values()) == [0, 1, 2, 3, 4, 5]
+
+
+def test_restrict_world():
+    world = restrict_world(construct_world(room_data), {1, 2})
+    # The neighbouring rooms are kept to describe the exits
+    assert set(world.rooms) == {1, 2, 3}
+    assert world.rooms[2].directions["east"] == 3
+    assert world.default_room_id == 1
@@ -0,0 +1,90 @@
+from unittest import mock
+
+import pytest
+
+from benchmarks.worlds import make_room_data
+from game.rooms import map_navigator, routing
+from game.rooms.data import room_data
+from game.rooms.map_navigator import construct_world
+from game.rooms.routing import Router, RoutingTable
+
+
+@pytest.fixture(params=["next_hop_table", "search"])
+def make_table(request, monkeypatch):
+    if request.param == "search":
+        monkeypatch.setattr(routing, "NEXT_HOP_TABLE_MAX_ROOMS", 0)
+    return RoutingTable
+
+
+def test_find_route(make_table):
+    table = make_table(construct_world(room_data))
+    machine_room = table.get_room_ids("the backend MACHINE room ")
+
+    assert machine_room == {5}
+    assert table.find_route(1, machine_room) == (5, ("west", "north", "west"))
+    assert table.find_route(5, frozenset({1})) == (1, ("east", "south", "east"))
+    assert table.find_route(1, frozenset({1})) == (1, ())
+
+
+def test_route_to_the_nearest_room(make_table):
+    table = make_table(construct_world(make_room_data(200)))
+
+    assert table.find_route(50, frozenset({10, 52, 190})) == (52, ("east", "east"))
+
+
+def test_unreachable_room(make_table):
+    world = construct_world(
+        {
+            "rooms": [
+                {"id": 1, "name": "Hall", "desc": ""},
+                {"id": 2, "name": "Pit", "desc": ""},
+            ],
+            "exits": [{"id": 1, "name": "down", "location": 1, "destination": 2}],
+        }
+    )
+    table = make_table(world)
+
+    assert table.find_route(1, frozenset({2})) == (2, ("down",))
+    assert table.find_route(2, frozenset({1})) is None
+    assert table.get_room_ids("Attic") == frozenset()
+
+
+def test_routes_follow_the_moves(make_table):
+    world = construct_world(make_room_data(200))
+    table = make_table(world)
+
+    with mock.patch.object(map_navigator, "world", world):
+        destination, directions = table.find_route(3, frozenset({170}))
+        location = 3
+        for direction in directions:
+            location = map_navigator.MapNavigator.move_to(location, direction)
+        assert location == destination == 170
+
+
+def test_router_follows_the_world():
+    router = Router()
+    table = router.get_table()
+    assert router.get_table() is table
+
+    world = construct_world(room_data)
+    with mock.patch.object(map_navigator, "world", world):
+        assert router.get_table() is not table
+        assert router.get_table().world is world
+
+
+def test_neighbourhood(make_table):
+    table = make_table(construct_world(room_data))
+
+    assert table.get_neighbourhood(1, 0) == (1,)
+    assert table.get_neighbourhood(1, 1) == (1, 2)
+    assert set(table.get_neighbourhood(1, 2)) == {1, 2, 3, 4}
+    assert table.get_neighbourhood(1, 2) is table.get_neighbourhood(1, 2)
+    assert table.get_neighbourhood(0, 2) == ()
+
+
+def test_neighbourhood_in_a_large_world(make_table):
+    table = make_table(construct_world(make_room_data(400)))
+
+    # The 20x20 grid, from a room in the middle
+    assert len(table.get_neighbourhood(210, 2)) == 13
+    assert len(table.get_neighbourhood(1, 2)) == 6
@@ -0,0 +1,122 @@
+import os
+import stat
+
+import pytest
+
+from game.rooms.data import room_data
+from game.rooms.map_navigator import construct_world
+from game.rooms.snapshot import FILE_MODE, SnapshotError, compile_world, open_snapshot
+
+
+@pytest.fixture
+def world():
+    return construct_world(room_data)
+
+
+def test_compile_and_open_snapshot(tmp_path, world):
+    path = tmp_path / "world.snapshot"
+    compile_world(world, path)
+    snapshot = open_snapshot(path)
+
+    assert snapshot == world
+    assert list(snapshot.rooms) == sorted(world.rooms)
+    assert snapshot.rooms[1] is snapshot.rooms[1]
+    assert snapshot.rooms.get(0) is None
+    assert "1" not in snapshot.rooms
+
+
+def test_sparse_room_ids(tmp_path):
+    world = construct_world(
+        {
+            "rooms": [
+                {"id": 30, "name": "Hall", "desc": "A hall"},
+                {"id": 5, "name": "Garden", "desc": "A garden"},
+                {"id": 7, "name": "Cave", "desc": "Une grotte sombre"},
+            ],
+            "exits": [
+                {"id": 1, "name": "south", "location": 30, "destination": 5},
+                {"id": 2, "name": "down", "location": 5, "destination": 7},
+                {"id": 3, "name": "down", "location": 5, "destination": 30},
+            ],
+        }
+    )
+    path = tmp_path / "world.snapshot"
+    compile_world(world, path)
+    snapshot = open_snapshot(path)
+
+    assert not snapshot.rooms.contiguous
+    assert snapshot == world
+    assert snapshot.default_room_id == 30
+    # The first exit in a direction is used to move
+    assert snapshot.rooms[5].directions == {"down": 7}
+    assert 6 not in snapshot.rooms
+
+
+def test_strings_are_interned(tmp_path):
+    world = construct_world(
+        {
+            "rooms": [
+                {"id": id, "name": "Corridor", "desc": "A long corridor"} for id in (1, 2, 3)
+            ],
+            "exits": [
+                {"id": id, "name": "onwards", "location": id, "destination": id % 3 + 1}
+                for id in (1, 2, 3)
+            ],
+        }
+    )
+    path = tmp_path / "world.snapshot"
+    compile_world(world, path)
+
+    data = path.read_bytes()
+    assert data.count(b"Corridor") == 1
+    assert data.count(b"A long corridor") == 1
+    assert data.count(b"onwards") == 1
+    assert open_snapshot(path) == world
+
+
+def test_invalid_snapshots(tmp_path, world):
+    path = tmp_path / "world.snapshot"
+    path.write_bytes(b"")
+    with pytest.raises(SnapshotError):
+        open_snapshot(path)
+
+    path.write_bytes(b"not a snapshot at all, not a snapshot at all")
+    with pytest.raises(SnapshotError, match="not a world snapshot"):
+        open_snapshot(path)
+
+    compile_world(world, path)
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(SnapshotError, match="truncated"):
+        open_snapshot(path)
+
+
+def test_close_keeps_decoded_rooms(tmp_path, world):
+    path = tmp_path / "world.snapshot"
+    compile_world(world, path)
+    snapshot = open_snapshot(path)
+    room = snapshot.rooms[1]
+    snapshot.rooms.close()
+
+    assert room == world.rooms[1]
+
+
+def test_compile_over_an_opened_snapshot(tmp_path, world):
+    path = tmp_path / "world.snapshot"
+    compile_world(world, path)
+    snapshot = open_snapshot(path)
+
+    other_world = construct_world(
+        {
+            "rooms": [{"id": 1, "name": "Void", "desc": "Nothing"}],
+            "exits": [],
+        }
+    )
+    compile_world(other_world, path)
+
+    # The opened snapshot keeps reading the previous file
+    assert snapshot == world
+    assert snapshot.rooms[len(world.rooms)] == world.rooms[len(world.rooms)]
+    assert open_snapshot(path) == other_world
+    assert [file.name for file in tmp_path.iterdir()] == ["world.snapshot"]
+    # Readable by the servers, whatever user compiled it
+    assert stat.S_IMODE(os.stat(path).st_mode) == FILE_MODE
@@ -0,0 +1,92 @@
+"""
+Functions to tell every process of the server that the world was changed.
+
+The rooms and the exits are cached in the world graph of every process. When a room or an
+exit is saved or deleted, the ids of the changed rooms are sent to the world channel group
+once the transaction is committed, and every process reloads these rooms
+(see game.engine.world_cache). The whole world can be reloaded the same way.
+"""
+import logging
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from game.models import Exit, Room
+
+logger = logging.getLogger(__name__)
+
+# Channel group of the processes caching the world
+WORLD_GROUP = "world"
+
+
+def publish_world_change(room_ids: list = None) -> None:
+    """
+    Tells every process to reload the rooms, once the current transaction is committed.
+
+    Args:
+        room_ids (list): The ids of the changed rooms. None reloads the whole world.
+    """
+    transaction.on_commit(partial(send_world_change, room_ids))
+
+
+def send_world_change(room_ids: list = None) -> None:
+    """
+    Sends the ids of the changed rooms to the world channel group.
+
+    Args:
+        room_ids (list): The ids of the changed rooms. None reloads the whole world.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    logger.debug(f"Rooms changed: {'all' if room_ids is None else room_ids}")
+    async_to_sync(channel_layer.group_send)(
+        WORLD_GROUP, {"type": "world.changed", "rooms": room_ids}
+    )
+
+
+def send_world_reload() -> None:
+    """
+    Tells every process to build the world again from its source, and swap it in.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    logger.info("Reloading the world")
+    async_to_sync(channel_layer.group_send)(WORLD_GROUP, {"type": "world.reload"})
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed(sender, instance: Room, **kwargs) -> None:
+    """
+    Handler of a room saved or deleted.
+    """
+    publish_world_change([instance.pk])
+
+
+@receiver(pre_save, sender=Exit)
+def exit_saving(sender, instance: Exit, **kwargs) -> None:
+    """
+    Handler of an exit about to be saved. Remembers the room where the exit was, so the room
+    is reloaded when the exit is moved to another room.
+    """
+    instance.previous_location_id = (
+        Exit.objects.filter(pk=instance.pk).values_list("location_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Exit)
+@receiver(post_delete, sender=Exit)
+def exit_changed(sender, instance: Exit, **kwargs) -> None:
+    """
+    Handler of an exit saved or deleted.
+    """
+    room_ids = {instance.location_id, getattr(instance, "previous_location_id", None)}
+    publish_world_change(sorted(room_ids - {None}))
@@ -0,0 +1,104 @@
+"""
+Runs two shards in their own processes, and hands a player off between them.
+
+Needs a Redis server for the channel layer shared by the processes. e.g docker-compose up redis
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from channels.layers import get_channel_layer
+
+from game.engine.sharding import get_shard_channel
+
+REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+MANAGE_PY = Path(__file__).resolve().parent.parent / "manage.py"
+
+
+def redis_is_available() -> bool:
+    try:
+        socket.create_connection((REDIS_HOST, REDIS_PORT), timeout=0.5).close()
+    except OSError:
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not redis_is_available(), reason="Needs a Redis server")
+
+
+@pytest.fixture
+def shard_processes(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [(REDIS_HOST, REDIS_PORT)]},
+        },
+    }
+    # The shards do not write the player state during the test
+    env = {**os.environ, "SHARDS": "2", "PLAYER_STATE_FLUSH_INTERVAL": "3600"}
+    env.pop("CHANNEL_LAYER", None)
+    processes = [
+        subprocess.Popen([sys.executable, str(MANAGE_PY), "runshard", str(shard)], env=env)
+        for shard in range(2)
+    ]
+    yield processes
+    for process in processes:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def receive(channel_layer, channel: str) -> dict:
+    return await asyncio.wait_for(channel_layer.receive(channel), timeout=10)
+
+
+def test_player_is_handed_off_between_shard_processes(shard_processes):
+    async def scenario():
+        channel_layer = get_channel_layer()
+        reply_channel = await channel_layer.new_channel()
+
+        async def send_command(shard: int, command: str) -> None:
+            await channel_layer.send(
+                get_shard_channel(shard),
+                {
+                    "type": "player.command",
+                    "reply_channel": reply_channel,
+                    "text": json.dumps({"message": command}),
+                },
+            )
+
+        # Rooms 1, 2 and 3 are in the region of shard 0, rooms 4 and 5 in the region of shard 1
+        await channel_layer.send(
+            get_shard_channel(0),
+            {
+                "type": "player.enter",
+                "reply_channel": reply_channel,
+                "username": "alice",
+                "player_id": 1,
+                "location": 2,
+            },
+        )
+        connect = await receive(channel_layer, reply_channel)
+        assert connect["type"] == "message.frame" and connect["location"] == 2
+
+        await send_command(0, "west")
+        # Sent to the old shard before the hand-off is known, forwarded to the new shard
+        await send_command(0, "look")
+        events = [await receive(channel_layer, reply_channel) for _ in range(3)]
+
+        assert {"type": "shard.route", "channel": get_shard_channel(1)} in events
+        frames = [event for event in events if event["type"] == "message.frame"]
+        assert [frame["location"] for frame in frames] == [4, 4]
+        assert "The water cooler" in json.loads(frames[0]["frame"])["message"]
+        assert "alice" in json.loads(frames[1]["frame"])["message"]
+
+        await send_command(1, "east")
+        events = [await receive(channel_layer, reply_channel) for _ in range(2)]
+        assert {"type": "shard.route", "channel": get_shard_channel(0)} in events
+
+    asyncio.run(scenario())
@@ -0,0 +1,324 @@
+"""
+Headless websocket bot swarm to load test the MUD server.
+
+Each bot opens a websocket connection to the client endpoint, registers and connects a user,
+and then sends a random mix of commands. The time between sending a command and receiving its
+response is recorded for each command, and the throughput and the latency percentiles are
+reported at the end of the run.
+
+Run the server with the in-memory channel layer, so no Redis is needed:
+    CHANNEL_LAYER=memory daphne mudserver.asgi:application -p 8000
+
+And run the swarm from the mudserver folder:
+    python -m loadtest.swarm --bots 1000 --duration 60 --mix look=4,say=3,move=3,quit=1
+
+Note: Thousands of bots need a higher limit of open files (ulimit -n) on both sides.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ["north", "south", "east", "west"]
+
+# Texts identifying the response to each command. The other messages (e.g broadcasts)
+# received while waiting for a response are ignored.
+RESPONSES = {
+    "register": ("user has been created", "Username already taken"),
+    "connect": ("User has been logged in",),
+    "look": ("<b>Players</b>",),
+    "move": ("<br><b># ",),
+    "quit": ("You have been logged out",),
+}
+
+# Texts identifying the responses of the failed commands, recorded as errors
+FAILURES = {
+    "connect": ("Cannot", "Wrong username"),
+}
+
+
+def parse_mix(mix: str) -> dict:
+    """
+    Parses the command mix.
+
+    Args:
+        mix (str): Comma separated weights of the commands. e.g look=4,say=3,move=3,quit=1
+
+    Returns:
+        dict: Maps the command to its weight.
+    """
+    weights = {}
+    for item in mix.split(","):
+        command, _, weight = item.partition("=")
+        command = command.strip()
+        if command not in ("look", "say", "move", "quit"):
+            raise argparse.ArgumentTypeError(f"Unknown command in the mix: {command}")
+        weights[command] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Gets the percentile of the sorted values with the nearest rank method.
+
+    Args:
+        values (list): The sorted values.
+        percent (float): The percentile. e.g 95
+
+    Returns:
+        float: The percentile, or 0 when there are no values.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+class SwarmStats:
+    """
+    Latencies and errors of the commands sent by the swarm.
+
+    Attributes:
+        latencies: Maps the command to the list of latencies in seconds.
+        errors: Maps the command to the number of failed commands.
+        connections: The number of opened websocket connections.
+    """
+
+    def __init__(self) -> None:
+        self.latencies = {}
+        self.errors = {}
+        self.connections = 0
+
+    def record(self, command: str, latency: float) -> None:
+        self.latencies.setdefault(command, []).append(latency)
+
+    def record_error(self, command: str) -> None:
+        self.errors[command] = self.errors.get(command, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        """
+        Summarizes the run.
+
+        Args:
+            elapsed (float): The duration of the run in seconds.
+
+        Returns:
+            dict: The throughput and the latency percentiles in milliseconds of each command.
+        """
+        commands = {}
+        for command in sorted(self.latencies.keys() | self.errors.keys()):
+            latencies = sorted(self.latencies.get(command, []))
+            commands[command] = {
+                "count": len(latencies),
+                "errors": self.errors.get(command, 0),
+                "throughput": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 50) * 1e3,
+                "p95_ms": percentile(latencies, 95) * 1e3,
+                "p99_ms": percentile(latencies, 99) * 1e3,
+            }
+        total = sum(result["count"] for result in commands.values())
+        return {
+            "elapsed_s": elapsed,
+            "connections": self.connections,
+            "throughput": total / elapsed,
+            "commands": commands,
+        }
+
+
+class Bot:
+    """
+    A simulated player.
+
+    Attributes:
+        name: The username and password of the player.
+        websocket: The websocket connection to the server.
+        stats: The stats shared by the swarm.
+        timeout: The number of seconds to wait for the response to a command.
+    """
+
+    def __init__(self, name: str, websocket, stats: SwarmStats, timeout: float) -> None:
+        self.name = name
+        self.websocket = websocket
+        self.stats = stats
+        self.timeout = timeout
+
+    async def send(self, command: str, text: str, expected: tuple, failures: tuple = ()) -> bool:
+        """
+        Sends a command and waits for its response.
+
+        Args:
+            command (str): The name of the command in the stats.
+            text (str): The text sent to the server.
+            expected (tuple): Texts identifying the response to the command.
+            failures (tuple): Texts identifying the response to the command when it failed.
+
+        Returns:
+            bool: True if the expected response was received.
+        """
+        start = time.perf_counter()
+        await self.websocket.send(json.dumps({"message": text}))
+        try:
+            succeeded = await asyncio.wait_for(self.__receive(expected, failures), self.timeout)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            succeeded = False
+        if not succeeded:
+            self.stats.record_error(command)
+            return False
+        self.stats.record(command, time.perf_counter() - start)
+        return True
+
+    async def __receive(self, expected: tuple, failures: tuple) -> bool:
+        """
+        Receives messages until the response to the command.
+
+        Args:
+            expected (tuple): Texts identifying the response to the command.
+            failures (tuple): Texts identifying the response to the command when it failed.
+
+        Returns:
+            bool: True if the expected response was received, False if the command failed.
+        """
+        while True:
+            data = json.loads(await self.websocket.recv())
+            # The server can batch several messages into a single frame
+            for message in data.get("messages") or [data["message"]]:
+                if any(text in message for text in expected):
+                    return True
+                if any(text in message for text in failures):
+                    return False
+
+    async def login(self) -> bool:
+        """
+        Connects the user of the bot.
+
+        Returns:
+            bool: True if the user is logged in.
+        """
+        return await self.send(
+            "connect", f"connect {self.name} {self.name}", RESPONSES["connect"], FAILURES["connect"]
+        )
+
+    async def connect(self) -> bool:
+        await self.send("register", f"register {self.name} {self.name}", RESPONSES["register"])
+        return await self.login()
+
+    async def play(self, weights: dict, deadline: float, think_time: float) -> None:
+        """
+        Sends random commands until the deadline.
+
+        Args:
+            weights (dict): Maps the command to its weight.
+            deadline (float): The time to stop playing, from time.monotonic().
+            think_time (float): The maximum number of seconds between two commands.
+        """
+        commands = list(weights)
+        command_weights = list(weights.values())
+        while time.monotonic() < deadline:
+            await asyncio.sleep(random.uniform(0, think_time))
+            command = random.choices(commands, command_weights)[0]
+            if command == "look":
+                await self.send("look", "look", RESPONSES["look"])
+            elif command == "say":
+                text = f"hello from {self.name}"
+                await self.send("say", f"say {text}", (f"<b>{self.name}</b> says",))
+            elif command == "move":
+                await self.send("move", random.choice(DIRECTIONS), RESPONSES["move"])
+            elif command == "quit":
+                await self.send("quit", "quit", RESPONSES["quit"])
+                if not await self.login():
+                    # The next commands would be measured on a logged out session
+                    return
+        await self.send("quit", "quit", RESPONSES["quit"])
+
+
+async def run_bot(index: int, args, weights: dict, stats: SwarmStats, deadline: float) -> None:
+    """
+    Runs a bot from the connection to the end of the run.
+    """
+    await asyncio.sleep(args.ramp_up * index / args.bots)
+    try:
+        async with websockets.connect(args.url, origin=args.origin) as websocket:
+            stats.connections += 1
+            bot = Bot(f"{args.prefix}{index}", websocket, stats, args.timeout)
+            if await bot.connect():
+                await bot.play(weights, deadline, args.think_time)
+    except (OSError, websockets.WebSocketException):
+        logger.exception(f"Bot {index} failed")
+        stats.record_error("websocket")
+
+
+async def run_swarm(args) -> dict:
+    """
+    Runs the swarm.
+
+    Returns:
+        dict: The report of the run. See SwarmStats.report().
+    """
+    weights = parse_mix(args.mix)
+    stats = SwarmStats()
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    await asyncio.gather(
+        *(run_bot(index, args, weights, stats, deadline) for index in range(args.bots))
+    )
+    return stats.report(time.monotonic() - start)
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['connections']} connections, {report['throughput']:.1f} commands/s "
+        f"in {report['elapsed_s']:.1f} s"
+    )
+    print(
+        f"{'command':>10} {'count':>8} {'errors':>7} {'per s':>8} "
+        f"{'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}"
+    )
+    for command, result in report["commands"].items():
+        print(
+            f"{command:>10} {result['count']:>8} {result['errors']:>7} "
+            f"{result['throughput']:>8.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the MUD server with websocket bots")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/client/")
+    parser.add_argument(
+        "--origin", default="http://127.0.0.1:8000", help="Origin header, checked by the server"
+    )
+    parser.add_argument("--bots", type=int, default=100, help="Number of connected bots")
+    parser.add_argument(
+        "--duration", type=float, default=30, help="Seconds of play after the ramp up"
+    )
+    parser.add_argument(
+        "--ramp-up", type=float, default=10, help="Seconds to spread the bot connections over"
+    )
+    parser.add_argument(
+        "--mix", default="look=4,say=3,move=3,quit=1", help="Weights of the commands"
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=1.0, help="Maximum seconds between two commands"
+    )
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds to wait for a response")
+    parser.add_argument("--prefix", default="bot", help="Prefix of the bot usernames")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_swarm(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from loadtest.swarm import Bot, SwarmStats, parse_mix, percentile
+
+
+def test_parse_mix():
+    assert parse_mix("look=4, say=3,move=0.5,quit") == {
+        "look": 4,
+        "say": 3,
+        "move": 0.5,
+        "quit": 1,
+    }
+
+
+def test_parse_mix_unknown_command():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("look=1,dance=2")
+
+
+@pytest.mark.parametrize(
+    "percent, expected",
+    [(50, 50), (95, 95), (99, 99), (100, 100)],
+)
+def test_percentile(percent, expected):
+    assert percentile(list(range(1, 101)), percent) == expected
+
+
+def test_report():
+    stats = SwarmStats()
+    for latency in [0.001, 0.002, 0.003, 0.004]:
+        stats.record("look", latency)
+    stats.record_error("say")
+
+    report = stats.report(elapsed=2)
+
+    assert report["throughput"] == 2
+    assert report["commands"]["look"]["count"] == 4
+    assert report["commands"]["look"]["p50_ms"] == pytest.approx(2)
+    assert report["commands"]["say"] == {
+        "count": 0,
+        "errors": 1,
+        "throughput": 0,
+        "p50_ms": 0,
+        "p95_ms": 0,
+        "p99_ms": 0,
+    }
+
+
+class FakeWebSocket:
+    def __init__(self, responses: list) -> None:
+        self.responses = [json.dumps({"message": response}) for response in responses]
+
+    async def send(self, data: str) -> None:
+        pass
+
+    async def recv(self) -> str:
+        return self.responses.pop(0)
+
+
+def test_failed_login_is_an_error():
+    stats = SwarmStats()
+    websocket = FakeWebSocket(
+        ["user has been created", "Cannot connect user bot0. Please check the credentials"]
+    )
+    bot = Bot("bot0", websocket, stats, timeout=1)
+
+    assert not async_to_sync(bot.connect)()
+    assert stats.errors == {"connect": 1}
+    assert "connect" not in stats.latencies
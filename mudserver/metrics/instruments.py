@@ -0,0 +1,89 @@
+"""
+Metrics of the MUD server.
+
+All the metrics of the server are defined here, so they are registered once and the
+metrics endpoint describes them all.
+"""
+from .registry import Counter, Gauge, Histogram
+
+COMMAND_DURATION = Histogram(
+    "mud_command_duration_seconds",
+    "Time to handle a command, by game event.",
+    ("event",),
+)
+
+CONNECTED_CONSUMERS = Gauge(
+    "mud_connected_consumers",
+    "Number of open websocket connections.",
+)
+
+PLAYERS_ONLINE = Gauge(
+    "mud_players_online",
+    "Number of connected players in the presence registry.",
+)
+
+CHANNEL_LAYER_MESSAGES = Counter(
+    "mud_channel_layer_messages_total",
+    "Number of messages sent to the channel layer groups, by message type.",
+    ("type",),
+)
+
+WEBSOCKET_MESSAGES_SENT = Counter(
+    "mud_websocket_messages_sent_total",
+    "Number of messages sent to the websocket clients.",
+)
+
+OUTBOUND_QUEUED_FRAMES = Gauge(
+    "mud_outbound_queued_frames",
+    "Number of frames waiting in the outbound queues of all the clients.",
+)
+
+OUTBOUND_QUEUE_MAX_DEPTH = Gauge(
+    "mud_outbound_queue_max_depth",
+    "Number of frames waiting in the longest outbound queue.",
+)
+
+OUTBOUND_QUEUE_OVERFLOWS = Counter(
+    "mud_outbound_queue_overflows_total",
+    "Number of frames sent to a full outbound queue, by overflow policy.",
+    ("policy",),
+)
+
+TICK_DURATION = Histogram(
+    "mud_tick_duration_seconds",
+    "Time to run the systems of a tick.",
+)
+
+TICK_OVERRUNS = Counter(
+    "mud_tick_overruns_total",
+    "Number of ticks that took longer than the tick interval.",
+)
+
+TICK_SYSTEM_DURATION = Histogram(
+    "mud_tick_system_duration_seconds",
+    "Time to run a system of the tick scheduler, by system.",
+    ("system",),
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "mud_password_hash_duration_seconds",
+    "Time to hash or check a password in the password hashers, by operation.",
+    ("operation",),
+)
+
+LOGIN_QUEUE_WAITING = Gauge(
+    "mud_login_queue_waiting",
+    "Number of connect and register commands waiting for their turn.",
+)
+
+DB_POOL_WAIT = Histogram(
+    "mud_db_pool_wait_seconds",
+    "Time a database call waits for a thread of the database executor, by function.",
+    ("function",),
+)
+
+DB_CALL_DURATION = Histogram(
+    "mud_db_call_duration_seconds",
+    "Time to run a database call in the database executor, by function.",
+    ("function",),
+)
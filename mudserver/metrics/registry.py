@@ -0,0 +1,296 @@
+"""
+Classes to collect the metrics of the server.
+
+The metrics are kept in memory with low overhead counters, gauges and histograms, and are
+rendered in the Prometheus text format by the metrics view.
+
+Each metric can have labels. The labelled children are created once and cached, so the hot
+paths only look up the child and update it. e.g
+    COMMAND_DURATION.labels("look_success").observe(0.002)
+"""
+import bisect
+import threading
+
+# Default histogram buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    """
+    Formats the labels of a sample.
+
+    Args:
+        names (tuple): The label names.
+        values (tuple): The label values.
+        extra (str): An additional formatted label. e.g le="0.5"
+
+    Returns:
+        str: The formatted labels. e.g {event="look_success",le="0.5"}
+    """
+    labels = [
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def format_value(value: float) -> str:
+    """
+    Formats the value of a sample.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: The formatted value. e.g 3, 0.25 or +Inf
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    """
+    Registry of the metrics of the process.
+
+    Attributes:
+        metrics: The registered metrics, in the order of their registration.
+    """
+
+    def __init__(self) -> None:
+        self.metrics = {}
+
+    def register(self, metric) -> None:
+        """
+        Registers the metric.
+
+        Args:
+            metric (Metric): The metric.
+
+        Throws:
+            ValueError: If a metric with the same name is registered
+        """
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """
+        Renders all the metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registry of the process
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    Base class for all metrics.
+
+    Attributes:
+        name: The name of the metric.
+        documentation: The description of the metric.
+        label_names: The names of the labels of the metric.
+        children: Maps the label values to the labelled child metric.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple = (), registry=REGISTRY
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.children = {}
+        self.lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """
+        Gets the child metric with the given label values.
+
+        Args:
+            values: The label values, in the order of the label names.
+
+        Returns:
+            The child metric.
+        """
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"Metric {self.name} expects the labels {self.label_names}")
+            with self.lock:
+                child = self.children.setdefault(values, self.new_child())
+        return child
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        """
+        Renders the samples of the metric.
+
+        Returns:
+            list: The lines of the samples.
+        """
+        lines = []
+        for values, child in list(self.children.items()):
+            lines.extend(child.render(self.name, self.label_names, values))
+        return lines
+
+
+class CounterChild:
+    def __init__(self) -> None:
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value += amount
+
+    def render(self, name: str, label_names: tuple, values: tuple) -> list:
+        return [f"{name}{format_labels(label_names, values)} {format_value(self.value)}"]
+
+
+class Counter(Metric):
+    """
+    Metric that only goes up. e.g the number of sent messages.
+    """
+
+    type = "counter"
+
+    def new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class GaugeChild:
+    def __init__(self) -> None:
+        self.value = 0
+        self.function = None
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function) -> None:
+        """
+        Reads the value of the gauge from the function when the metrics are rendered.
+
+        Args:
+            function (callable): Function returning the value of the gauge.
+        """
+        self.function = function
+
+    def render(self, name: str, label_names: tuple, values: tuple) -> list:
+        value = self.function() if self.function else self.value
+        return [f"{name}{format_labels(label_names, values)} {format_value(value)}"]
+
+
+class Gauge(Metric):
+    """
+    Metric that goes up and down. e.g the number of connected consumers.
+    """
+
+    type = "gauge"
+
+    def new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function) -> None:
+        self.labels().set_function(function)
+
+
+class HistogramChild:
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def render(self, name: str, label_names: tuple, values: tuple) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            labels = format_labels(label_names, values, f'le="{format_value(bound)}"')
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = format_labels(label_names, values)
+        lines.append(f"{name}_sum{labels} {format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(Metric):
+    """
+    Metric counting the observed values in buckets. e.g the duration of the commands.
+
+    Attributes:
+        buckets: The upper bounds of the buckets, in increasing order.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+        registry=REGISTRY,
+    ) -> None:
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, label_names, registry)
+
+    def new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
@@ -0,0 +1,62 @@
+import pytest
+
+from metrics.registry import Counter, Gauge, Histogram, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter(registry):
+    counter = Counter("messages_total", "Messages.", ("type",), registry=registry)
+    counter.labels("message.location").inc()
+    counter.labels("message.location").inc(2)
+    counter.labels('say "hi"').inc()
+
+    assert registry.render() == (
+        "# HELP messages_total Messages.\n"
+        "# TYPE messages_total counter\n"
+        'messages_total{type="message.location"} 3\n'
+        'messages_total{type="say \\"hi\\""} 1\n'
+    )
+
+
+def test_gauge(registry):
+    gauge = Gauge("consumers", "Consumers.", registry=registry)
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    players = Gauge("players", "Players.", registry=registry)
+    players.set_function(lambda: 7)
+
+    assert "consumers 1\n" in registry.render()
+    assert "players 7\n" in registry.render()
+
+
+def test_histogram(registry):
+    histogram = Histogram(
+        "duration_seconds", "Duration.", ("event",), buckets=(0.1, 1), registry=registry
+    )
+    for value in [0.05, 0.1, 0.5, 5]:
+        histogram.labels("look").observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{event="look",le="0.1"} 2',
+        'duration_seconds_bucket{event="look",le="1"} 3',
+        'duration_seconds_bucket{event="look",le="+Inf"} 4',
+        'duration_seconds_sum{event="look"} 5.65',
+        'duration_seconds_count{event="look"} 4',
+    ]
+
+
+def test_labels_mismatch(registry):
+    counter = Counter("messages_total", "Messages.", ("type",), registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels()
+
+
+def test_duplicate_metric(registry):
+    Counter("messages_total", "Messages.", registry=registry)
+    with pytest.raises(ValueError):
+        Counter("messages_total", "Messages.", registry=registry)
@@ -0,0 +1,12 @@
+import game.engine.game_engine  # noqa: F401 Registers the metrics of the game engine
+
+
+def test_metrics(client):
+    response = client.get("/metrics/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert "# TYPE mud_command_duration_seconds histogram" in body
+    assert "# TYPE mud_connected_consumers gauge" in body
+    assert "mud_players_online " in body
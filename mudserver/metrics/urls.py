@@ -0,0 +1,10 @@
+"""
+Class to handle the urls for the metrics.
+"""
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("", views.metrics, name="metrics"),
+]
@@ -0,0 +1,12 @@
+"""
+Class to handle the views for the metrics.
+"""
+from django.http import HttpResponse
+
+from .registry import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    return HttpResponse(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
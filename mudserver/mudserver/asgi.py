@@ -7,10 +7,12 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 """
 
+import atexit
+import logging
 import os
 
 from channels.auth import AuthMiddlewareStack
-from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
 
@@ -21,6 +23,47 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mudserver.settings")
 django_asgi_app = get_asgi_application()
 
 import client.routing
+from django.conf import settings
+from django.db import DatabaseError
+from game.engine.checkpoint import checkpointer
+from game.engine.hashing import password_hasher
+from game.engine.persistence import player_state_writer
+from game.engine.sharding import ShardConsumer, get_shard_channel
+from game.engine.ticker import TickerMiddleware, ticker
+from game.engine.world_cache import GROUP_RENEWAL_INTERVAL, WorldCacheMiddleware, world_cache
+
+logger = logging.getLogger(__name__)
+
+# Disconnect the players left behind by a crashed process
+try:
+    checkpointer.recover_stale_players()
+except DatabaseError:
+    logger.exception("Cannot recover the stale players from the database")
+
+# Serve the world from the rooms of the database
+if settings.WORLD_DATABASE:
+    try:
+        world_cache.load_from_database()
+    except DatabaseError:
+        logger.exception("Cannot load the world from the database")
+
+# Write the buffered player state periodically, and on shutdown
+ticker.register(
+    "player_state_flush",
+    player_state_writer.flush_async,
+    interval=player_state_writer.flush_interval,
+)
+atexit.register(player_state_writer.flush)
+
+# Stop the password hashing processes on shutdown
+atexit.register(password_hasher.shutdown)
+
+# Checkpoint the online players periodically, and disconnect the players of crashed processes
+ticker.register("player_checkpoint", checkpointer.checkpoint_async, interval=checkpointer.interval)
+ticker.register("player_recovery", checkpointer.recover_async, interval=checkpointer.stale_after)
+
+# Stay in the world channel group after the channel layer expires the group members
+ticker.register("world_group_renewal", world_cache.renew_group, interval=GROUP_RENEWAL_INTERVAL)
 
 application = ProtocolTypeRouter(
     {
@@ -28,5 +71,14 @@ application = ProtocolTypeRouter(
         "websocket": AllowedHostsOriginValidator(
             AuthMiddlewareStack(URLRouter(client.routing.websocket_urlpatterns))
         ),
+        # Channels of the shards, served by the runshard command
+        "channel": ChannelNameRouter(
+            {
+                get_shard_channel(shard): ShardConsumer.as_asgi(shard=shard)
+                for shard in range(settings.SHARDS)
+            }
+        ),
     }
 )
+# Reload the world, or the rooms changed in the database, while the server runs
+application = TickerMiddleware(WorldCacheMiddleware(application, world_cache), ticker)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -21,9 +23,16 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
+# The development key is published with the code. Anyone can sign values with it, e.g forge
+# the resume tokens of the players, so it can only be used with DEBUG.
+DEVELOPMENT_SECRET_KEY = "django-insecure-mudserver-development-key"
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", DEVELOPMENT_SECRET_KEY)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DJANGO_DEBUG", "1") == "1"
+
+if not DEBUG and SECRET_KEY == DEVELOPMENT_SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY. The development key needs DJANGO_DEBUG=1.")
 
 # Not a clean solution, but it works for now.
 ALLOWED_HOSTS = [
@@ -46,6 +55,7 @@ INSTALLED_APPS = [
     "client",
     "game",
     "commands",
+    "metrics",
 ]
 
 MIDDLEWARE = [
@@ -82,12 +92,33 @@ ASGI_APPLICATION = "mudserver.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DATABASE_ENGINE=postgresql uses PostgreSQL instead of SQLite, e.g to run many players
+if os.getenv("DATABASE_ENGINE") == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "mudserver"),
+            "USER": os.getenv("POSTGRES_USER", "mudserver"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", "mudserver"),
+            "HOST": os.getenv("POSTGRES_HOST", "127.0.0.1"),
+            "PORT": os.getenv("POSTGRES_PORT", 5432),
+            # Number of seconds each thread of the database executor keeps its connection open
+            "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", 600)),
+            "OPTIONS": {"connect_timeout": 5},
+        }
     }
-}
+    # Number of threads of the database executor, each with its own persistent connection.
+    # Keep the sum over the server processes below max_connections of PostgreSQL
+    DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 10))
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
+    # SQLite serializes the writers, the database calls run in a single thread
+    DATABASE_POOL_SIZE = 1
 
 
 # Password validation
@@ -109,14 +140,72 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 # Channel layer
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {
-            "hosts": [(os.getenv("REDIS_HOST", "127.0.0.1"), os.getenv("REDIS_PORT", 6379))],
+# CHANNEL_LAYER=memory runs a single server process without Redis. e.g for the load tests
+if os.getenv("CHANNEL_LAYER") == "memory":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
         },
-    },
-}
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [(os.getenv("REDIS_HOST", "127.0.0.1"), os.getenv("REDIS_PORT", 6379))],
+            },
+        },
+    }
+
+# Number of processes hashing the passwords. 0 hashes them in a thread, e.g in the tests
+PASSWORD_HASHER_PROCESSES = int(os.getenv("PASSWORD_HASHER_PROCESSES", 2))
+# Number of connect and register commands running at the same time. The others wait in a queue
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", 8))
+
+# Number of seconds a session resume token stays valid
+RESUME_TOKEN_MAX_AGE = int(os.getenv("RESUME_TOKEN_MAX_AGE", 3600))
+
+# Number of shards running the regions of the world, each in its own worker process.
+# 0 runs the whole world in the server process. See game.engine.sharding
+SHARDS = int(os.getenv("SHARDS", 0))
+
+# World file loaded on startup, in the JSON lines or msgpack format of game.rooms.loader,
+# or a binary snapshot (.snapshot) of game.rooms.snapshot, memory-mapped by the workers.
+# The world of game/rooms/data.py is used when it is not set
+WORLD_FILE = os.getenv("WORLD_FILE")
+
+# Load the world from the Room and Exit tables, editable while the server runs.
+# The tables are filled with the importworld command
+WORLD_DATABASE = os.getenv("WORLD_DATABASE") == "1"
+
+# Number of exits a shout travels through
+SHOUT_RADIUS = int(os.getenv("SHOUT_RADIUS", 2))
+
+# Number of ticks per second of the tick scheduler running the periodic world work
+TICK_RATE = float(os.getenv("TICK_RATE", 10))
+
+# Write-behind persistence of the player state
+# Number of seconds between the periodic writes of the changed player profiles
+PLAYER_STATE_FLUSH_INTERVAL = float(os.getenv("PLAYER_STATE_FLUSH_INTERVAL", 1.0))
+# Number of changed player profiles that triggers a write
+PLAYER_STATE_FLUSH_SIZE = int(os.getenv("PLAYER_STATE_FLUSH_SIZE", 100))
+
+# Checkpoint of the state of the online players
+# Number of seconds between two checkpoints
+PLAYER_CHECKPOINT_INTERVAL = float(os.getenv("PLAYER_CHECKPOINT_INTERVAL", 10.0))
+# Number of seconds without a checkpoint after which a connected player is disconnected
+PLAYER_CHECKPOINT_STALE_AFTER = float(
+    os.getenv("PLAYER_CHECKPOINT_STALE_AFTER", 3 * PLAYER_CHECKPOINT_INTERVAL)
+)
+
+# Outbound queue of each websocket connection
+# Number of messages waiting to be sent to a client
+OUTBOUND_QUEUE_SIZE = int(os.getenv("OUTBOUND_QUEUE_SIZE", 100))
+# What to do when the queue of a slow client is full: drop_oldest, coalesce or disconnect
+OUTBOUND_QUEUE_POLICY = os.getenv("OUTBOUND_QUEUE_POLICY", "drop_oldest")
+# Number of seconds to batch the messages to a client into a single frame, e.g 0.03
+# 0 sends every message in its own frame
+OUTBOUND_COALESCE_WINDOW = float(os.getenv("OUTBOUND_COALESCE_WINDOW", 0))
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
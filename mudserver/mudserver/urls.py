@@ -18,5 +18,6 @@ from django.urls import include, path
 
 urlpatterns = [
     path("client/", include("client.urls")),
+    path("metrics/", include("metrics.urls")),
     path("admin/", admin.site.urls),
 ]